@@ -0,0 +1,41 @@
+import logging
+from graph.state import WoodWorksState
+from agents.chat_subgraph.query_refinement import looks_like_follow_up
+from memory.answer_cache import get_answer_cache, is_personal_question
+from tools.catalog_render import current_catalog_version
+from config.settings import ANSWER_CACHE_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+def answer_cache_node(state: WoodWorksState) -> WoodWorksState:
+    logger.info("NODE | AnswerCache | ENTER")
+
+    question = (state.get("user_message") or "").strip()
+
+    # Only self-contained questions are shareable: follow-ups, questions about
+    # the customer and image-based questions depend on this session's context.
+    cacheable = (
+        ANSWER_CACHE_ENABLED
+        and question
+        and not state.get("image_spec_hint")
+        and not looks_like_follow_up(question)
+        and not is_personal_question(question)
+    )
+    if not cacheable:
+        logger.info("NODE | AnswerCache | EXIT (not cacheable)")
+        return {"answer_cache_question": None, "reasoning_output": None, "current_node": "answer_cache"}
+
+    try:
+        answer = get_answer_cache().lookup(question, current_catalog_version())
+    except Exception as e:
+        logger.error("NODE | AnswerCache | Lookup failed: %s", e, exc_info=True)
+        answer = None
+
+    if answer:
+        logger.info("NODE | AnswerCache | EXIT (hit)")
+        return {"answer_cache_question": None, "reasoning_output": answer, "current_node": "answer_cache"}
+
+    logger.info("NODE | AnswerCache | EXIT (miss)")
+    # reasoning stores its answer under this question
+    return {"answer_cache_question": question, "reasoning_output": None, "current_node": "answer_cache"}
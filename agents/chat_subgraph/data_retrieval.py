@@ -1,37 +1,35 @@
-import traceback
 import logging
 from graph.state import WoodWorksState
-from tools.db_tools import get_available_products
+from tools.db_tools import search_products, browse_products_by_category
+from tools.catalog_render import render_products
+from config.settings import CHAT_RETRIEVAL_TOP_K, CHAT_BROWSE_PER_CATEGORY
 
 logger = logging.getLogger(__name__)
 
 def data_retrieval_node(state: WoodWorksState) -> WoodWorksState:
     logger.info("NODE | DataRetrieval | ENTER")
-    
-    # In a real system, this would do vector search or filtered DB queries based on 'refined_query'
-    # For this implementation, we'll fetch the full catalog as context, 
-    # but we could filter it if the query mentions specific categories.
-    
+
+    # Retrieve only what the question is about, so prompt size stays flat
+    # however large the catalog grows: BM25 top-k from the full-text index,
+    # falling back to a few products per (mentioned) category.
+    query = (state.get("refined_query") or state.get("user_message") or "").strip()
+
     try:
-        products = get_available_products()
-        # Simple optimization: if catalog is huge, we'd filter here.
-        # For < 50 items, passing all is fine.
-        
-        # Create a string representation
-        lines = []
-        for p in products:
-            lines.append(f"- {p['name']} ({p['category']}) — ${p['base_price']:,.2f}")
-        
-        context_str = "\n".join(lines)
-        logger.info(f"NODE | DataRetrieval | Retrieved {len(products)} products")
-        
+        products = search_products(query, limit=CHAT_RETRIEVAL_TOP_K)
+        source = "search"
+        if not products:
+            products = browse_products_by_category(query, per_category=CHAT_BROWSE_PER_CATEGORY)
+            source = "category_browse"
+
+        context_str = render_products(products, "chat")
+        logger.info("NODE | DataRetrieval | Retrieved %s products via %s", len(products), source)
+
     except Exception as e:
-        logger.error(f"NODE | DataRetrieval | Error: {e}\n{traceback.format_exc()}")
+        logger.error("NODE | DataRetrieval | Error: %s", e, exc_info=True)
         context_str = "Error extracting product catalog."
 
     logger.info("NODE | DataRetrieval | EXIT")
     return {
-        **state,
         "retrieved_context": context_str,
         "current_node": "data_retrieval"
     }
@@ -1,25 +1,55 @@
-import traceback
+import re
 import logging
 from graph.state import WoodWorksState
 from llm.groq_client import call_llm
 from agents.prompt_loader import load_prompt
+from memory.short_term import get_conversation_context
+from config.settings import CHAT_PIPELINE, CHAT_REFINE_MIN_HISTORY
 
 logger = logging.getLogger(__name__)
 
+# Words and openers that only make sense against earlier turns
+_FOLLOW_UP = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|one|ones|same|other|another|former|latter)\b"
+    r"|^\s*(and|also|what about|how about|which)\b",
+    re.IGNORECASE,
+)
+
+
+def looks_like_follow_up(message: str) -> bool:
+    """Very short messages and ones with referring words ("that one", "what
+    about...") depend on earlier turns to make sense."""
+    return len(re.findall(r"\w+", message)) <= 3 or bool(_FOLLOW_UP.search(message))
+
+
+def needs_refinement(state: WoodWorksState) -> bool:
+    """Cheap local check for whether the message must be rewritten against the
+    history before retrieval. Only consulted when CHAT_PIPELINE is "auto"."""
+    if CHAT_PIPELINE == "two_pass":
+        return True
+    if CHAT_PIPELINE == "single_pass":
+        return False
+
+    history = state.get("conversation_history") or []
+    # The UI appends the current message before invoking the graph
+    prior = len(history) - 1 if history and history[-1].get("role") == "user" else len(history)
+    if prior <= 0 and not state.get("conversation_summary"):
+        return False  # nothing to resolve against
+
+    message = state.get("user_message") or ""
+    if looks_like_follow_up(message):
+        return True
+    words = re.findall(r"\w+", message)
+    # Over a long conversation, short messages usually lean on what came before
+    long_history = prior >= CHAT_REFINE_MIN_HISTORY or bool(state.get("conversation_summary"))
+    return long_history and len(words) <= 8
+
 
 def query_refinement_node(state: WoodWorksState) -> WoodWorksState:
     logger.info("NODE | QueryRefinement | ENTER")
     user_message = state.get("user_message", "")
-    history = state.get("conversation_history") or []
-
-    # it's the start of a conversation.
-    if history:
-        history_str = "\n".join([
-            f"{m['role'].capitalize()}: {m['content']}"
-            for m in history
-        ])
-    else:
-        history_str = "No prior conversation."
+    # Rolling summary + recent window; empty at the start of a conversation.
+    history_str = get_conversation_context(state) or "No prior conversation."
 
     prompt = load_prompt(
         "query_refinement.txt",
@@ -29,14 +59,13 @@ def query_refinement_node(state: WoodWorksState) -> WoodWorksState:
 
     try:
         refined_query = call_llm(prompt, temperature=0.3)
-        logger.info(f"NODE | QueryRefinement | Refined: {refined_query[:80]}")
+        logger.info("NODE | QueryRefinement | Refined: %s", refined_query[:80])
     except Exception as e:
-        logger.error(f"NODE | QueryRefinement | Error: {e}\n{traceback.format_exc()}")
+        logger.error("NODE | QueryRefinement | Error: %s", e, exc_info=True)
         refined_query = user_message  # safe fallback — pass raw message forward
 
     logger.info("NODE | QueryRefinement | EXIT")
     return {
-        **state,
         "refined_query": refined_query,
         "current_node": "query_refinement",
     }
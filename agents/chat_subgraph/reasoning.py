@@ -1,8 +1,10 @@
-import traceback
 import logging
 from graph.state import WoodWorksState
 from llm.groq_client import call_llm
 from agents.prompt_loader import load_prompt
+from memory.short_term import get_conversation_context
+from memory.answer_cache import get_answer_cache
+from tools.catalog_render import current_catalog_version
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +13,6 @@ def reasoning_node(state: WoodWorksState) -> WoodWorksState:
     logger.info("NODE | Reasoning | ENTER")
 
     context = state.get("retrieved_context", "")
-    history = state.get("conversation_history") or []
 
     user_content = (
         state.get("user_message")
@@ -22,15 +23,18 @@ def reasoning_node(state: WoodWorksState) -> WoodWorksState:
     if not user_content:
         logger.warning("NODE | Reasoning | No user content found — using fallback")
         return {
-            **state,
             "reasoning_output": "Could you clarify what you'd like to know?",
             "current_node": "reasoning",
         }
 
+    # A cacheable question is answered from the catalog alone: the answer is
+    # shared with other sessions, so no history, summary or customer details
+    # may go into the prompt
+    cacheable = bool(state.get("answer_cache_question")) and not state.get("image_spec_hint")
     system_prompt = load_prompt(
         "chat.txt",
         product_catalog_summary=context,
-        conversation_history=""
+        conversation_history="" if cacheable else get_conversation_context(state),
     )
 
     # ── Image context injection (vision feature) ────────────────────────
@@ -55,14 +59,15 @@ def reasoning_node(state: WoodWorksState) -> WoodWorksState:
     try:
         response_text = call_llm(user_content, system=system_prompt, temperature=0.6)
         logger.info("NODE | Reasoning | Generated response")
+        if cacheable:
+            get_answer_cache().store(state["answer_cache_question"], response_text, current_catalog_version())
     except Exception as e:
-        logger.error(f"NODE | Reasoning | Error: {e}\n{traceback.format_exc()}")
+        logger.error("NODE | Reasoning | Error: %s", e, exc_info=True)
         response_text = "I'm having trouble thinking right now. Please try again."
 
     logger.info("NODE | Reasoning | EXIT")
 
     return {
-        **state,
         "reasoning_output": response_text,
         "current_node": "reasoning",
     }
@@ -19,7 +19,6 @@ def response_generator_node(state: WoodWorksState) -> WoodWorksState:
             "Could you rephrase your question?"
         )
         return {
-            **state,
             "assistant_response": fallback,
             "current_node": "response_generator",
         }
@@ -40,7 +39,6 @@ def response_generator_node(state: WoodWorksState) -> WoodWorksState:
 
     logger.info("NODE | ResponseGenerator | EXIT")
     return {
-        **state,
         "assistant_response": final_response,
         "current_node": "response_generator",
     }
@@ -1,6 +1,8 @@
-import traceback
 import logging
-from graph.state import WoodWorksState
+from graph.state import WoodWorksState, trim_history
+from memory.chat_summary import collect_summary, schedule_summary
+from memory.history_store import spill_oldest
+from config.settings import CHAT_HISTORY_WINDOW, CHAT_SUMMARY_EVERY_N_TURNS
 
 logger = logging.getLogger(__name__)
 
@@ -10,25 +12,35 @@ def store_chat_summary_node(state: WoodWorksState) -> WoodWorksState:
 
     assistant_response = state.get("assistant_response", "")
 
-  
     # Previously this ran even after reasoning crashed, writing empty records.
     if not assistant_response or assistant_response.strip() == "":
         logger.warning("NODE | StoreChatSummary | Skipping — no response to store")
-        return state
+        return {}
 
     new_history_item = {"role": "assistant", "content": assistant_response}
-    _existing_history = state.get("conversation_history") or []
-
-    try:
-        # Placeholder for long-term DB persistence (e.g. workflow_memory table)
-        # db.store_chat_turn(user_msg=..., assistant_msg=assistant_response)
-        logger.info(f"NODE | StoreChatSummary | Stored response ({len(assistant_response)} chars)")
-    except Exception as e:
-        logger.error(f"NODE | StoreChatSummary | DB write failed: {e}\n{traceback.format_exc()}")
-        # Non-fatal — state is still updated even if DB write fails
+    history = state.get("conversation_history") or []
+    history_update = [new_history_item]
+    session_id = state.get("session_id")
+    summary = collect_summary(session_id, state.get("conversation_summary"))
+    updates = {}
+
+    # Keep the last CHAT_HISTORY_WINDOW messages verbatim; once enough older
+    # turns pile up, fold them into the summary off the response path. The
+    # folded messages move to the history store rather than being dropped.
+    overflow = len(history) + 1 - CHAT_HISTORY_WINDOW
+    if session_id and overflow >= CHAT_SUMMARY_EVERY_N_TURNS * 2:
+        try:
+            schedule_summary(session_id, summary, history[:overflow])
+            updates["history_offset"] = spill_oldest(state, overflow)
+            history_update.append(trim_history(overflow))
+            logger.info("NODE | StoreChatSummary | Scheduled summary of %s messages", overflow)
+        except Exception as e:
+            logger.error("NODE | StoreChatSummary | Could not schedule summary: %s", e, exc_info=True)
+            # Non-fatal — history is kept whole and summarized on a later turn
 
     logger.info("NODE | StoreChatSummary | EXIT")
     return {
-        **state,
-        "conversation_history": _existing_history + [new_history_item],
+        "conversation_history": history_update,
+        "conversation_summary": summary,
+        **updates,
     }
@@ -1,109 +1,54 @@
 """
 Discount Agent — handles discount/negotiation requests.
 
-Reads pricing_summary + user_message, decides whether to grant
-a discount (max 10%), updates the pricing breakdown, and responds.
+Reads pricing_summary, the quantity and the customer's completed orders,
+lets the local discount policy (tools/discount_policy.py) decide whether a
+discount is granted (max DISCOUNT_MAX_PERCENT per session), updates the
+pricing breakdown, and responds. No LLM call.
 """
 
-import json
 import logging
 from graph.state import WoodWorksState
-from llm.groq_client import call_llm
+from tools.db_tools import count_user_orders
+from tools.discount_policy import (
+    apply_discount, decide_discount, discount_message, discount_record, is_discount_request,
+)
 
 logger = logging.getLogger(__name__)
 
-_DISCOUNT_PROMPT = """\
-You are a sales agent for WoodWorks AI premium furniture.
-Product: {product_name}, Current total: ${total_price}
-Customer request: "{user_message}"
 
-Business rules:
-- Maximum discount: 10%
-- Only grant if customer explicitly asks
-- Be warm but firm — we offer quality at fair prices
-- For reasonable requests offer 5-10% goodwill discount
-
-Respond ONLY in JSON:
-{{
-  "discount_granted": true/false,
-  "discount_percent": 0-10,
-  "discount_amount": number,
-  "new_total": number,
-  "message_to_user": "your response"
-}}
-"""
+def _past_orders(user_id) -> int:
+    """Confirmed orders for the customer; 0 for guests or when the count is unavailable."""
+    if not user_id:
+        return 0
+    try:
+        return count_user_orders(user_id)
+    except Exception as e:
+        logger.warning("NODE | DiscountAgent | order count failed: %s", e)
+        return 0
 
 
 def discount_agent_node(state: WoodWorksState) -> WoodWorksState:
     logger.info("NODE | DiscountAgent | ENTER")
 
     pricing = state.get("pricing_summary") or {}
-    product = state.get("selected_product") or {}
-    user_message = state.get("user_message", "")
+    human_spec = state.get("human_spec") or {}
+    quantity = pricing.get("quantity") or human_spec.get("quantity") or 1
 
-    total_price = pricing.get("total_price", 0)
-    product_name = product.get("name", "the product")
-
-    prompt = _DISCOUNT_PROMPT.format(
-        product_name=product_name,
-        total_price=total_price,
-        user_message=user_message,
+    decision = decide_discount(
+        pricing, int(quantity), _past_orders(state.get("user_id")),
+        requested=is_discount_request(state.get("user_message") or ""),
     )
+    message_to_user = discount_message(decision)
 
-    try:
-        response = call_llm(prompt, json_mode=True)
-        data = json.loads(response)
-    except Exception as e:
-        logger.error(f"NODE | DiscountAgent | LLM error: {e}")
-        msg = "I appreciate you asking! Unfortunately I couldn't process the discount request right now. Would you like to proceed with the current pricing?"
-        _existing_history = state.get("conversation_history") or []
-        return {
-            **state,
-            "assistant_response": msg,
-            "current_node": "discount_agent",
-            "discount_applied": {"discount_granted": False, "error": str(e)},
-            "conversation_history": _existing_history + [{"role": "assistant", "content": msg}],
-        }
-
-    granted = data.get("discount_granted", False)
-    message_to_user = data.get("message_to_user", "")
-
-    if granted:
-        new_total = data.get("new_total", total_price)
-        discount_pct = data.get("discount_percent", 0)
-        discount_amt = data.get("discount_amount", 0)
-
-        # Update pricing_summary with discount
-        updated_pricing = dict(pricing)
-        updated_pricing["total_price"] = new_total
-        breakdown = updated_pricing.get("breakdown", "")
-        updated_pricing["breakdown"] = (
-            f"{breakdown}\n"
-            f"Discount ({discount_pct}%): -${discount_amt:,.2f}\n"
-            f"New Total: ${new_total:,.2f}"
-        )
-
-        logger.info(
-            f"NODE | DiscountAgent | granted={granted} percent={discount_pct}% "
-            f"new_total=${new_total}"
-        )
-
-        _existing_history = state.get("conversation_history") or []
-        return {
-            **state,
-            "pricing_summary": updated_pricing,
-            "assistant_response": message_to_user,
-            "current_node": "discount_agent",
-            "discount_applied": data,
-            "conversation_history": _existing_history + [{"role": "assistant", "content": message_to_user}],
-        }
-    else:
-        logger.info("NODE | DiscountAgent | granted=False percent=0% new_total=$%s", total_price)
-        _existing_history = state.get("conversation_history") or []
-        return {
-            **state,
-            "assistant_response": message_to_user,
-            "current_node": "discount_agent",
-            "discount_applied": data,
-            "conversation_history": _existing_history + [{"role": "assistant", "content": message_to_user}],
-        }
+    logger.info(
+        "NODE | DiscountAgent | granted=%s percent=%g%% new_total=$%.2f reasons=%s",
+        decision.added_bps > 0, decision.granted_bps / 100, decision.total_cents / 100, list(decision.reasons),
+    )
+    return {
+        "pricing_summary": apply_discount(pricing, decision),
+        "assistant_response": message_to_user,
+        "current_node": "discount_agent",
+        "discount_applied": discount_record(decision, message_to_user),
+        "conversation_history": [{"role": "assistant", "content": message_to_user}],
+    }
@@ -1,6 +1,7 @@
 import json
 import logging
 from graph.state import WoodWorksState
+from graph.issues import MISSING_SPEC_FIELDS, SPEC_EXTRACTION_FAILED, issue
 from llm.groq_client import call_llm
 from agents.prompt_loader import load_prompt
 
@@ -53,37 +54,35 @@ def human_spec_agent_node(state: WoodWorksState) -> WoodWorksState:
         try:
             questions_message = call_llm(prompt, temperature=0.5)
         except Exception as e:
-            logger.error(f"NODE | HumanSpecAgent | LLM error generating questions: {e}")
+            logger.error("NODE | HumanSpecAgent | LLM error generating questions: %s", e)
             questions_message = "Could you please share the dimensions, finish preference, and any special requirements for your order?"
 
         logger.info("NODE | HumanSpecAgent | questions generated, awaiting user response")
-        _existing_history = state.get("conversation_history") or []
         return {
-            **state,
             _QUESTION_ASKED_KEY: True,   # persists correctly via TypedDict
             "assistant_response": questions_message,
             "current_node": "human_spec_agent",
-            "conversation_history": _existing_history + [{"role": "assistant", "content": questions_message}],
+            "conversation_history": [{"role": "assistant", "content": questions_message}],
         }
     else:
         # Stage 2: Extract specs from user response
         logger.info("NODE | HumanSpecAgent | Stage 2 - Extracting specs")
+        # After a re-ask for missing fields, the earlier answer still counts
+        previous_answer = (state.get("human_spec") or {}).get("partial_answer")
+        user_response = f"{previous_answer}\n{user_message}" if previous_answer else user_message
         prompt = load_prompt(
             "human_spec_extraction.txt",
             product_name=product.get("name", "the product"),
             finish_options=product.get("finish_options", ""),
             dimensions_guide=product.get("dimensions_guide", ""),
-            user_response=user_message,
+            user_response=user_response,
         )
         try:
             response = call_llm(prompt, json_mode=True)
             data = json.loads(response)
         except Exception as e:
-            logger.error(f"NODE | HumanSpecAgent | LLM extraction error: {e}")
-            return {
-                **state,
-                "supervisor_issue": f"Failed to extract specs from user response: {e}",
-            }
+            logger.error("NODE | HumanSpecAgent | LLM extraction error: %s", e)
+            return issue(SPEC_EXTRACTION_FAILED, f"Failed to extract specs from user response: {e}")
 
         # Merge image hints as defaults for any missing spec fields
         if image_hint:
@@ -102,25 +101,25 @@ def human_spec_agent_node(state: WoodWorksState) -> WoodWorksState:
 
         missing = data.get("missing_critical_info", False)
         if missing:
-            logger.warning(f"NODE | HumanSpecAgent | missing critical fields: {data.get('missing_fields')}")
-            return {
-                **state,
-                "supervisor_issue": f"Missing critical specification fields: {data.get('missing_fields')}",
-            }
+            logger.warning("NODE | HumanSpecAgent | missing critical fields: %s", data.get('missing_fields'))
+            return issue(
+                MISSING_SPEC_FIELDS,
+                f"Missing critical specification fields: {data.get('missing_fields')}",
+                missing_fields=data.get("missing_fields") or [],
+                answer=user_response,
+            )
 
         logger.info("NODE | HumanSpecAgent | specs extracted successfully")
         confirmation_msg = (
             f"Perfect! I've captured all your specifications for the **{product.get('name')}**. "
             f"Let me now prepare the technical specification and pricing for you."
         )
-        _existing_history = state.get("conversation_history") or []
         return {
-            **state,
             "human_spec": data,
             _QUESTION_ASKED_KEY: False,   # reset for future orders
             "assistant_response": confirmation_msg,
             "current_node": "human_spec_agent",
-            "conversation_history": _existing_history + [
+            "conversation_history": [
                 {"role": "user", "content": user_message},
                 {"role": "assistant", "content": confirmation_msg},
             ],
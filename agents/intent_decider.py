@@ -13,7 +13,7 @@ def intent_decider_node(state: WoodWorksState) -> WoodWorksState:
     # Once workflow mode is set, it stays locked until the session is explicitly reset.
     if state.get("mode") == "workflow":
         logger.info("NODE | IntentDecider | mode=workflow (locked) — skipping LLM classification")
-        return {**state, "current_node": "intent_decider"}
+        return {"refined_query": None, "current_node": "intent_decider"}
 
     user_message = state.get("user_message", "")
 
@@ -23,16 +23,18 @@ def intent_decider_node(state: WoodWorksState) -> WoodWorksState:
         response = call_llm(prompt, json_mode=True)
         data = json.loads(response)
         mode = data.get("mode", "chat")
-        logger.info(f"NODE | IntentDecider | mode={mode} confidence={data.get('confidence')}")
+        logger.info("NODE | IntentDecider | mode=%s confidence=%s", mode, data.get('confidence'))
     except Exception as e:
-        logger.error(f"NODE | IntentDecider | LLM error: {e}")
+        logger.error("NODE | IntentDecider | LLM error: %s", e)
         mode = "chat"
 
    
     updates = {
         "mode": mode,
+        # Per-turn field: cleared so a skipped refinement never reuses last turn's query
+        "refined_query": None,
         "current_node": "intent_decider",
     }
 
     logger.info("NODE | IntentDecider | EXIT")
-    return {**state, **updates}
+    return updates
@@ -1,9 +1,8 @@
-import json
 import logging
 from graph.state import WoodWorksState
-from llm.groq_client import call_llm
-from agents.prompt_loader import load_prompt
-from tools.db_tools import check_inventory, get_available_products
+from graph.issues import OUT_OF_STOCK, issue
+from tools.db_tools import check_inventory
+from tools.pricing_engine import price_order
 
 logger = logging.getLogger(__name__)
 
@@ -17,56 +16,41 @@ def stock_pricing_agent_node(state: WoodWorksState) -> WoodWorksState:
     quantity = human_spec.get("quantity", 1) if human_spec else 1
     product_id = product.get("product_id")
 
-    # Step 1: Check inventory
-    try:
-        stock_result = check_inventory(product_id=product_id, quantity=quantity)
-        logger.info(f"NODE | StockPricingAgent | stock check: {stock_result}")
-    except Exception as e:
-        logger.error(f"NODE | StockPricingAgent | stock check error: {e}")
-        stock_result = {"available": False, "quantity_in_stock": 0, "requested_quantity": quantity, "sku": None}
+    # Step 1: Check inventory, unless spec_and_stock just did it in parallel
+    stock_result = state.get("stock_status")
+    if state.get("current_node") == "spec_and_stock" and stock_result:
+        logger.info("NODE | StockPricingAgent | reusing parallel stock check")
+    else:
+        try:
+            stock_result = check_inventory(product_id=product_id, quantity=quantity)
+            logger.info("NODE | StockPricingAgent | stock check: %s", stock_result)
+        except Exception as e:
+            logger.error("NODE | StockPricingAgent | stock check error: %s", e)
+            stock_result = {"available": False, "quantity_in_stock": 0, "requested_quantity": quantity, "sku": None}
 
     if not stock_result["available"]:
-        logger.warning(f"NODE | StockPricingAgent | insufficient stock for product_id={product_id}")
+        logger.warning("NODE | StockPricingAgent | insufficient stock for product_id=%s", product_id)
         return {
-            **state,
             "stock_status": stock_result,
-            "supervisor_issue": (
+            **issue(
+                OUT_OF_STOCK,
                 f"Insufficient stock for {product.get('name')}. "
-                f"Requested: {quantity}, Available: {stock_result['quantity_in_stock']}"
+                f"Requested: {quantity}, Available: {stock_result['quantity_in_stock']}",
+                product_id=product_id,
+                category=product.get("category"),
+                requested=quantity,
+                available=stock_result["quantity_in_stock"],
             ),
             "current_node": "stock_pricing_agent",
         }
 
-    # Step 2: Calculate pricing
-    prompt = load_prompt(
-        "pricing.txt",
-        product_name=product.get("name", ""),
-        base_price=product.get("base_price", 0),
-        quantity=quantity,
-        technical_spec=json.dumps(technical_spec, indent=2),
-        human_spec=json.dumps(human_spec, indent=2),
-    )
-
-    try:
-        response = call_llm(prompt, json_mode=True, temperature=0.1)
-        pricing_data = json.loads(response)
-        logger.info(f"NODE | StockPricingAgent | pricing calculated: total=${pricing_data.get('total_price')}")
-    except Exception as e:
-        logger.error(f"NODE | StockPricingAgent | pricing LLM error: {e}")
-        # Fallback pricing
-        pricing_data = {
-            "base_price": product.get("base_price", 0),
-            "customization_cost": 0,
-            "material_cost": 0,
-            "total_price": product.get("base_price", 0) * quantity,
-            "breakdown": "Standard pricing applied.",
-        }
+    # Step 2: Calculate pricing — deterministic rule table, no LLM call
+    pricing_data = price_order(product, human_spec, technical_spec)
 
     logger.info("NODE | StockPricingAgent | EXIT")
     total = pricing_data.get('total_price', 0)
     breakdown = pricing_data.get('breakdown', '')
     return {
-        **state,
         "stock_status": stock_result,
         "pricing_summary": pricing_data,
         "assistant_response": (
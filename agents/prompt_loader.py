@@ -16,5 +16,5 @@ def load_prompt(filename: str, **kwargs) -> str:
     try:
         return template.format(**kwargs)
     except KeyError as e:
-        logger.warning(f"Prompt {filename} missing variable: {e}")
+        logger.warning("Prompt %s missing variable: %s", filename, e)
         return template
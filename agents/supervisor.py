@@ -1,13 +1,34 @@
 import json
 import logging
+import re
+from typing import Any, Callable, Dict, Optional, Tuple
 from graph.state import WoodWorksState
+from graph.issues import MISSING_SPEC_FIELDS, OUT_OF_STOCK, SPEC_EXTRACTION_FAILED, clear_issue
+from graph.metrics import increment
 from llm.groq_client import call_llm
 from agents.prompt_loader import load_prompt
-from tools.db_tools import get_available_products
+from tools.catalog_render import get_catalog_fragment, get_catalog_product, get_catalog_products
+from tools.db_tools import check_inventory
 from config.settings import MAX_SUPERVISOR_STEPS
 
 logger = logging.getLogger(__name__)
 
+# A rule returns (decision, extra state updates), or None to defer to the LLM
+Resolution = Optional[Tuple[Dict[str, Any], Dict[str, Any]]]
+
+# Replies to an offered alternative product
+_ACCEPT = re.compile(r"^\W*(?:yes|yeah|yep|yup|sure|ok(?:ay)?|please do|go ahead|sounds good|that works|switch)\b", re.IGNORECASE)
+_DECLINE = re.compile(r"^\W*(?:no|nope|nah|not really|don'?t|do not|rather not|no thanks)\b", re.IGNORECASE)
+
+# A different product invalidates everything collected for the old one
+_PRODUCT_RESET = {
+    "human_spec": None,
+    "human_spec_question_asked": False,
+    "technical_spec": None,
+    "pricing_summary": None,
+    "stock_status": None,
+}
+
 
 def _build_state_summary(state: WoodWorksState) -> str:
     # Summarize what we have to help the supervisor decide what's missing
@@ -25,21 +46,114 @@ def _build_state_summary(state: WoodWorksState) -> str:
     }, indent=2)
 
 
-def supervisor_node(state: WoodWorksState) -> WoodWorksState:
-    logger.info("NODE | Supervisor | ENTER")
-
-    # Check max steps to prevent infinite loops
-    steps = state.get("supervisor_steps", 0) + 1
-    if steps > MAX_SUPERVISOR_STEPS:
-        logger.error(f"NODE | Supervisor | max steps exceeded ({MAX_SUPERVISOR_STEPS})")
-        return {
-            **state,
-            "supervisor_steps": steps,
-            "supervisor_decision": {"next_agent": "end", "reason": "Max steps exceeded"},
-            "assistant_response": "I'm sorry, we encountered too many issues processing your order. Please contact support.",
+def _resolve_out_of_stock(state: WoodWorksState, details: Dict[str, Any]) -> Resolution:
+    """Offer the in-stock product in the same category closest in price and
+    wait for the customer to accept it; with none available, go back to
+    product selection."""
+    product = state.get("selected_product") or {}
+    requested = details.get("requested") or 1
+    base_price = product.get("base_price") or 0
+    candidates = sorted(
+        (
+            p for p in get_catalog_products()
+            if p["category"] == details.get("category")
+            and p["product_id"] != details.get("product_id")
+            and (p.get("stock_quantity") or 0) >= requested
+        ),
+        key=lambda p: abs((p.get("base_price") or 0) - base_price),
+    )
+    for candidate in candidates:
+        # The catalog cache may lag a few seconds; confirm against live stock
+        if not check_inventory(product_id=candidate["product_id"], quantity=requested)["available"]:
+            continue
+        alt = get_catalog_product(candidate["product_id"])
+        message = (
+            f"Sorry, we only have {details.get('available', 0)} of the **{product.get('name')}** in stock. "
+            f"The **{alt['name']}** (${alt['base_price']:,.2f}) is a close match in the same category and "
+            f"is available. Would you like to switch to it? Reply **yes** and I'll take your specifications "
+            f"for it, or **no** to choose a different product."
+        )
+        decision = {
+            "next_agent": "end",
+            "reason": f"Out of stock; same-category alternative {alt['product_id']} is in stock",
+            "suggested_product_id": alt["product_id"],
+            "suggested_product_name": alt["name"],
+            "message_to_user": message,
         }
+        # Nothing changes until the customer answers (see _resolve_proposed_product)
+        return decision, {"proposed_product": alt, "technical_spec": None, "pricing_summary": None, "stock_status": None}
+
+    message = (
+        f"Sorry, the **{product.get('name')}** is out of stock for the quantity you need and there's no "
+        f"in-stock alternative in {details.get('category') or 'that category'}. "
+        f"Which other product would you like?"
+    )
+    decision = {"next_agent": "end", "reason": "Out of stock with no in-stock alternative", "message_to_user": message}
+    return decision, {"selected_product": None, **_PRODUCT_RESET}
+
+
+def _resolve_proposed_product(state: WoodWorksState) -> Resolution:
+    """Handle the customer's reply to an offered alternative: switch on yes
+    (specs are collected again for the new product), back to product
+    selection on no, and ask again on anything else."""
+    alt = state["proposed_product"]
+    reply = state.get("user_message") or ""
+    if _ACCEPT.search(reply) and not _DECLINE.search(reply):
+        decision = {"next_agent": "workflow_dispatcher", "reason": f"Customer accepted alternative {alt.get('product_id')}"}
+        return decision, {"selected_product": alt, "proposed_product": None, **_PRODUCT_RESET}
+    if _DECLINE.search(reply):
+        message = "No problem. Which other product would you like?"
+        decision = {"next_agent": "end", "reason": "Customer declined the alternative", "message_to_user": message}
+        return decision, {"selected_product": None, "proposed_product": None, **_PRODUCT_RESET}
+    message = (
+        f"Would you like to switch your order to the **{alt.get('name')}**? "
+        f"Reply **yes** or **no** (or 'cancel' to start over)."
+    )
+    decision = {"next_agent": "end", "reason": "Waiting for a yes/no on the alternative", "message_to_user": message}
+    return decision, {}
+
+
+def _resolve_missing_spec_fields(state: WoodWorksState, details: Dict[str, Any]) -> Resolution:
+    """Ask again for just the missing fields; the earlier answer is kept and
+    combined with the reply on the next extraction."""
+    fields = [str(f).replace("_", " ") for f in details.get("missing_fields") or []] or ["dimensions", "quantity"]
+    product_name = (state.get("selected_product") or {}).get("name", "your order")
+    wanted = fields[0] if len(fields) == 1 else ", ".join(fields[:-1]) + " and " + fields[-1]
+    message = f"Thanks! To finish the specification for the **{product_name}** I still need the {wanted}. Could you share that?"
+    decision = {"next_agent": "end", "reason": f"Re-asking for missing fields: {fields}", "message_to_user": message}
+    return decision, {"human_spec": {"partial_answer": details.get("answer", "")}, "human_spec_question_asked": True}
+
+
+def _resolve_spec_extraction_failed(state: WoodWorksState, details: Dict[str, Any]) -> Resolution:
+    message = (
+        "Sorry, I couldn't quite process that. Could you share the dimensions, finish and quantity "
+        "you'd like once more?"
+    )
+    decision = {"next_agent": "end", "reason": "Spec extraction failed; re-asking", "message_to_user": message}
+    return decision, {"human_spec_question_asked": True}
+
+
+_RULES: Dict[str, Callable[[WoodWorksState, Dict[str, Any]], Resolution]] = {
+    OUT_OF_STOCK: _resolve_out_of_stock,
+    MISSING_SPEC_FIELDS: _resolve_missing_spec_fields,
+    SPEC_EXTRACTION_FAILED: _resolve_spec_extraction_failed,
+}
+
+
+def _resolve_by_rule(state: WoodWorksState) -> Resolution:
+    if state.get("proposed_product") and not state.get("supervisor_issue_code"):
+        return _resolve_proposed_product(state)
+    rule = _RULES.get(state.get("supervisor_issue_code") or "")
+    if not rule:
+        return None
+    try:
+        return rule(state, state.get("supervisor_issue_details") or {})
+    except Exception as e:
+        logger.error("NODE | Supervisor | rule %s failed, using LLM: %s", state.get('supervisor_issue_code'), e)
+        return None
 
-    # Identify if there was a specific issue reported by a worker
+
+def _resolve_by_llm(state: WoodWorksState) -> Resolution:
     issue = state.get("supervisor_issue", None)
     state_summary = _build_state_summary(state)
 
@@ -47,8 +161,7 @@ def supervisor_node(state: WoodWorksState) -> WoodWorksState:
     issue_description = issue if issue else "Determine the next workflow step based on missing information."
 
     try:
-        products = get_available_products()
-        catalog_str = "\n".join([f"ID:{p['product_id']} | {p['name']} | ${p['base_price']:,.2f} | Stock:{p['stock_quantity']}" for p in products])
+        catalog_str = get_catalog_fragment("supervisor")
     except Exception:
         catalog_str = "Error loading catalog"
 
@@ -62,9 +175,12 @@ def supervisor_node(state: WoodWorksState) -> WoodWorksState:
     try:
         response = call_llm(prompt, json_mode=True, temperature=0.1)
         decision = json.loads(response)
-        logger.info(f"NODE | Supervisor | decision: next_agent={decision.get('next_agent')} reason={decision.get('reason')}")
+        logger.info(
+            "NODE | Supervisor | decision: next_agent=%s reason=%s",
+            decision.get('next_agent'), decision.get('reason'),
+        )
     except Exception as e:
-        logger.error(f"NODE | Supervisor | LLM error: {e}")
+        logger.error("NODE | Supervisor | LLM error: %s", e)
         # Fallback logic if LLM fails
         decision = {
             "next_agent": "end",
@@ -72,37 +188,62 @@ def supervisor_node(state: WoodWorksState) -> WoodWorksState:
             "message_to_user": "We encountered an internal issue. Please try again."
         }
 
-    message_to_user = decision.get("message_to_user", "")
-
-    updated_state = {
-        **state,
-        "supervisor_steps": steps,
-        "supervisor_issue": None, # Clear the issue as we've handled it
-        "supervisor_decision": decision,
-        "current_node": "supervisor",
-    }
-
+    updates = {}
     # If supervisor suggests an alternative product, update selected_product
     alt_product_id = decision.get("suggested_product_id")
     if alt_product_id:
         try:
-            products = get_available_products()
-            alt = next((p for p in products if p["product_id"] == alt_product_id), None)
+            alt = get_catalog_product(alt_product_id)
             if alt:
-                updated_state["selected_product"] = alt
+                updates["selected_product"] = alt
                 # Reset downstream states if product changes
-                updated_state["human_spec"] = None
-                updated_state["technical_spec"] = None
-                updated_state["pricing_summary"] = None
-                updated_state["stock_status"] = None
-                logger.info(f"NODE | Supervisor | alternative product set: {alt['name']}")
+                updates["human_spec"] = None
+                updates["technical_spec"] = None
+                updates["pricing_summary"] = None
+                updates["stock_status"] = None
+                logger.info("NODE | Supervisor | alternative product set: %s", alt['name'])
         except Exception:
             pass
+    return decision, updates
+
+
+def supervisor_node(state: WoodWorksState) -> WoodWorksState:
+    logger.info("NODE | Supervisor | ENTER")
+
+    # Check max steps to prevent infinite loops
+    steps = state.get("supervisor_steps", 0) + 1
+    if steps > MAX_SUPERVISOR_STEPS:
+        logger.error("NODE | Supervisor | max steps exceeded (%s)", MAX_SUPERVISOR_STEPS)
+        return {
+            **clear_issue(),
+            "supervisor_steps": steps,
+            "supervisor_decision": {"next_agent": "end", "reason": "Max steps exceeded"},
+            "assistant_response": "I'm sorry, we encountered too many issues processing your order. Please contact support.",
+        }
+
+    # Known issue codes are resolved locally; only unknown issues reach the LLM
+    resolution = _resolve_by_rule(state)
+    if resolution:
+        increment("supervisor_rule_resolved")
+        logger.info("NODE | Supervisor | resolved by rule: %s", state.get('supervisor_issue_code'))
+    else:
+        increment("supervisor_llm_calls")
+        resolution = _resolve_by_llm(state)
+    decision, resolved_updates = resolution
+
+    message_to_user = decision.get("message_to_user", "")
+
+    updates = {
+        **clear_issue(),  # Clear the issue as we've handled it
+        **resolved_updates,
+        "supervisor_steps": steps,
+        "supervisor_decision": decision,
+        "current_node": "supervisor",
+    }
 
     if message_to_user:
-        updated_state["assistant_response"] = message_to_user
-        _existing_history = updated_state.get("conversation_history") or []
-        updated_state["conversation_history"] = _existing_history + [{"role": "assistant", "content": message_to_user}]
+        updates["assistant_response"] = message_to_user
+        updates["conversation_history"] = [{"role": "assistant", "content": message_to_user}]
 
     logger.info("NODE | Supervisor | EXIT")
-    return updated_state
+    return updates
@@ -1,6 +1,7 @@
 import json
 import logging
 from graph.state import WoodWorksState
+from graph.issues import TECHNICAL_SPEC_FAILED, issue
 from llm.groq_client import call_llm
 from agents.prompt_loader import load_prompt
 
@@ -26,15 +27,11 @@ def technical_spec_agent_node(state: WoodWorksState) -> WoodWorksState:
         data = json.loads(response)
         logger.info("NODE | TechnicalSpecAgent | spec generated successfully")
     except Exception as e:
-        logger.error(f"NODE | TechnicalSpecAgent | LLM error: {e}")
-        return {
-            **state,
-            "supervisor_issue": f"Technical spec generation failed: {e}",
-        }
+        logger.error("NODE | TechnicalSpecAgent | LLM error: %s", e)
+        return issue(TECHNICAL_SPEC_FAILED, f"Technical spec generation failed: {e}")
 
     logger.info("NODE | TechnicalSpecAgent | EXIT")
     return {
-        **state,
         "technical_spec": data,
         "assistant_response": (
             "Technical specification prepared. Checking stock and calculating your final price now..."
@@ -18,9 +18,8 @@ def user_info_collector_node(state: WoodWorksState) -> WoodWorksState:
         response = call_llm(prompt, json_mode=True)
         data = json.loads(response)
     except Exception as e:
-        logger.error(f"NODE | UserInfoCollector | LLM error: {e}")
+        logger.error("NODE | UserInfoCollector | LLM error: %s", e)
         return {
-            **state,
             "assistant_response": "Welcome to WoodWorks AI! Could you please share your name to get started?",
             "current_node": "user_info_collector",
         }
@@ -33,29 +32,27 @@ def user_info_collector_node(state: WoodWorksState) -> WoodWorksState:
         phone = data.get("phone")
 
         try:
+            # Always a new user: a typed email is unverified, so it must never
+            # attach this session to an existing account or restore its history
             user_id = create_user(name=name, email=email, phone=phone)
         except Exception as e:
-            logger.error(f"NODE | UserInfoCollector | DB error: {e}")
+            logger.error("NODE | UserInfoCollector | DB error: %s", e)
             user_id = None
 
         user_info = {"name": name, "email": email, "phone": phone, "user_id": user_id}
-        logger.info(f"NODE | UserInfoCollector | user collected: {name} id={user_id}")
+        logger.info("NODE | UserInfoCollector | user collected: %s id=%s", name, user_id)
 
-        _existing_history = state.get("conversation_history") or []
         return {
-            **state,
             "user_info": user_info,
             "user_id": user_id,
             "assistant_response": message_to_user,
             "current_node": "user_info_collector",
-            "conversation_history": _existing_history + [{"role": "assistant", "content": message_to_user}],
+            "conversation_history": [{"role": "assistant", "content": message_to_user}],
         }
     else:
         logger.info("NODE | UserInfoCollector | awaiting user name")
-        _existing_history = state.get("conversation_history") or []
         return {
-            **state,
             "assistant_response": message_to_user,
             "current_node": "user_info_collector",
-            "conversation_history": _existing_history + [{"role": "assistant", "content": message_to_user}],
+            "conversation_history": [{"role": "assistant", "content": message_to_user}],
         }
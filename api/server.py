@@ -0,0 +1,324 @@
+"""
+Headless HTTP API serving the graph (ASGI, Starlette).
+
+    uvicorn api.server:app --host 0.0.0.0 --port 8000 --workers 4
+
+Sessions are checkpointer threads, so any worker process can serve any
+session. A session id is a bearer credential: whoever holds it can read the
+conversation and place or cancel the order, so clients must keep it secret
+and send it only over TLS. Only ids issued by POST /sessions (32 hex digits)
+are accepted; anything else, including deleted or expired sessions, is 404.
+Endpoints:
+
+    POST   /sessions                          new session id (a bearer credential)
+    GET    /sessions/{session_id}             progress summary and the recent conversation
+    GET    /sessions/{session_id}/history     older messages, ?before=<seq>&limit=<n>
+    POST   /sessions/{session_id}/messages    {"message": "..."}, returns a TurnResult
+    POST   /sessions/{session_id}/confirm     confirm the order, returns a TurnResult
+    POST   /sessions/{session_id}/cancel      reset the order, returns a TurnResult
+    POST   /sessions/{session_id}/images      raw image body (image/jpeg, image/png, image/webp)
+    GET    /sessions/{session_id}/receipt     PDF receipt of the completed order
+    DELETE /sessions/{session_id}             delete the session's checkpoints
+    GET    /healthz, /metrics
+
+Turns block on the LLM, so they run in a thread pool. At most
+API_MAX_CONCURRENT_TURNS run at once per process; a turn that can't get a
+slot within API_QUEUE_TIMEOUT seconds is refused with 503 and Retry-After
+instead of queueing without bound; the same deadline covers waiting behind
+the session's earlier turns. Turns of one session run one at a time, in
+arrival order. Malformed requests get 400; any other failure is logged and
+returned as a bare 500. Once a session's order is complete, messages, images and
+confirmations get 409 until POST /cancel starts a new order.
+"""
+import asyncio
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Tuple
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+from config.logging_config import setup_logging
+from config.settings import API_MAX_CONCURRENT_TURNS, API_MAX_IMAGE_BYTES, API_QUEUE_TIMEOUT, HISTORY_PAGE_SIZE
+from graph import turns
+from graph.builder import get_graph
+from graph.checkpointing import delete_thread, thread_exists, touch_thread
+from graph.metrics import snapshot as metrics_snapshot
+from memory.history_store import history_page
+from memory.short_term import get_state_summary
+
+logger = logging.getLogger(__name__)
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+_executor = ThreadPoolExecutor(max_workers=API_MAX_CONCURRENT_TURNS, thread_name_prefix="api-turn")
+_slots = asyncio.Semaphore(API_MAX_CONCURRENT_TURNS)
+_running = 0
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Overloaded(Exception):
+    pass
+
+
+class OrderComplete(Exception):
+    pass
+
+
+class UnknownSession(Exception):
+    pass
+
+
+class _SessionLocks:
+    """An asyncio.Lock per session that has a turn running or waiting; dropped once idle."""
+
+    def __init__(self):
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: str, timeout: float = API_QUEUE_TIMEOUT):
+        """Hold the session's lock; Overloaded if it isn't free within timeout seconds."""
+        lock, users = self._locks.get(session_id, (None, 0))
+        lock = lock or asyncio.Lock()
+        self._locks[session_id] = (lock, users + 1)
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise Overloaded()
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            lock, users = self._locks[session_id]
+            if users == 1:
+                del self._locks[session_id]
+            else:
+                self._locks[session_id] = (lock, users - 1)
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+_session_locks = _SessionLocks()
+
+
+async def run_turn(session_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking turn function for a session: serialized per session,
+    bounded per process, refused with Overloaded when the session's lock and a
+    slot aren't both had within API_QUEUE_TIMEOUT."""
+    global _running
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + API_QUEUE_TIMEOUT
+    async with _session_locks.hold(session_id):
+        try:
+            await asyncio.wait_for(_slots.acquire(), timeout=max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            raise Overloaded()
+        _running += 1
+        try:
+            return await loop.run_in_executor(_executor, fn, session_id, *args)
+        finally:
+            _running -= 1
+            _slots.release()
+
+
+def _open_order(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a turn function to refuse sessions whose order is already complete.
+    Runs inside the session lock, so no turn can complete the order in between."""
+    def guarded(session_id: str, *args: Any) -> Any:
+        if turns.load_state(session_id).get("workflow_complete"):
+            raise OrderComplete()
+        return fn(session_id, *args)
+    return guarded
+
+
+def _error(status: int, message: str, **headers: str) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status, headers=headers or None)
+
+
+async def _session_id(request: Request) -> str:
+    """The path's session id, if it was issued by POST /sessions and still exists."""
+    session_id = request.path_params["session_id"]
+    if not _SESSION_ID.match(session_id) or not await run_in_threadpool(thread_exists, session_id):
+        raise UnknownSession()
+    return session_id
+
+
+def endpoint(handler: Callable[[Request], Any]) -> Callable[[Request], Any]:
+    """Map the API's failure modes to JSON error responses."""
+    async def wrapped(request: Request) -> Response:
+        try:
+            return await handler(request)
+        except Overloaded:
+            logger.warning("API | %s | overloaded, refused", request.url.path)
+            return _error(503, "server busy, retry shortly", **{"Retry-After": "2"})
+        except UnknownSession:
+            return _error(404, "unknown session")
+        except OrderComplete:
+            return _error(409, "order already complete, POST /cancel to start a new one")
+        except BadRequest as e:
+            return _error(400, str(e))
+        except Exception as e:
+            logger.error("API | %s | ERROR: %s", request.url.path, e, exc_info=True)
+            return _error(500, "internal error")
+    return wrapped
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+@endpoint
+async def create_session(request: Request) -> Response:
+    session_id = uuid.uuid4().hex
+    await run_in_threadpool(touch_thread, session_id)
+    return JSONResponse({"session_id": session_id}, status_code=201)
+
+
+@endpoint
+async def get_session(request: Request) -> Response:
+    session_id = await _session_id(request)
+    state = await run_in_threadpool(turns.load_state, session_id)
+    result = turns.turn_result(state, "")
+    del result["response"]
+    return JSONResponse({
+        "session_id": session_id,
+        **result,
+        "progress": get_state_summary(state),
+        "messages": state.get("conversation_history") or [],
+        "messages_start": state.get("history_offset") or 0,
+    })
+
+
+@endpoint
+async def get_history(request: Request) -> Response:
+    session_id = await _session_id(request)
+    try:
+        before = int(request.query_params["before"]) if "before" in request.query_params else None
+        limit = int(request.query_params.get("limit", HISTORY_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("'before' and 'limit' must be integers")
+    if not 1 <= limit <= 200:
+        raise BadRequest("'limit' must be between 1 and 200")
+    state = await run_in_threadpool(turns.load_state, session_id)
+    if not state:
+        return JSONResponse({"messages": [], "start": 0})
+    messages, start = await run_in_threadpool(history_page, {**state, "session_id": session_id}, before, limit)
+    return JSONResponse({"messages": messages, "start": start})
+
+
+@endpoint
+async def post_message(request: Request) -> Response:
+    session_id = await _session_id(request)
+    try:
+        body = await request.json()
+    except Exception:
+        raise BadRequest("body must be JSON")
+    message = body.get("message") if isinstance(body, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise BadRequest("'message' must be a non-empty string")
+    return JSONResponse(await run_turn(session_id, _open_order(turns.send_message), message))
+
+
+@endpoint
+async def confirm(request: Request) -> Response:
+    session_id = await _session_id(request)
+    state = await run_in_threadpool(turns.load_state, session_id)
+    if not state.get("confirmation_status"):
+        return _error(409, "no order is waiting for confirmation")
+    return JSONResponse(await run_turn(session_id, _open_order(turns.confirm_order)))
+
+
+@endpoint
+async def cancel(request: Request) -> Response:
+    session_id = await _session_id(request)
+    return JSONResponse(await run_turn(session_id, turns.cancel_order))
+
+
+@endpoint
+async def upload_image(request: Request) -> Response:
+    session_id = await _session_id(request)
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type not in _IMAGE_TYPES:
+        return _error(415, f"Content-Type must be one of {', '.join(_IMAGE_TYPES)}")
+    if int(request.headers.get("content-length") or 0) > API_MAX_IMAGE_BYTES:
+        return _error(413, "image too large")
+    image = bytearray()
+    async for chunk in request.stream():
+        image += chunk
+        if len(image) > API_MAX_IMAGE_BYTES:
+            return _error(413, "image too large")
+    if not image:
+        raise BadRequest("empty image body")
+    result = await run_turn(session_id, _open_order(turns.analyze_image), bytes(image), media_type)
+    if not result["success"]:
+        return _error(422, f"could not analyze image: {result.get('error')}")
+    return JSONResponse({"response": result["response"]})
+
+
+@endpoint
+async def download_receipt(request: Request) -> Response:
+    session_id = await _session_id(request)
+    state = await run_in_threadpool(turns.load_state, session_id)
+    path = state.get("receipt_path")
+    if not path or not os.path.exists(path):
+        return _error(404, "no receipt for this session")
+    return FileResponse(path, media_type="application/pdf", filename=os.path.basename(path))
+
+
+@endpoint
+async def delete_session(request: Request) -> Response:
+    session_id = await _session_id(request)
+    async with _session_locks.hold(session_id):
+        await run_in_threadpool(delete_thread, session_id)
+    return Response(status_code=204)
+
+
+async def healthz(request: Request) -> Response:
+    return JSONResponse({"status": "ok"})
+
+
+async def metrics(request: Request) -> Response:
+    return JSONResponse({
+        "turns_running": _running,
+        "turn_slots": API_MAX_CONCURRENT_TURNS,
+        "sessions_active": len(_session_locks),
+        **metrics_snapshot(),
+    })
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    # Workers are separate processes, so each rotates its own log file
+    setup_logging(per_process=True)
+    # Compile the graph before taking traffic rather than on the first request
+    await run_in_threadpool(get_graph)
+    logger.info("API | ready | max_concurrent_turns=%s", API_MAX_CONCURRENT_TURNS)
+    yield
+    _executor.shutdown(wait=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/sessions", create_session, methods=["POST"]),
+        Route("/sessions/{session_id}", get_session, methods=["GET"]),
+        Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+        Route("/sessions/{session_id}/history", get_history, methods=["GET"]),
+        Route("/sessions/{session_id}/messages", post_message, methods=["POST"]),
+        Route("/sessions/{session_id}/confirm", confirm, methods=["POST"]),
+        Route("/sessions/{session_id}/cancel", cancel, methods=["POST"]),
+        Route("/sessions/{session_id}/images", upload_image, methods=["POST"]),
+        Route("/sessions/{session_id}/receipt", download_receipt, methods=["GET"]),
+        Route("/healthz", healthz, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
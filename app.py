@@ -1,5 +1,6 @@
 import os
 import sys
+import uuid
 import streamlit as st
 
 # ── Bootstrap path ──────────────────────────────────────────────────────────
@@ -11,10 +12,13 @@ logger = setup_logging()
 logger.info("APP | WoodWorks AI starting up")
 
 # ── Graph + State ─────────────────────────────────────────────────────────────
-from graph.builder import get_graph
+from graph import turns
 from graph.state import WoodWorksState, get_initial_state
-from memory.short_term import get_state_summary, clear_workflow_state
-from tools.db_tools import get_available_products
+from graph.metrics import chat_pipeline_report, snapshot as metrics_snapshot
+from memory.short_term import get_state_summary
+from memory.history_store import HistoryWindow
+from tools.catalog_render import get_catalog_products
+from memory.answer_cache import get_answer_cache
 
 # ── Streamlit page config ─────────────────────────────────────────────────────
 st.set_page_config(
@@ -68,18 +72,29 @@ st.markdown("""
 
 # ── Session state init ────────────────────────────────────────────────────────
 def _init_session():
-    if "graph_state" not in st.session_state:
-        st.session_state.graph_state = {}
+    if "session_id" not in st.session_state:
+        # The thread id is the key to the session's checkpointed state and
+        # history, so it is generated and kept server-side only: never read
+        # from or written to the URL, where it could be guessed or leaked.
+        st.session_state.session_id = uuid.uuid4().hex
+    restored = load_graph_state() if "chat_messages" not in st.session_state else {}
     if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []
+        # Bounded window over the session's stored transcript (sessions with
+        # no stored transcript start from graph state)
+        st.session_state.chat_messages = HistoryWindow(
+            st.session_state.session_id, seed=restored.get("conversation_history"))
+    if "earlier_messages" not in st.session_state:
+        st.session_state.earlier_messages = (0, [])   # (seq of first, messages) paged in above the window
     if "waiting_for_confirmation" not in st.session_state:
-        st.session_state.waiting_for_confirmation = False
+        st.session_state.waiting_for_confirmation = bool(
+            restored.get("confirmation_status") and not restored.get("confirmed_by_user")
+        )
     if "waiting_for_input" not in st.session_state:
         st.session_state.waiting_for_input = True
     if "order_complete" not in st.session_state:
-        st.session_state.order_complete = False
+        st.session_state.order_complete = bool(restored.get("workflow_complete"))
     if "receipt_path" not in st.session_state:
-        st.session_state.receipt_path = None
+        st.session_state.receipt_path = restored.get("receipt_path")
     if "confirmation_processing" not in st.session_state:
         st.session_state.confirmation_processing = False
     if "image_analysis_result" not in st.session_state:
@@ -88,6 +103,21 @@ def _init_session():
         st.session_state.image_processed = False
 
 
+def load_graph_state() -> dict:
+    """This session's graph state from the checkpointer (empty for a new thread)."""
+    return turns.load_state(st.session_state.session_id)
+
+
+def update_graph_state(values: dict) -> None:
+    """Write fields into this session's checkpointed state outside a graph run."""
+    turns.update_state(st.session_state.session_id, values)
+
+
+def reset_session():
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+
+
 _init_session()
 
 
@@ -98,8 +128,10 @@ def render_sidebar():
         st.markdown("*Enterprise Furniture Assistant*")
         st.divider()
 
+        graph_state = load_graph_state()
+
         # Mode badge
-        mode = st.session_state.graph_state.get("mode", "")
+        mode = graph_state.get("mode", "")
         if mode == "chat":
             st.markdown('<span class="mode-badge-chat">💬 Chat Mode</span>', unsafe_allow_html=True)
         elif mode == "workflow":
@@ -112,7 +144,7 @@ def render_sidebar():
         # Workflow progress
         if mode == "workflow":
             st.markdown("**Order Progress**")
-            state = st.session_state.graph_state
+            state = graph_state
             steps = [
                 ("👤 User Info", bool(state.get("user_info"))),
                 ("🪑 Product Selected", bool(state.get("selected_product"))),
@@ -130,7 +162,7 @@ def render_sidebar():
                     st.markdown(f'<span class="step-pending">○ {label}</span>', unsafe_allow_html=True)
 
         # User summary
-        user_info = st.session_state.graph_state.get("user_info")
+        user_info = graph_state.get("user_info")
         if user_info:
             st.divider()
             st.markdown("**Customer**")
@@ -145,7 +177,7 @@ def render_sidebar():
         # Quick product catalog
         st.markdown("**Our Catalog**")
         try:
-            products = get_available_products()
+            products = get_catalog_products()
             categories = sorted(set(p["category"] for p in products))
             for cat in categories:
                 cat_products = [p for p in products if p["category"] == cat]
@@ -155,57 +187,37 @@ def render_sidebar():
         except Exception:
             st.info("Loading catalog...")
 
+        with st.expander("⏱️ Node latency"):
+            st.json(chat_pipeline_report())
+            st.json({"answer_cache": get_answer_cache().stats()})
+            st.json(metrics_snapshot()["nodes"])
+
         st.divider()
         if st.button("🔄 Reset Session", use_container_width=True):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_session()
             st.rerun()
 
 
 # ── Graph runner ──────────────────────────────────────────────────────────────
 def run_graph(user_message: str) -> str:
-    graph = get_graph()
-    current_state = dict(st.session_state.graph_state)
-
-    history = list(current_state.get("conversation_history") or [])
-    history.append({"role": "user", "content": user_message})
-    current_state["conversation_history"] = history
-
-    # Inject new user message and reset per-turn fields
-    current_state["user_message"] = user_message
-    current_state["supervisor_issue"] = None
-    current_state.setdefault("supervisor_steps", 0)
-
-    logger.info(f"APP | run_graph | message='{user_message[:60]}...' node={current_state.get('current_node')}")
-
+    logger.info("APP | run_graph | message='%s...' thread=%s", user_message[:60], st.session_state.session_id)
     try:
-        result = graph.invoke(current_state)
-        st.session_state.graph_state = dict(result)
-        response = result.get("assistant_response", "").strip()
-
-        if not response:
-            current = result.get("current_node", "")
-            if current == "technical_spec_agent":
-                response = "Technical spec ready. Calculating stock and pricing now..."
-            elif current == "stock_pricing_agent":
-                response = "Pricing complete. Review your order summary above."
-            else:
-                response = "Processing your request, please continue..."
+        result = turns.send_message(st.session_state.session_id, user_message)
 
         # Check if waiting for confirmation
-        if result.get("confirmation_status") and not result.get("confirmed_by_user"):
+        if result["waiting_for_confirmation"]:
             st.session_state.waiting_for_confirmation = True
 
         # Check if receipt is ready
-        if result.get("receipt_path"):
-            st.session_state.receipt_path = result.get("receipt_path")
+        if result["receipt_path"]:
+            st.session_state.receipt_path = result["receipt_path"]
 
-        if result.get("workflow_complete"):
+        if result["order_complete"]:
             st.session_state.order_complete = True
 
-        return response
+        return result["response"]
     except Exception as e:
-        logger.error(f"APP | run_graph | ERROR: {e}")
+        logger.error("APP | run_graph | ERROR: %s", e)
         return f"⚠️ An error occurred: {str(e)}. Please try again."
 
 
@@ -220,36 +232,17 @@ def handle_confirmation():
 
     st.session_state.waiting_for_confirmation = False
 
-    st.session_state.graph_state["confirmed_by_user"] = True
-    st.session_state.graph_state["confirmation_status"] = True
-    st.session_state.graph_state["supervisor_issue"] = None
-    st.session_state.graph_state["user_message"] = "CONFIRMED"
-
-    state = dict(st.session_state.graph_state)
-
-    logger.info(
-        f"APP | handle_confirmation | invoking graph with "
-        f"confirmed_by_user={state.get('confirmed_by_user')} "
-        f"order_id={state.get('order_id')} "
-        f"receipt_path={state.get('receipt_path')}"
-    )
-
-    graph = get_graph()
+    logger.info("APP | handle_confirmation | thread=%s", st.session_state.session_id)
     try:
-        result = graph.invoke(state)
-        st.session_state.graph_state = dict(result)
-
-        response = result.get("assistant_response", "").strip()
-        if not response:
-            response = "Processing your order... please wait a moment."
+        result = turns.confirm_order(st.session_state.session_id)
 
-        if result.get("receipt_path"):
-            st.session_state.receipt_path = result.get("receipt_path")
+        if result["receipt_path"]:
+            st.session_state.receipt_path = result["receipt_path"]
 
-        st.session_state.order_complete = result.get("workflow_complete", False)
-        st.session_state.chat_messages.append({"role": "assistant", "content": response})
+        st.session_state.order_complete = result["order_complete"]
+        st.session_state.chat_messages.append({"role": "assistant", "content": result["response"]})
     except Exception as e:
-        logger.error(f"APP | handle_confirmation | ERROR: {e}")
+        logger.error("APP | handle_confirmation | ERROR: %s", e)
         st.error(f"Error confirming order: {e}")
         st.session_state.waiting_for_confirmation = True
     finally:
@@ -259,6 +252,7 @@ def handle_confirmation():
 # ── Main UI ───────────────────────────────────────────────────────────────────
 def main():
     render_sidebar()
+    graph_state = load_graph_state()
 
     # Header
     st.markdown('<p class="main-header">🪵 WoodWorks AI</p>', unsafe_allow_html=True)
@@ -276,14 +270,22 @@ def main():
                 "How can I assist you today?"
             )
 
-    # Chat history
-    for msg in st.session_state.chat_messages:
+    # Chat history — older messages are read back from the history store on request
+    chat = st.session_state.chat_messages
+    earlier_start, earlier = st.session_state.earlier_messages
+    if earlier_start + len(earlier) != chat.start:   # the window moved on; page afresh
+        earlier_start, earlier = chat.start, []
+    if earlier_start > 0 and st.button("⬆️ Show earlier messages", key="show_earlier_btn"):
+        page = chat.earlier(earlier_start)
+        st.session_state.earlier_messages = (earlier_start - len(page), page + earlier)
+        st.rerun()
+    for msg in [*earlier, *chat]:
         with st.chat_message(msg["role"]):
             st.markdown(msg["content"])
 
     if (st.session_state.waiting_for_confirmation
             and not st.session_state.get("confirmation_processing")
-            and not st.session_state.graph_state.get("confirmed_by_user")):
+            and not graph_state.get("confirmed_by_user")):
         st.divider()
         col1, col2 = st.columns([1, 1])
         with col1:
@@ -294,18 +296,16 @@ def main():
         with col2:
             if st.button("❌ Cancel Order", use_container_width=True):
                 st.session_state.waiting_for_confirmation = False
-                cancel_msg = "Order cancelled. Feel free to start a new order or ask me anything!"
-                st.session_state.chat_messages.append({"role": "assistant", "content": cancel_msg})
                 # Reset workflow state
-                state = dict(st.session_state.graph_state)
-                st.session_state.graph_state = clear_workflow_state(state)
+                cancel_msg = turns.cancel_order(st.session_state.session_id)["response"]
+                st.session_state.chat_messages.append({"role": "assistant", "content": cancel_msg})
                 st.rerun()
 
     # Receipt download
     if st.session_state.receipt_path and os.path.exists(st.session_state.receipt_path):
         st.divider()
         with open(st.session_state.receipt_path, "rb") as f:
-            order_id = st.session_state.graph_state.get("order_id", "")
+            order_id = graph_state.get("order_id", "")
             st.download_button(
                 label=f"📥 Download Receipt — Order #{order_id}",
                 data=f,
@@ -331,60 +331,21 @@ def main():
                 file_key = f"analyzed_{uploaded_file.name}_{uploaded_file.size}"
                 if not st.session_state.get(file_key):
                     with st.spinner("Analyzing image..."):
-                        image_bytes = uploaded_file.read()
-                        media_type = uploaded_file.type  # already a MIME string
-
-                        current_mode = st.session_state.graph_state.get(
-                            "mode", "")
-
-                        if current_mode == "workflow":
-                            from tools.image_search import process_image_for_workflow
-                            result = process_image_for_workflow(
-                                image_bytes, media_type)
-
-                            if result["success"]:
-                                st.session_state.image_analysis_result = result
-                                st.session_state.graph_state[
-                                    "image_spec_hint"] = result["human_spec_hint"]
-                                st.session_state[file_key] = True
-                                msg = result["workflow_message"]
-                                st.session_state.chat_messages.append(
-                                    {"role": "assistant", "content": msg})
-                                st.success("Image analyzed — specs pre-filled!")
-                            else:
-                                st.error(f"Could not analyze image: "
-                                         f"{result.get('error')}")
+                        result = turns.analyze_image(
+                            st.session_state.session_id, uploaded_file.read(), uploaded_file.type)
+
+                    if result["success"]:
+                        st.session_state.image_analysis_result = result
+                        st.session_state[file_key] = True
+                        st.session_state.chat_messages.append(
+                            {"role": "assistant", "content": result["response"]})
+                        if graph_state.get("mode") == "workflow":
+                            st.success("Image analyzed — specs pre-filled!")
                         else:
-                            from tools.image_search import process_image_for_chat
-                            result = process_image_for_chat(
-                                image_bytes, media_type)
-
-                            if result["success"]:
-                                st.session_state.image_analysis_result = result
-                                analysis_message = result["chat_response"]
-
-                                # Append to UI messages
-                                st.session_state.chat_messages.append(
-                                    {"role": "assistant", "content": analysis_message})
-
-                                # Sync to LangGraph conversation_history so chat agent sees it
-                                history = list(
-                                    st.session_state.graph_state.get(
-                                        "conversation_history") or [])
-                                history.append(
-                                    {"role": "assistant", "content": analysis_message})
-                                st.session_state.graph_state[
-                                    "conversation_history"] = history
-
-                                # Store structured hint for reasoning/response nodes
-                                st.session_state.graph_state[
-                                    "image_spec_hint"] = result["analysis"]
-
-                                st.session_state[file_key] = True
-                                st.rerun()
-                            else:
-                                st.error(f"Could not analyze image: "
-                                         f"{result.get('error')}")
+                            st.rerun()
+                    else:
+                        st.error(f"Could not analyze image: "
+                                 f"{result.get('error')}")
 
     # Chat input
     if not st.session_state.order_complete:
@@ -396,11 +357,9 @@ def main():
                 st.markdown(user_input)
 
             # Handle cancel
-            if user_input.strip().lower() in ["cancel", "cancel order", "stop"]:
-                state = dict(st.session_state.graph_state)
-                st.session_state.graph_state = clear_workflow_state(state)
+            if user_input.strip().lower() in turns.CANCEL_WORDS:
+                response = turns.cancel_order(st.session_state.session_id)["response"]
                 st.session_state.waiting_for_confirmation = False
-                response = "Order cancelled. Feel free to start fresh or ask me anything!"
                 st.session_state.chat_messages.append({"role": "assistant", "content": response})
                 with st.chat_message("assistant"):
                     st.markdown(response)
@@ -415,8 +374,7 @@ def main():
     else:
         st.success("🎉 Order complete! Thank you for choosing WoodWorks AI.")
         if st.button("🆕 Start New Order", use_container_width=True):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_session()
             st.rerun()
 
 
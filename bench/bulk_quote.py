@@ -0,0 +1,114 @@
+"""
+Throughput of bulk quoting (tools/bulk_quote.py): a price list of N lines
+drawn from every catalog product crossed with sizes, finishes, species and
+quantities, read from CSV, quoted and written back as CSV and as JSONL, all
+in memory.
+
+    python -m bench.bulk_quote --lines 100000
+
+Also quotes a sample of lines one at a time with price_order() (the chat
+workflow's path) and checks the totals match to the cent. Runs against a
+throwaway SQLite file unless DATABASE_URL is already set.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_bulk_quote.db")
+
+import argparse
+import csv
+import io
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List
+
+from database.seed_data import seed_products
+from database.session import init_db
+from tools.bulk_quote import CONFIG_COLUMNS, quote_chunks, quote_configs, read_configs, write_quotes
+from tools.db_tools import get_available_products
+from tools.pricing_engine import price_order
+
+_SIZES = ["", "72in x 36in x 30in", "60 x 40 x 30", "1800 x 900 x 760 mm", "120in x 48in x 30in", "30 x 20 x 18 in"]
+_SPECIES = ["", "oak", "walnut", "cherry", "maple", "teak"]
+_JOINERY = ["", "dovetail", "pocket screws", "mortise and tenon"]
+_HARDWARE = ["", "soft-close hinges", "brass pulls", "soft-close hinges, brass pulls, push-to-open latches"]
+
+
+def _configs(lines: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    products = get_available_products()
+    finishes = {p["product_id"]: [f.strip() for f in (p["finish_options"] or "").split(",")] + ["High-gloss lacquer"]
+                for p in products}
+    rows = []
+    for _ in range(lines):
+        product_id = rng.choice(products)["product_id"]
+        rows.append({
+            "product_id": product_id,
+            "dimensions": rng.choice(_SIZES),
+            "finish": rng.choice(finishes[product_id]),
+            "species": rng.choice(_SPECIES),
+            "quantity": rng.choice([1, 1, 2, 4, 5, 12, 40]),
+            "joinery": rng.choice(_JOINERY),
+            "hardware": rng.choice(_HARDWARE),
+        })
+    return rows
+
+
+def _to_csv(rows: List[Dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CONFIG_COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _check_parity(rows: List[Dict[str, Any]], sample: int) -> Dict[str, Any]:
+    """Bulk totals against price_order() on the same lines; returns timing and mismatches."""
+    rows = rows[:sample]
+    products = {p["product_id"]: p for p in get_available_products()}
+    start = time.perf_counter()
+    scalar = [
+        price_order(
+            products[row["product_id"]],
+            {"dimensions": row["dimensions"], "finish": row["finish"], "quantity": row["quantity"]},
+            {"wood_species": row["species"], "joinery_method": row["joinery"], "hardware": row["hardware"]},
+        )["total_price"]
+        for row in rows
+    ]
+    scalar_s = time.perf_counter() - start
+    bulk = [result["total_price"] for result in quote_configs(rows)]
+    mismatches = sum(1 for a, b in zip(scalar, bulk) if round(a * 100) != round(b * 100))
+    return {"lines": len(rows), "price_order_us_per_line": round(scalar_s / len(rows) * 1e6, 1), "mismatches": mismatches}
+
+
+def run(lines: int, seed: int, sample: int) -> Dict[str, Any]:
+    init_db()
+    seed_products()
+    rows = _configs(lines, seed)
+    source = _to_csv(rows)
+    report: Dict[str, Any] = {"lines": lines}
+
+    start = time.perf_counter()
+    for _ in quote_chunks(rows):
+        pass
+    report["quote_only_s"] = round(time.perf_counter() - start, 3)
+
+    for fmt in ("csv", "jsonl"):
+        out = io.StringIO()
+        start = time.perf_counter()
+        write_quotes(quote_chunks(read_configs(io.StringIO(source), "csv")), out, fmt)
+        report[f"csv_to_{fmt}_s"] = round(time.perf_counter() - start, 3)
+    report["parity"] = _check_parity(rows, sample)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk quoting.")
+    parser.add_argument("--lines", type=int, default=100_000, help="price-list lines to quote")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sample", type=int, default=2000, help="lines to cross-check against price_order()")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(run(args.lines, args.seed, args.sample), indent=2))
@@ -0,0 +1,285 @@
+"""
+End-to-end load and latency benchmark for the graph.
+
+Scripted customer personas hold whole conversations through get_graph()
+(via graph/turns.py, with the SQLite checkpointer), chat-only browsing as
+well as full orders through confirmation, against a stubbed LLM
+(bench/stub_llm.py) with configurable latency.
+
+    python -m bench.e2e --concurrency 1 10 100 --llm-latency-ms 200 --out bench_e2e.json
+    python -m bench.e2e --out current.json --baseline bench_e2e.json
+
+Per concurrency level it reports turn latency p50/p95/p99 (overall and per
+persona), per-node p50/p95/p99 (graph.metrics), throughput in turns and
+sessions per second, database time per turn (SQLAlchemy statements plus
+checkpointer reads/writes) and LLM calls per turn. A separate sequential
+pass under tracemalloc reports allocations per turn. With --baseline, turn
+latency, throughput, DB time and allocations are compared against a saved
+report; changes worse than --tolerance are listed and the exit status is 1.
+Runs against a throwaway database and checkpoint file unless DATABASE_URL /
+CHECKPOINT_DB are set.
+"""
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/bench_e2e.db")
+os.environ.setdefault("CHECKPOINT_DB", os.path.join(_tmp, "checkpoints.db"))
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, update
+
+from bench import stub_llm
+from database.seed_data import seed_products
+from database.models import ProductItem
+from database.session import engine, init_db
+from graph import metrics, turns
+from graph.builder import get_graph
+from graph.checkpointing import get_checkpointer
+
+CONFIRM = "<confirm>"
+
+# Persona → script; {n} is the session number, so every buyer is a distinct customer
+PERSONAS: Dict[str, List[str]] = {
+    "browser": [
+        "Hi, what kinds of furniture do you make?",
+        "What woods do you use?",
+        "Do you ship to Canada?",
+        "How long does delivery usually take?",
+    ],
+    "buyer": [
+        "I'd like to order a dining table",
+        "I'm Dana, dana{n}@example.com",
+        "The Farmhouse Dining Table please",
+        "Sounds good",
+        "72 x 36 x 30 in, finish: Walnut Stain, 2 units",
+        "What's the total?",
+        CONFIRM,
+    ],
+    "negotiator": [
+        "I want to buy a bed",
+        "My name is Sam",
+        "The Platform Bed Frame",
+        "Great",
+        "80 x 60 in, finish: Natural, 1 unit",
+        "What's the total?",
+        "That's too expensive, can you do a discount?",
+        CONFIRM,
+    ],
+}
+
+
+class _Timer:
+    """Thread-safe accumulator of (seconds, count)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds += seconds
+            self.count += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.seconds, self.count = 0.0, 0
+
+
+_db = _Timer()
+_statement_start = threading.local()
+
+
+def _instrument_db() -> None:
+    """Time every SQLAlchemy statement and every checkpointer read/write."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(*args):
+        _statement_start.t = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(*args):
+        _db.add(time.perf_counter() - _statement_start.t)
+
+    saver = get_checkpointer()
+    for name in ("get_tuple", "put", "put_writes", "list"):
+        method = getattr(saver, name)
+
+        def timed(*args, _method=method, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _db.add(time.perf_counter() - start)
+        setattr(saver, name, timed)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+    return {f"p{pct}_ms": round(pick(pct) * 1000, 1) for pct in (50, 95, 99)}
+
+
+def _turn(session_id: str, step: str) -> Callable[[], Any]:
+    if step == CONFIRM:
+        return lambda: turns.confirm_order(session_id)
+    return lambda: turns.send_message(session_id, step)
+
+
+def run_session(persona: str, n: int) -> Tuple[List[float], int, bool]:
+    """Play one persona's script; returns per-turn seconds, errors, and whether an order completed."""
+    session_id = f"bench-{persona}-{uuid.uuid4().hex[:12]}"
+    latencies, errors, complete = [], 0, False
+    for step in PERSONAS[persona]:
+        start = time.perf_counter()
+        try:
+            result = _turn(session_id, step.format(n=n))()
+            complete = complete or result["order_complete"]
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors, complete
+
+
+def _restock(quantity: int = 1_000_000) -> None:
+    """Orders deplete stock; refill so every level runs the same conversations."""
+    with engine.begin() as conn:
+        conn.execute(update(ProductItem).values(stock_quantity=quantity))
+
+
+def run_level(concurrency: int, sessions: int, stub: stub_llm.StubLLM) -> Dict[str, Any]:
+    _restock()
+    metrics.reset()
+    _db.reset()
+    calls_before = stub.calls
+    personas = [list(PERSONAS)[i % len(PERSONAS)] for i in range(sessions)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(run_session, personas, range(sessions)))
+    wall = time.perf_counter() - start
+
+    by_persona: Dict[str, List[float]] = {}
+    for persona, (latencies, _, _) in zip(personas, results):
+        by_persona.setdefault(persona, []).extend(latencies)
+    all_turns = [t for latencies in by_persona.values() for t in latencies]
+    nodes = metrics.snapshot()["nodes"]
+    return {
+        "sessions": sessions,
+        "turns": len(all_turns),
+        "errors": sum(errors for _, errors, _ in results),
+        "orders_completed": sum(1 for _, _, complete in results if complete),
+        "wall_s": round(wall, 2),
+        "turns_per_s": round(len(all_turns) / wall, 2),
+        "sessions_per_s": round(sessions / wall, 2),
+        "turn": _percentiles(all_turns),
+        "turn_by_persona": {persona: _percentiles(values) for persona, values in by_persona.items()},
+        "db_ms_per_turn": round(_db.seconds / len(all_turns) * 1000, 2),
+        "db_calls_per_turn": round(_db.count / len(all_turns), 1),
+        "llm_calls_per_turn": round((stub.calls - calls_before) / len(all_turns), 2),
+        "nodes": {
+            name: {key: stats[key] for key in ("calls", "p50_ms", "p95_ms", "p99_ms")}
+            for name, stats in sorted(nodes.items())
+        },
+    }
+
+
+def measure_allocations() -> Dict[str, float]:
+    """Allocations per turn (KiB) for one session of each persona, run sequentially."""
+    per_turn, peaks = [], []
+    tracemalloc.start()
+    for persona in PERSONAS:
+        session_id = f"bench-alloc-{persona}-{uuid.uuid4().hex[:12]}"
+        for step in PERSONAS[persona]:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            _turn(session_id, step.format(n="alloc"))()
+            current, peak = tracemalloc.get_traced_memory()
+            per_turn.append(current - before)
+            peaks.append(peak - before)
+    tracemalloc.stop()
+    return {
+        "retained_kib_per_turn": round(sum(per_turn) / len(per_turn) / 1024, 1),
+        "peak_kib_per_turn": round(sum(peaks) / len(peaks) / 1024, 1),
+        "max_peak_kib": round(max(peaks) / 1024, 1),
+    }
+
+
+def run(levels: List[int], latency_ms: float, jitter_ms: float, sessions_per_worker: int) -> Dict[str, Any]:
+    init_db()
+    seed_products()
+    stub = stub_llm.install(latency_ms, jitter_ms, seed=42)
+    get_graph()
+    _instrument_db()
+    run_session("browser", 0)  # warm caches before measuring
+
+    report: Dict[str, Any] = {
+        "llm_latency_ms": latency_ms,
+        "llm_jitter_ms": jitter_ms,
+        "levels": {
+            str(level): run_level(level, max(level * sessions_per_worker, len(PERSONAS)), stub)
+            for level in levels
+        },
+    }
+    report["allocations"] = measure_allocations()
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> Dict[str, Any]:
+    """Deltas against a saved report; a change counts as a regression when it is worse by more than tolerance."""
+    checks: List[Tuple[str, float, float, bool]] = []   # (name, baseline, current, higher_is_worse)
+    for level, current in report["levels"].items():
+        old = baseline.get("levels", {}).get(level)
+        if not old:
+            continue
+        for pct in ("p50_ms", "p95_ms", "p99_ms"):
+            checks.append((f"{level}.turn_{pct}", old["turn"][pct], current["turn"][pct], True))
+        checks.append((f"{level}.turns_per_s", old["turns_per_s"], current["turns_per_s"], False))
+        checks.append((f"{level}.db_ms_per_turn", old["db_ms_per_turn"], current["db_ms_per_turn"], True))
+    if "allocations" in baseline:
+        key = "peak_kib_per_turn"
+        checks.append((f"allocations.{key}", baseline["allocations"][key], report["allocations"][key], True))
+
+    deltas, regressions = {}, []
+    for name, old, new, higher_is_worse in checks:
+        change = (new - old) / old if old else 0.0
+        deltas[name] = {"baseline": old, "current": new, "change_pct": round(change * 100, 1)}
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(name)
+    return {"deltas": deltas, "regressions": regressions}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end graph load and latency benchmark.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100], help="concurrent sessions")
+    parser.add_argument("--sessions-per-worker", type=int, default=2, help="sessions per level = concurrency x this")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="stubbed LLM latency per call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0, help="uniform +/- jitter on that latency")
+    parser.add_argument("--out", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare against a report saved with --out")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    report = run(args.concurrency, args.llm_latency_ms, args.llm_jitter_ms, args.sessions_per_worker)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["vs_baseline"] = compare(report, json.load(f), args.tolerance)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and report["vs_baseline"]["regressions"]:
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""
+Per-turn logging overhead: synchronous handlers vs the queue pipeline.
+
+Plays the bench.e2e personas sequentially against a zero-latency stub LLM,
+each mode in a fresh interpreter with stderr discarded:
+
+    off    logging disabled (the baseline)
+    sync   the former setup: StreamHandler + FileHandler on the root logger,
+           formatted and written on the calling thread
+    queue  config.logging_config.setup_logging(): QueueHandler on the
+           caller, console + rotating JSON file on the listener thread
+
+and reports ms per turn and its overhead over "off", the time the calling
+thread spent inside log handlers per turn (the part that sits on the request
+path, measured directly since it is small next to run-to-run noise), records
+per turn, and for "queue" how long the listener needed to drain after the
+last turn. It also
+times a call below the enabled level with f-string vs %-style arguments,
+which is what switching hot-path call sites to lazy formatting saves.
+
+    python -m bench.logging_overhead --sessions 30 --repeat 3
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Any, Dict, List
+
+MODES = ("off", "sync", "queue")
+
+
+def _setup(mode: str, log_file: str) -> None:
+    if mode == "off":
+        logging.disable(logging.CRITICAL)
+    elif mode == "sync":
+        from config.logging_config import DATE_FORMAT, LOG_FORMAT
+        logging.basicConfig(
+            level=logging.INFO,
+            format=LOG_FORMAT,
+            datefmt=DATE_FORMAT,
+            handlers=[logging.StreamHandler(), logging.FileHandler(log_file, mode="a", encoding="utf-8")],
+        )
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    else:
+        from config.logging_config import setup_logging
+        setup_logging()
+
+
+def _time_handlers() -> List[float]:
+    """Accumulate the time the calling thread spends handing records to handlers."""
+    spent = [0.0]
+    call_handlers = logging.Logger.callHandlers
+
+    def timed(self, record):
+        start = time.perf_counter()
+        try:
+            call_handlers(self, record)
+        finally:
+            spent[0] += time.perf_counter() - start
+    logging.Logger.callHandlers = timed
+    return spent
+
+
+def run_child(mode: str, sessions: int) -> Dict[str, Any]:
+    """Runs in the child interpreter (LOG_FILE already points at a temp file)."""
+    from bench import e2e, stub_llm   # first: points DATABASE_URL / CHECKPOINT_DB at a temp dir
+    from database.seed_data import seed_products
+    from database.session import init_db
+    from graph.builder import get_graph
+
+    log_file = os.environ["LOG_FILE"]
+    _setup(mode, log_file)
+    init_db()
+    seed_products()
+    stub_llm.install(latency_ms=0)
+    get_graph()
+    e2e._restock()
+    e2e.run_session("browser", 0)  # warm caches before measuring
+
+    personas = list(e2e.PERSONAS)
+    turns = 0
+    in_handlers = _time_handlers()
+    start = time.perf_counter()
+    for n in range(sessions):
+        latencies, _, _ = e2e.run_session(personas[n % len(personas)], n + 1)
+        turns += len(latencies)
+    elapsed = time.perf_counter() - start
+
+    drain = 0.0
+    if mode == "queue":
+        from config.logging_config import stop_logging
+        drain_start = time.perf_counter()
+        stop_logging()
+        drain = time.perf_counter() - drain_start
+    logging.shutdown()
+
+    records = 0
+    if os.path.exists(log_file):
+        with open(log_file, encoding="utf-8") as f:
+            records = sum(1 for _ in f)
+    return {
+        "turns": turns,
+        "ms_per_turn": elapsed / turns * 1000,
+        "handler_ms_per_turn": in_handlers[0] / turns * 1000,
+        "records": records,
+        "drain_ms": drain * 1000,
+    }
+
+
+def _spawn(mode: str, sessions: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "LOG_FILE": os.path.join(tmp, "app.log"), "LOG_LEVEL": "INFO"}
+        env.pop("DATABASE_URL", None)
+        env.pop("CHECKPOINT_DB", None)
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.logging_overhead", "--child", mode, "--sessions", str(sessions)],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def lazy_vs_eager(calls: int = 200_000) -> Dict[str, float]:
+    """ns per logger.debug() call at INFO level, f-string vs %-style arguments."""
+    logger = logging.getLogger("bench.lazy")
+    logger.setLevel(logging.INFO)
+    env = {"logger": logger, "product_id": 42, "stock_result": {"available": True, "stock": 12, "reserved": 3}}
+    eager = timeit.timeit(
+        'logger.debug(f"TOOL | check_inventory | product_id={product_id} result={stock_result}")',
+        globals=env, number=calls,
+    )
+    lazy = timeit.timeit(
+        'logger.debug("TOOL | check_inventory | product_id=%s result=%s", product_id, stock_result)',
+        globals=env, number=calls,
+    )
+    return {"eager_ns": round(eager / calls * 1e9), "lazy_ns": round(lazy / calls * 1e9)}
+
+
+def run(sessions: int, repeat: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"sessions": sessions, "modes": {}}
+    for mode in MODES:
+        # Best of `repeat` runs: the overhead is small next to run-to-run noise
+        report["modes"][mode] = min((_spawn(mode, sessions) for _ in range(repeat)), key=lambda r: r["ms_per_turn"])
+    baseline = report["modes"]["off"]["ms_per_turn"]
+    for mode, result in report["modes"].items():
+        result["overhead_ms_per_turn"] = result["ms_per_turn"] - baseline
+        result["records_per_turn"] = result["records"] / result["turns"]
+    report["below_level_call"] = lazy_vs_eager()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-turn logging overhead benchmark.")
+    parser.add_argument("--sessions", type=int, default=30, help="persona sessions per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode (best is kept)")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.sessions)))
+        sys.exit(0)
+
+    report = run(args.sessions, args.repeat)
+    print(f"{'mode':<6} {'ms/turn':>8} {'overhead':>9} {'in handlers':>12} {'records/turn':>13} {'drain ms':>9}")
+    for mode, r in report["modes"].items():
+        print(f"{mode:<6} {r['ms_per_turn']:>8.2f} {r['overhead_ms_per_turn']:>+9.3f} "
+              f"{r['handler_ms_per_turn']:>12.3f} {r['records_per_turn']:>13.1f} {r['drain_ms']:>9.1f}")
+    calls = report["below_level_call"]
+    print(f"\ndisabled-level call: f-string {calls['eager_ns']} ns, %-style {calls['lazy_ns']} ns")
@@ -0,0 +1,114 @@
+"""
+Memory held by live sessions: unbounded history vs the bounded window.
+
+Builds --sessions sessions that have each exchanged --messages messages and
+holds what the server keeps per live session: the UI transcript and the
+graph state's conversation_history as loaded for a turn.
+
+    unbounded  both lists hold every message (the former behaviour)
+    bounded    memory.history_store.HistoryWindow for the UI, and the graph
+               window kept under HISTORY_MAX_MESSAGES with spill_oldest(),
+               everything older in the history store
+
+Each mode runs in a fresh interpreter. It reports RSS growth per 1,000
+sessions, the serialized size of a session's graph history (what the
+checkpointer reads and writes every turn), and the history store's size on
+disk.
+
+    python -m bench.session_memory --sessions 1000 --messages 120
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+MODES = ("unbounded", "bounded")
+
+_WORDS = (
+    "walnut oak maple cherry finish stain dovetail joinery table chair bed frame dresser delivery "
+    "order price quote dimensions inches satin matte natural custom drawer shelf cabinet legs"
+).split()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _message(session: int, n: int) -> Dict[str, str]:
+    rng = random.Random(session * 100_003 + n)
+    text = " ".join(rng.choice(_WORDS) for _ in range(30))
+    return {"role": "user" if n % 2 == 0 else "assistant", "content": f"[{session}:{n}] {text}"}
+
+
+def run_child(mode: str, sessions: int, messages: int) -> Dict[str, Any]:
+    from memory.history_store import HistoryWindow, history_overflow, spill_oldest
+
+    gc.collect()
+    base = _rss_bytes()
+    start = time.perf_counter()
+    live = []
+    for s in range(sessions):
+        session_id = f"bench-{s}"
+        state: Dict[str, Any] = {"session_id": session_id, "conversation_history": [], "history_offset": 0}
+        ui = [] if mode == "unbounded" else HistoryWindow(session_id)
+        for n in range(messages):
+            message = _message(s, n)
+            ui.append(message)
+            state["conversation_history"].append(dict(message))  # a separate copy, as loaded from a checkpoint
+            if mode == "bounded":
+                overflow = history_overflow(state)
+                if overflow:
+                    state["history_offset"] = spill_oldest(state, overflow)
+                    del state["conversation_history"][:overflow]
+        live.append((ui, state))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    grown = _rss_bytes() - base
+
+    db = os.environ["HISTORY_DB"]
+    disk = sum(os.path.getsize(p) for p in (db, f"{db}-wal") if os.path.exists(p))
+    state_bytes = sum(len(json.dumps(state["conversation_history"])) for _, state in live) / sessions
+    return {
+        "rss_mb_per_1000_sessions": round(grown / sessions * 1000 / 2**20, 1),
+        "state_history_kb_per_session": round(state_bytes / 1024, 1),
+        "messages_in_memory_per_session": round(sum(len(ui) + len(st["conversation_history"]) for ui, st in live) / sessions, 1),
+        "store_mb_on_disk": round(disk / 2**20, 1),
+        "build_s": round(elapsed, 2),
+    }
+
+
+def _spawn(mode: str, sessions: int, messages: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "HISTORY_DB": os.path.join(tmp, "history.db")}
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.session_memory", "--child", mode,
+             "--sessions", str(sessions), "--messages", str(messages)],
+            env=env, stdout=subprocess.PIPE, check=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-session history memory benchmark.")
+    parser.add_argument("--sessions", type=int, default=1000, help="live sessions")
+    parser.add_argument("--messages", type=int, default=120, help="messages exchanged per session")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.sessions, args.messages)))
+        sys.exit(0)
+
+    report = {mode: _spawn(mode, args.sessions, args.messages) for mode in MODES}
+    print(json.dumps({"sessions": args.sessions, "messages": args.messages, "modes": report}, indent=2))
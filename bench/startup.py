@@ -0,0 +1,134 @@
+"""
+Cold-start cost of the app's graph: import time of graph.builder measured
+with `python -X importtime`, plus wall time to the first compiled graph, each
+in a fresh interpreter.
+
+    python -m bench.startup --runs 5
+    python -m bench.startup --save bench/startup_baseline.json
+    python -m bench.startup --baseline bench/startup_baseline.json
+
+Reports the median over runs, the slowest imported packages, how many times
+the graph was compiled, and whether any dependency that should be deferred to
+first use (the Groq SDK, reportlab) was imported at startup. Runs against a
+throwaway SQLite database and checkpoint file.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+DEFERRED = ("groq", "reportlab")
+
+_FIRST_GRAPH = """
+import json, logging, sys, time
+logging.disable(logging.INFO)
+start = time.perf_counter()
+import graph.builder as builder
+imported = time.perf_counter()
+builds = []
+_build = builder.build_graph
+builder.build_graph = lambda *a, **kw: builds.append(1) or _build(*a, **kw)
+builder.get_graph()
+builder.get_graph()
+compiled = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_graph_ms": (compiled - start) * 1000,
+    "compiles": len(builds),
+    "deferred_loaded": sorted({m.split(".")[0] for m in sys.modules} & set(%r)),
+}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    tmp = tempfile.mkdtemp()
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench_startup.db")
+    env["CHECKPOINT_DB"] = os.path.join(tmp, "checkpoints.db")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def _importtime(env: Dict[str, str]) -> Tuple[float, Dict[str, float]]:
+    """Total import time (ms) of graph.builder and self time (ms) summed per top-level package."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import graph.builder"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total, packages = 0.0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        if len(name) - len(name.lstrip()) == 1:  # top-level import
+            total += int(cumulative) / 1000
+        root = name.strip().split(".")[0]
+        packages[root] = packages.get(root, 0.0) + int(own) / 1000
+    return total, packages
+
+
+def _first_graph(env: Dict[str, str]) -> Dict[str, object]:
+    proc = subprocess.run(
+        [sys.executable, "-c", _FIRST_GRAPH % (DEFERRED,)],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int, top: int) -> Dict[str, object]:
+    env = _env()
+    totals: List[float] = []
+    package_samples: Dict[str, List[float]] = {}
+    first: List[Dict[str, object]] = []
+    for _ in range(runs):
+        total, packages = _importtime(env)
+        totals.append(total)
+        for name, ms in packages.items():
+            package_samples.setdefault(name, []).append(ms)
+        first.append(_first_graph(env))
+
+    slowest = sorted(
+        ((name, statistics.median(values)) for name, values in package_samples.items()),
+        key=lambda item: item[1], reverse=True,
+    )[:top]
+    return {
+        "runs": runs,
+        "importtime_ms": round(statistics.median(totals), 1),
+        "import_wall_ms": round(statistics.median(r["import_ms"] for r in first), 1),
+        "first_graph_ms": round(statistics.median(r["first_graph_ms"] for r in first), 1),
+        "compiles": max(r["compiles"] for r in first),
+        "deferred_loaded": sorted({m for r in first for m in r["deferred_loaded"]}),
+        "slowest_packages_ms": {name: round(ms, 1) for name, ms in slowest},
+    }
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object]) -> Dict[str, object]:
+    keys = ("importtime_ms", "import_wall_ms", "first_graph_ms")
+    return {
+        key: {"baseline": baseline[key], "current": report[key], "delta": round(report[key] - baseline[key], 1)}
+        for key in keys if key in baseline
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark graph cold-start time.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list")
+    parser.add_argument("--save", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare against a report saved with --save")
+    args = parser.parse_args()
+
+    report = run(args.runs, args.top)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["vs_baseline"] = compare(report, json.load(f))
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,145 @@
+"""
+Per-turn cost of graph state updates: nodes returning only the keys they
+change (with the conversation_history append reducer) against the legacy
+pattern of every node returning a full {**state, ...} copy and rebuilding the
+history list.
+
+Both variants run the chat pipeline's node sequence on a checkpointed thread
+already holding 10, 100 and 1000 turns, and report per turn:
+  - alloc_kib:     memory allocated during the turn (tracemalloc)
+  - serialized_kib: bytes of node updates through the checkpoint serializer
+  - serialize_ms:  time spent serializing those updates
+  - turn_ms:       wall time of the turn (without tracemalloc)
+
+    python -m bench.state_updates --turns 10 100 1000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from typing_extensions import TypedDict
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, StateGraph
+
+from graph.state import WoodWorksState
+
+_PIPELINE = ["intent_decider", "answer_cache", "data_retrieval", "reasoning", "response_generator"]
+_CONTEXT = "Oak Dining Table | Dining | solid oak | $1,200 | in stock\n" * 20
+_ANSWER = "Our oak dining tables are made from solid, kiln-dried oak. " * 4
+
+# Same fields as WoodWorksState, but history is a plain last-value channel
+_LegacyState = TypedDict(
+    "_LegacyState",
+    {**WoodWorksState.__annotations__, "conversation_history": Optional[List[Dict[str, Any]]]},
+    total=False,
+)
+
+_serde = JsonPlusSerializer()
+_serialized = {"bytes": 0, "seconds": 0.0}
+
+
+def _measured(fn: Callable[[Any], Dict[str, Any]]) -> Callable[[Any], Dict[str, Any]]:
+    def node(state):
+        update = fn(state)
+        start = time.perf_counter()
+        _serialized["bytes"] += len(_serde.dumps_typed(update)[1])
+        _serialized["seconds"] += time.perf_counter() - start
+        return update
+    return node
+
+
+def _legacy_node(name: str):
+    def node(state):
+        return {**state, "current_node": name, "retrieved_context": _CONTEXT, "reasoning_output": _ANSWER}
+    return node
+
+
+def _legacy_store(state):
+    existing = state.get("conversation_history") or []
+    return {**state, "conversation_history": existing + [{"role": "assistant", "content": _ANSWER}]}
+
+
+def _delta_node(name: str):
+    def node(state):
+        return {"current_node": name, "retrieved_context": _CONTEXT, "reasoning_output": _ANSWER}
+    return node
+
+
+def _delta_store(state):
+    return {"conversation_history": [{"role": "assistant", "content": _ANSWER}]}
+
+
+def _build(schema, make_node, store):
+    builder = StateGraph(schema)
+    for name in _PIPELINE:
+        builder.add_node(name, _measured(make_node(name)))
+    builder.add_node("store_chat_summary", _measured(store))
+    builder.set_entry_point(_PIPELINE[0])
+    for a, b in zip(_PIPELINE + ["store_chat_summary"], _PIPELINE[1:] + ["store_chat_summary", END]):
+        builder.add_edge(a, b)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _history(turns: int) -> List[Dict[str, str]]:
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} about oak dining tables?"})
+        history.append({"role": "assistant", "content": _ANSWER})
+    return history
+
+
+def _turn_input(legacy: bool, state: Dict[str, Any], message: str) -> Dict[str, Any]:
+    user = {"role": "user", "content": message}
+    if legacy:
+        # The app used to send the whole state back with the history rebuilt
+        return {**state, "user_message": message, "conversation_history": state["conversation_history"] + [user]}
+    return {"user_message": message, "conversation_history": [user]}
+
+
+def _measure(graph, legacy: bool, turns: int, samples: int) -> Dict[str, float]:
+    config = {"configurable": {"thread_id": f"{'legacy' if legacy else 'delta'}-{turns}"}}
+    graph.update_state(config, {"session_id": "bench", "conversation_history": _history(turns)})
+    alloc, turn_seconds = 0, 0.0
+    _serialized.update(bytes=0, seconds=0.0)
+    for i in range(samples):
+        state = graph.get_state(config).values
+        turn = _turn_input(legacy, state, f"Follow-up {i}?")
+        tracemalloc.start()
+        graph.invoke(turn, config, durability="exit")
+        alloc += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    for i in range(samples):
+        state = graph.get_state(config).values
+        turn = _turn_input(legacy, state, f"Follow-up {i}?")
+        start = time.perf_counter()
+        graph.invoke(turn, config, durability="exit")
+        turn_seconds += time.perf_counter() - start
+    return {
+        "alloc_kib": round(alloc / samples / 1024, 1),
+        "serialized_kib": round(_serialized["bytes"] / (2 * samples) / 1024, 1),
+        "serialize_ms": round(_serialized["seconds"] / (2 * samples) * 1000, 3),
+        "turn_ms": round(turn_seconds / samples * 1000, 2),
+    }
+
+
+def run(turn_counts: List[int], samples: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    legacy = _build(_LegacyState, _legacy_node, _legacy_store)
+    delta = _build(WoodWorksState, _delta_node, _delta_store)
+    return {
+        f"{turns}_turns": {
+            "full_state": _measure(legacy, True, turns, samples),
+            "delta": _measure(delta, False, turns, samples),
+        }
+        for turns in turn_counts
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-turn state update cost.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000], help="session lengths")
+    parser.add_argument("--samples", type=int, default=5, help="measured turns per session length")
+    args = parser.parse_args()
+    print(json.dumps(run(args.turns, args.samples), indent=2))
@@ -0,0 +1,154 @@
+"""
+Scripted stand-in for the Groq client, for benchmarks.
+
+install() swaps llm.groq_client's client for one that sleeps for a
+configurable latency (plus optional jitter) and answers every prompt with a
+canned response for the agent that sent it, recognized by the prompt's
+opening line. The answers are just good enough to drive chat sessions and
+full orders through get_graph() with no network: the intent decider goes to
+workflow when the customer says order/buy, the selector picks the catalog
+product named in the message, and spec extraction reads dimensions, finish
+and quantity back out of the customer's reply.
+"""
+import json
+import random
+import re
+import threading
+import time
+import types
+from typing import Dict, Optional
+
+import llm.groq_client as groq_client
+
+_CANNED_ANSWER = (
+    "Our furniture is built from solid, kiln-dried hardwoods with traditional joinery. "
+    "Most pieces ship in 4-6 weeks and every order includes white-glove delivery."
+)
+
+
+def _field(prompt: str, label: str) -> str:
+    match = re.search(rf"^{re.escape(label)}\s*(.*)$", prompt, re.MULTILINE)
+    return match.group(1).strip().strip('"') if match else ""
+
+
+def _intent(prompt: str) -> Dict:
+    message = _field(prompt, "User message:").lower()
+    workflow = bool(re.search(r"\b(order|buy|purchase)\b", message))
+    return {"mode": "workflow" if workflow else "chat", "confidence": 0.9, "reason": "stub"}
+
+
+def _user_info(prompt: str) -> Dict:
+    message = _field(prompt, "User message:")
+    name = re.search(r"\b(?:I'm|I am|name is|this is)\s+([A-Z][a-z]+)", message)
+    if not name:
+        return {"collected": False, "message_to_user": "Could you share your name?"}
+    email = re.search(r"[\w.+-]+@[\w-]+\.[\w.]+", message)
+    return {
+        "collected": True,
+        "name": name.group(1),
+        "email": email.group(0) if email else None,
+        "phone": None,
+        "message_to_user": f"Thanks, {name.group(1)} — what would you like to order?",
+    }
+
+
+def _product_selector(prompt: str) -> Dict:
+    message = _field(prompt, "Customer message:").lower()
+    for line in prompt.splitlines():
+        parts = line.split("|")
+        if len(parts) > 2 and parts[0].isdigit() and parts[1].lower() in message:
+            return {
+                "selected": True,
+                "product_id": int(parts[0]),
+                "product_name": parts[1],
+                "message_to_user": f"The {parts[1]} is a great fit.",
+            }
+    return {"selected": False, "message_to_user": "Which of our products are you interested in?"}
+
+
+def _spec_extraction(prompt: str) -> Dict:
+    answer = prompt.split("Customer's response:", 1)[-1].split("\n\n", 1)[0].strip()
+    dimensions = re.search(r"\d+(?:\.\d+)?\s*x\s*\d+(?:\.\d+)?(?:\s*x\s*\d+(?:\.\d+)?)?\s*(?:in|cm|mm)?", answer)
+    quantity = re.search(r"(\d+)\s*(?:units?|pieces?|of them)", answer)
+    finish = re.search(r"finish[:\s]+([A-Za-z -]+?)(?:,|$)", answer, re.IGNORECASE)
+    missing = [] if dimensions else ["dimensions"]
+    return {
+        "dimensions": dimensions.group(0) if dimensions else None,
+        "finish": finish.group(1).strip() if finish else None,
+        "material_preference": None,
+        "special_requests": None,
+        "quantity": int(quantity.group(1)) if quantity else 1,
+        "raw_answers": answer,
+        "missing_critical_info": bool(missing),
+        "missing_fields": missing,
+    }
+
+
+def _technical_spec(prompt: str) -> Dict:
+    return {
+        "dimensions_mm": None,
+        "wood_species": "White Oak",
+        "finish_grade": "Satin Polyurethane Grade A",
+        "joinery_method": "Mortise and tenon",
+        "weight_capacity_kg": None,
+        "hardware": "Standard",
+        "surface_treatment": "Sanded to 220 grit, sealed",
+        "estimated_lead_days": 28,
+        "summary": "Solid white oak build with mortise and tenon joinery and a satin finish.",
+    }
+
+
+def _supervisor(prompt: str) -> Dict:
+    return {"next_agent": "end", "reason": "stub", "message_to_user": "Let's start that step again."}
+
+
+# Opening line of each prompt → response builder; plain-text agents return a str
+_RESPONDERS = (
+    ("You are the Intent Decider", _intent),
+    ("You are the User Information Collector", _user_info),
+    ("You are the Product Selector", _product_selector),
+    ("You are a furniture specification extractor", _spec_extraction),
+    ("You are a senior woodworking engineer", _technical_spec),
+    ("You are the Workflow Supervisor", _supervisor),
+    ("You are a master furniture consultant", lambda p: "What size, finish and quantity would you like?"),
+    ("You are a query refinement assistant", lambda p: _field(p, "Latest user message:")),
+    ("You maintain a running summary", lambda p: "Customer asked about materials and delivery."),
+)
+
+
+class StubLLM:
+    """Fake Groq client: chat.completions.create() with simulated latency."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def respond(self, messages) -> str:
+        text = "\n".join(m["content"] for m in messages)
+        for opening, build in _RESPONDERS:
+            if text.startswith(opening):
+                answer = build(text)
+                return answer if isinstance(answer, str) else json.dumps(answer)
+        return _CANNED_ANSWER  # chat reasoning (system prompt is chat.txt)
+
+    def create(self, messages, **kwargs):
+        time.sleep(self._delay())
+        content = self.respond(messages)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+def install(latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None) -> StubLLM:
+    stub = StubLLM(latency_ms, jitter_ms, seed)
+    groq_client._client = stub
+    return stub
@@ -0,0 +1,94 @@
+"""
+Per-call overhead of the hot tool queries: the database.queries data-access
+layer (pre-built Core statements, tuple records) against the equivalent ORM
+session/query/instance path the tools used before.
+
+    python -m bench.tool_queries --calls 2000
+
+Runs against a throwaway SQLite file unless DATABASE_URL is already set.
+"""
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_tool_queries.db")
+
+import argparse
+import json
+import logging
+import time
+from typing import Callable, Dict
+
+from database.models import Order, ProductCatalog, ProductItem, User
+from database.queries import fetch_inventory, fetch_product, insert_user, set_order_receipt_path
+from database.seed_data import seed_products
+from database.session import get_session, init_db
+from tools.db_tools import _to_product_dict
+
+
+def _orm_check_inventory(product_id: int):
+    with get_session() as session:
+        item = session.query(ProductItem).filter_by(product_id=product_id).first()
+        return (item.stock_quantity, item.sku) if item else None
+
+
+def _orm_get_product(product_id: int):
+    with get_session() as session:
+        p = session.query(ProductCatalog).filter_by(id=product_id).first()
+        item = session.query(ProductItem).filter_by(product_id=p.id).first()
+        return _to_product_dict(p, item)
+
+
+def _orm_update_receipt(order_id: int, receipt_path: str):
+    with get_session() as session:
+        order = session.query(Order).filter_by(id=order_id).first()
+        order.receipt_path = receipt_path
+        return True
+
+
+def _orm_create_user(name: str):
+    with get_session() as session:
+        user = User(name=name, email=None, phone=None)
+        session.add(user)
+        session.flush()
+        return user.id
+
+
+def _per_call_us(fn: Callable[[int], object], calls: int) -> float:
+    fn(0)  # warm the statement cache
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return round((time.perf_counter() - start) / calls * 1e6, 1)
+
+
+def run(calls: int) -> Dict[str, Dict[str, float]]:
+    init_db()
+    seed_products()
+    with get_session() as session:
+        order = Order(user_id=_orm_create_user("bench"), product_id=1, final_price=0.0)
+        session.add(order)
+        session.flush()
+        order_id = order.id
+
+    cases = {
+        "check_inventory": (lambda i: fetch_inventory(1 + i % 20), lambda i: _orm_check_inventory(1 + i % 20)),
+        "get_product_by_id": (lambda i: fetch_product(1 + i % 20), lambda i: _orm_get_product(1 + i % 20)),
+        "update_order_receipt_path": (
+            lambda i: set_order_receipt_path(order_id, f"receipts/{i}.pdf"),
+            lambda i: _orm_update_receipt(order_id, f"receipts/{i}.pdf"),
+        ),
+        "create_user": (lambda i: insert_user(f"u{i}", None, None), lambda i: _orm_create_user(f"u{i}")),
+    }
+    report = {}
+    for name, (dal, orm) in cases.items():
+        dal_us, orm_us = _per_call_us(dal, calls), _per_call_us(orm, calls)
+        report[name] = {"dal_us": dal_us, "orm_us": orm_us, "speedup": round(orm_us / dal_us, 2)}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark the hot tool queries.")
+    parser.add_argument("--calls", type=int, default=2000, help="calls per function and path")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    print(json.dumps(run(args.calls), indent=2))
@@ -1,24 +1,162 @@
+"""
+Logging setup: a non-blocking pipeline.
+
+setup_logging() puts one QueueHandler on the root logger, so a log call on
+the request path only merges its arguments and enqueues the record. A
+QueueListener thread does the I/O: human-readable lines to the console and
+JSON lines to LOG_FILE. The file rolls over at LOG_MAX_BYTES or at midnight,
+whichever comes first. Rolled files are gzipped (app.jsonl.20260101-000000.gz)
+and only the newest LOG_BACKUP_COUNT are kept.
+
+Rotation assumes one writer per file, so a server run with several worker
+processes calls setup_logging(per_process=True): each process then writes
+its own file with its pid in the name (app.<pid>.jsonl), and the newest
+LOG_BACKUP_COUNT rolled files are kept across all of them.
+
+Safe to call more than once (Streamlit reruns app.py); the pipeline is built
+on the first call only.
+"""
+import atexit
+import copy
+import glob
+import gzip
+import json
 import logging
 import os
-from config.settings import LOG_LEVEL, LOG_FILE
-
-def setup_logging():
-    os.makedirs("logs", exist_ok=True)
-
-    log_format = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
-
-    logging.basicConfig(
-        level=getattr(logging, LOG_LEVEL, logging.INFO),
-        format=log_format,
-        datefmt=date_format,
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8"),
-        ],
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from config.settings import LOG_BACKUP_COUNT, LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES
+
+LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, thread, message, plus any extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change after the call returns) but,
+        # unlike QueueHandler, keep the traceback out of the message so the
+        # JSON formatter can store it as its own field
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RotatingGzipFileHandler(RotatingFileHandler):
+    """Rolls over at max_bytes or midnight, whichever comes first; rolled files are gzipped.
+    Only the newest backup_count files matching rolled_glob (default: this file's) are kept."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, rolled_glob: Optional[str] = None):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self._rolled_glob = rolled_glob or f"{glob.escape(self.baseFilename)}.*.gz"
+        self._rollover_at = self._next_midnight()
+
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = datetime.now().date().toordinal() + 1
+        return datetime.fromordinal(tomorrow).timestamp()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self._rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            stamp = f"{self.baseFilename}.{time.strftime('%Y%m%d-%H%M%S')}"
+            target, n = f"{stamp}.gz", 1
+            while os.path.exists(target):   # several size rollovers within one second
+                target, n = f"{stamp}-{n}.gz", n + 1
+            with open(self.baseFilename, "rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(self.baseFilename)
+            rolled = sorted(glob.glob(self._rolled_glob), key=os.path.getmtime)
+            for old in rolled[:-self.backupCount or None]:
+                os.remove(old)
+        self._rollover_at = self._next_midnight()
+        self.stream = self._open()
+
+
+def _file_handler(per_process: bool) -> RotatingGzipFileHandler:
+    if not per_process:
+        return RotatingGzipFileHandler(LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
+    root, ext = os.path.splitext(os.path.abspath(LOG_FILE))
+    return RotatingGzipFileHandler(
+        f"{root}.{os.getpid()}{ext}", LOG_MAX_BYTES, LOG_BACKUP_COUNT,
+        rolled_glob=f"{glob.escape(root)}.*{glob.escape(ext)}.*.gz",
     )
 
-    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+def setup_logging(per_process: bool = False):
+    """Start the logging pipeline. per_process=True gives each process its own
+    log file, for servers running several worker processes."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            os.makedirs(os.path.dirname(LOG_FILE) or ".", exist_ok=True)
+
+            console = logging.StreamHandler()
+            console.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+            log_file = _file_handler(per_process)
+            log_file.setFormatter(JsonFormatter())
+
+            records: queue.SimpleQueue = queue.SimpleQueue()
+            root = logging.getLogger()
+            root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+            _queue_handler = _RecordQueueHandler(records)
+            root.addHandler(_queue_handler)
+
+            _listener = QueueListener(records, console, log_file, respect_handler_level=True)
+            _listener.start()
+            atexit.register(stop_logging)
+
+            logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+            logging.getLogger("httpx").setLevel(logging.WARNING)
 
     return logging.getLogger("woodworks")
+
+
+def stop_logging() -> None:
+    """Drain the queue and stop the writer thread (registered at exit)."""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _listener.stop()
+            _listener, _queue_handler = None, None
@@ -10,13 +10,78 @@ GROQ_MODEL = "llama-3.3-70b-versatile"
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///woodworks.db")
 
-# Logging
+# Graph sessions — LangGraph SQLite checkpointer, one thread per browser session
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "data/checkpoints.db")
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "72"))   # idle threads are deleted after this
+SESSION_GC_INTERVAL = 600         # seconds between idle-thread sweeps
+
+# Write-behind queue for non-critical inserts (long-term memory)
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_BATCH_SIZE = 200
+WRITE_BEHIND_FLUSH_INTERVAL = 2.0   # seconds
+WRITE_BEHIND_MAX_QUEUE = 10_000
+WRITE_BEHIND_SPILL_FILE = "data/write_behind_spill.jsonl"
+
+# Chat retrieval (catalog search)
+CHAT_RETRIEVAL_TOP_K = 8
+CHAT_BROWSE_PER_CATEGORY = 2
+
+# Chat pipeline — "two_pass" (always refine the query, then answer), "single_pass"
+# (answer directly; the reasoning prompt resolves follow-ups itself) or "auto"
+# (refine only when local heuristics say the message needs it)
+CHAT_PIPELINE = os.getenv("CHAT_PIPELINE", "auto")
+CHAT_REFINE_MIN_HISTORY = 6       # messages of history before "auto" considers refining
+
+# Semantic answer cache for repeated FAQ-style chat questions
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.75"))  # cosine similarity
+ANSWER_CACHE_MAX_ENTRIES = 256
+ANSWER_CACHE_DIM = 4096           # hashed feature buckets
+
+# Chat history — older turns are folded into a rolling summary in the background
+CHAT_HISTORY_WINDOW = 8           # most recent messages kept verbatim in state
+CHAT_SUMMARY_EVERY_N_TURNS = 3    # summarize once this many turns pile up beyond the window
+CHAT_SUMMARY_MAX_WORDS = 200
+
+# Conversation history bound — past HISTORY_MAX_MESSAGES, a session's oldest messages (graph
+# state and the UI transcript alike) move to HISTORY_DB until HISTORY_KEEP_MESSAGES remain in
+# memory; older pages are read back only when the UI scrolls up or a caller asks for them
+HISTORY_DB = os.getenv("HISTORY_DB", "data/history.db")
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "40"))
+HISTORY_KEEP_MESSAGES = HISTORY_MAX_MESSAGES // 2
+HISTORY_PAGE_SIZE = 20
+
+# Catalog prompt fragments — "compact" (header + pipe-separated rows) or "lines"
+CATALOG_PROMPT_STYLE = os.getenv("CATALOG_PROMPT_STYLE", "compact")
+CATALOG_CACHE_TTL = 5.0  # seconds between catalog version checks
+
+# Logging — JSON lines written by a background thread, rotated at LOG_MAX_BYTES or
+# midnight (whichever comes first) and gzipped; the newest LOG_BACKUP_COUNT are kept
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FILE = "logs/app.log"
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.jsonl")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+
+# Tracing — per-node / LLM / DB spans written as a Chrome trace (open in ui.perfetto.dev)
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+TRACE_FILE = os.getenv("TRACE_FILE", "logs/trace.json")
+TRACE_FLUSH_EVERY = 256           # buffered spans per write to TRACE_FILE
 
 # PDF
 RECEIPTS_DIR = "receipts"
 
+# Retention — orders / workflow_memory rows older than this move to monthly archives
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "365"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+# HTTP API (api/server.py)
+API_MAX_CONCURRENT_TURNS = int(os.getenv("API_MAX_CONCURRENT_TURNS", "32"))  # graph turns at once, per process
+API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "15"))              # seconds to wait for a slot before 503
+API_MAX_IMAGE_BYTES = 8 * 1024 * 1024
+
+# Discounts — most a session's negotiated discounts can add up to, in percent of the quoted total
+DISCOUNT_MAX_PERCENT = float(os.getenv("DISCOUNT_MAX_PERCENT", "10"))
+
 # Graph
 MAX_SUPERVISOR_STEPS = 10
 COMPANY_NAME = "WoodWorks AI"
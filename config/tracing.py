@@ -0,0 +1,173 @@
+"""
+Nested timing spans written to a local Chrome trace file.
+
+graph/turns.py opens a span per turn and build_graph() wraps every node with
+traced_node(). call_llm / call_llm_with_history, the vision client's
+analyze_image and get_session() each open a span too. A trace therefore
+shows every turn broken down into nodes, LLM calls and DB sessions. Spans
+carry attributes (node, session id, tokens, statements, rows) and inherit
+the session id from the span they are nested in.
+
+Finished spans are buffered and appended to TRACE_FILE as Chrome trace
+"complete" events, one per line. The file is a JSON array whose closing
+bracket is optional, so ui.perfetto.dev and chrome://tracing open it as is,
+even while it is still being written. Every line after the leading "[" is
+one JSON event followed by a comma.
+
+With TRACE_ENABLED unset, span() returns a shared no-op object and
+traced_node() returns the node unchanged.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.settings import TRACE_ENABLED, TRACE_FILE, TRACE_FLUSH_EVERY
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: int) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "attrs", "_wall_us", "_start_ns", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = {key: value for key, value in attrs.items() if value is not None}
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update((key, value) for key, value in attrs.items() if value is not None)
+
+    def add(self, key: str, amount: int) -> None:
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        if parent is not None and "session_id" in parent.attrs:
+            self.attrs.setdefault("session_id", parent.attrs["session_id"])
+        self._token = _current.set(self)
+        self._wall_us = time.time_ns() // 1000
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration_us = (time.perf_counter_ns() - self._start_ns) // 1000
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _writer.emit({
+            "name": self.name,
+            "cat": self.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": self._wall_us,
+            "dur": duration_us,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": self.attrs,
+        })
+        return False
+
+
+class _ChromeTraceWriter:
+    """Buffers events and appends them to the trace file in batches."""
+
+    def __init__(self, path: str, flush_every: int):
+        self._path = path
+        self._flush_every = flush_every
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._named_threads: Set[int] = set()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            if event["tid"] not in self._named_threads:
+                # Metadata event so Perfetto labels the track with the thread name
+                self._named_threads.add(event["tid"])
+                self._events.append({
+                    "name": "thread_name", "ph": "M", "pid": event["pid"], "tid": event["tid"],
+                    "args": {"name": threading.current_thread().name},
+                })
+            self._events.append(event)
+            if len(self._events) >= self._flush_every:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def _write(self) -> None:
+        if not self._events:
+            return
+        events, self._events = self._events, []
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, "a", encoding="utf-8") as f:
+                if f.tell() == 0:
+                    f.write("[\n")
+                f.write("".join(json.dumps(event, default=str) + ",\n" for event in events))
+        except OSError as e:
+            logger.warning("TRACE | write to %s failed, %s spans dropped: %s", self._path, len(events), e)
+
+
+_writer = _ChromeTraceWriter(TRACE_FILE, TRACE_FLUSH_EVERY)
+if TRACE_ENABLED:
+    atexit.register(_writer.flush)
+
+
+def span(name: str, **attrs: Any):
+    """Context manager timing the enclosed block as a span named `name`
+    ("turn", "node.<name>", "llm.call", "db.session", ...)."""
+    if not TRACE_ENABLED:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def current_span():
+    """The innermost open span, for adding attributes from deeper code."""
+    if not TRACE_ENABLED:
+        return _NOOP
+    return _current.get() or _NOOP
+
+
+def traced_node(name: str, fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a graph node in a span recording its session and the keys it updates."""
+    if not TRACE_ENABLED:
+        return fn
+
+    @wraps(fn)
+    def wrapper(state):
+        with Span(f"node.{name}", {"node": name, "session_id": state.get("session_id")}) as s:
+            update = fn(state)
+            if isinstance(update, dict):
+                s.set(updates=sorted(update))
+            return update
+    return wrapper
+
+
+def flush() -> None:
+    """Write buffered spans to TRACE_FILE now (also done at exit)."""
+    _writer.flush()
@@ -0,0 +1,98 @@
+"""
+SQLite FTS5 full-text index over the product catalog.
+
+The index is an external-content FTS5 table kept in sync with product_catalog
+by triggers, so bulk loads and ORM writes need no extra code. Other database
+backends skip the index and callers fall back to category browsing.
+"""
+import logging
+import re
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "product_catalog_fts"
+_FTS_COLUMNS = "name, category, description, material, finish_options"
+# bm25() weights, in _FTS_COLUMNS order: a hit in the name matters most
+_BM25_WEIGHTS = "10.0, 5.0, 1.0, 3.0, 2.0"
+
+_STOPWORDS = {
+    "a", "an", "and", "any", "are", "as", "at", "be", "can", "do", "does", "for", "from",
+    "have", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "show",
+    "that", "the", "this", "to", "what", "which", "with", "you", "your", "we", "our",
+}
+
+_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_FTS_COLUMNS},
+        content='product_catalog', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON product_catalog BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.category, new.description, new.material, new.finish_options);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON product_catalog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.category, old.description, old.material, old.finish_options);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON product_catalog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+        VALUES ('delete', old.id, old.name, old.category, old.description, old.material, old.finish_options);
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS})
+        VALUES (new.id, new.name, new.category, new.description, new.material, new.finish_options);
+    END""",
+]
+
+
+def fts_available(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+
+def ensure_catalog_fts(engine: Engine) -> None:
+    """Create the FTS5 table and sync triggers, indexing existing rows once."""
+    if not fts_available(engine):
+        logger.info("Catalog FTS skipped (not SQLite) — chat retrieval will browse by category.")
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE},
+        ).first()
+        for statement in _DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            logger.info("Catalog FTS index built.")
+
+
+def build_match_query(query: str, operator: str = "AND") -> str:
+    """Turn free text into an FTS5 MATCH expression joining its terms with `operator`.
+
+    Quoting each term keeps user punctuation from being parsed as FTS syntax.
+    """
+    terms = [t for t in re.findall(r"\w+", query.lower()) if t not in _STOPWORDS and len(t) > 1]
+    return f" {operator} ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+
+def search_product_ids(conn: Connection, query: str, limit: int) -> List[int]:
+    """Return catalog ids ranked by BM25 relevance (best first).
+
+    All terms are required first; only if that finds nothing is any term
+    accepted. The AND pass keeps the ranked candidate set small on large catalogs.
+    """
+    for operator in ("AND", "OR"):
+        match = build_match_query(query, operator)
+        if not match:
+            return []
+        rows = conn.execute(
+            text(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                f"ORDER BY bm25({FTS_TABLE}, {_BM25_WEIGHTS}) LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        ).all()
+        if rows:
+            return [row[0] for row in rows]
+    return []
@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON
+    Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, Index, LargeBinary
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
 
@@ -27,13 +27,14 @@ class ProductCatalog(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(150), nullable=False)
-    category = Column(String(80), nullable=False)
+    category = Column(String(80), nullable=False, index=True)
     description = Column(Text, nullable=True)
     base_price = Column(Float, nullable=False)
     material = Column(String(100), nullable=True)
     finish_options = Column(String(200), nullable=True)
     dimensions_guide = Column(String(200), nullable=True)
     customizable = Column(Integer, default=1)  # 1=True, 0=False
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     items = relationship("ProductItem", back_populates="product")
     orders = relationship("Order", back_populates="product")
@@ -43,7 +44,7 @@ class ProductItem(Base):
     __tablename__ = "product_items"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    product_id = Column(Integer, ForeignKey("product_catalog.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("product_catalog.id"), nullable=False, index=True)
     sku = Column(String(50), unique=True, nullable=False)
     stock_quantity = Column(Integer, default=0)
     reserved_quantity = Column(Integer, default=0)
@@ -56,13 +57,14 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("product_catalog.id"), nullable=False)
     human_spec = Column(Text, nullable=True)
     technical_spec = Column(Text, nullable=True)
     final_price = Column(Float, nullable=False)
     status = Column(String(50), default="confirmed")
     receipt_path = Column(String(300), nullable=True)
+    idempotency_key = Column(String(64), unique=True, index=True, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="orders")
@@ -77,8 +79,15 @@ class WorkflowMemory(Base):
     product_id = Column(Integer, ForeignKey("product_catalog.id"), nullable=True)
     session_type = Column(String(20), default="workflow")  # workflow | chat
     agent_summary = Column(Text, nullable=True)
-    final_state = Column(JSON, nullable=True)
+    final_state = Column(JSON, nullable=True)         # legacy plain-JSON snapshots
+    final_state_blob = Column(LargeBinary, nullable=True)  # memory.snapshot_codec format
     pricing = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="memories")
+
+    # Keyset pagination on (created_at, id), per user and across the table
+    __table_args__ = (
+        Index("ix_workflow_memory_user_created", "user_id", "created_at", "id"),
+        Index("ix_workflow_memory_created", "created_at", "id"),
+    )
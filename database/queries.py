@@ -0,0 +1,139 @@
+"""
+Data-access layer for the hot single-row tool queries.
+
+Statements are built once at import with bind parameters, so SQLAlchemy's
+compiled cache is hit on every call after the first, and they run on a plain
+Core connection returning lightweight records instead of ORM instances.
+"""
+import threading
+from typing import Dict, NamedTuple, Optional
+from sqlalchemy import bindparam, func, insert, select, update
+from database.models import Order, ProductCatalog, ProductItem, User
+from database.retention import archive_generation, get_archive_engine, list_archive_months
+from database.session import begin, connect
+
+_catalog = ProductCatalog.__table__
+_items = ProductItem.__table__
+_orders = Order.__table__
+_users = User.__table__
+
+# Confirmed-order counts per user across the archives; archives only change
+# when retention runs, so the counts hold for one archive generation
+_ARCHIVED_COUNTS_MAX = 10_000
+_archived_counts: Dict[int, int] = {}
+_archived_counts_generation = -1
+_archived_counts_lock = threading.Lock()
+
+
+class InventoryRecord(NamedTuple):
+    stock_quantity: int
+    sku: Optional[str]
+
+
+class ProductRecord(NamedTuple):
+    product_id: int
+    name: str
+    category: str
+    description: Optional[str]
+    base_price: float
+    material: Optional[str]
+    finish_options: Optional[str]
+    dimensions_guide: Optional[str]
+    customizable: bool
+    stock_quantity: Optional[int]
+    sku: Optional[str]
+
+
+_SELECT_INVENTORY = (
+    select(_items.c.stock_quantity, _items.c.sku)
+    .where(_items.c.product_id == bindparam("product_id"))
+    .limit(1)
+)
+
+_SELECT_PRODUCT = (
+    select(
+        _catalog.c.id,
+        _catalog.c.name,
+        _catalog.c.category,
+        _catalog.c.description,
+        _catalog.c.base_price,
+        _catalog.c.material,
+        _catalog.c.finish_options,
+        _catalog.c.dimensions_guide,
+        _catalog.c.customizable,
+        _items.c.stock_quantity,
+        _items.c.sku,
+    )
+    .select_from(_catalog.outerjoin(_items, _items.c.product_id == _catalog.c.id))
+    .where(_catalog.c.id == bindparam("product_id"))
+    .limit(1)
+)
+
+_UPDATE_RECEIPT_PATH = (
+    update(_orders)
+    .where(_orders.c.id == bindparam("order_id"))
+    .values(receipt_path=bindparam("receipt_path"))
+)
+
+_INSERT_USER = insert(_users)
+
+_COUNT_CONFIRMED_ORDERS = (
+    select(func.count())
+    .select_from(_orders)
+    .where(_orders.c.user_id == bindparam("user_id"), _orders.c.status == "confirmed")
+)
+
+
+def fetch_inventory(product_id: int) -> Optional[InventoryRecord]:
+    with connect() as conn:
+        row = conn.execute(_SELECT_INVENTORY, {"product_id": product_id}).first()
+    return InventoryRecord(*row) if row else None
+
+
+def fetch_product(product_id: int) -> Optional[ProductRecord]:
+    with connect() as conn:
+        row = conn.execute(_SELECT_PRODUCT, {"product_id": product_id}).first()
+    return ProductRecord(*row) if row else None
+
+
+def set_order_receipt_path(order_id: int, receipt_path: str) -> bool:
+    """Returns False when no order has that id."""
+    with begin() as conn:
+        result = conn.execute(_UPDATE_RECEIPT_PATH, {"order_id": order_id, "receipt_path": receipt_path})
+    return result.rowcount > 0
+
+
+def insert_user(name: str, email: Optional[str], phone: Optional[str]) -> int:
+    with begin() as conn:
+        result = conn.execute(_INSERT_USER, {"name": name, "email": email, "phone": phone})
+    return result.inserted_primary_key[0]
+
+
+def _count_archived_orders(user_id: int) -> int:
+    global _archived_counts_generation
+    generation = archive_generation()
+    with _archived_counts_lock:
+        if generation != _archived_counts_generation:
+            _archived_counts.clear()
+            _archived_counts_generation = generation
+        if user_id in _archived_counts:
+            return _archived_counts[user_id]
+    total = 0
+    for month in list_archive_months():
+        with connect(get_archive_engine(month)) as conn:
+            total += conn.execute(_COUNT_CONFIRMED_ORDERS, {"user_id": user_id}).scalar() or 0
+    with _archived_counts_lock:
+        if generation == _archived_counts_generation:
+            if len(_archived_counts) >= _ARCHIVED_COUNTS_MAX:
+                _archived_counts.clear()
+            _archived_counts[user_id] = total
+    return total
+
+
+def count_confirmed_orders(user_id: int) -> int:
+    """Confirmed orders for the user, including those moved to the monthly
+    archives (counted once per archive generation)."""
+    with connect() as conn:
+        total = conn.execute(_COUNT_CONFIRMED_ORDERS, {"user_id": user_id}).scalar() or 0
+    return total + _count_archived_orders(user_id)
+
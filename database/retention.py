@@ -0,0 +1,153 @@
+"""
+Retention for the ever-growing orders and workflow_memory tables.
+
+Rows older than RETENTION_DAYS are moved, in batches, into one SQLite file per
+calendar month (archive/woodworks_YYYY_MM.db); order receipts move alongside
+into archive/receipts/YYYY_MM/. Each batch is committed to the archive before
+it is deleted from the hot database, and archive inserts replace by primary
+key, so an interrupted run can simply be repeated.
+
+memory/long_term reads the archives back when a caller asks for old history.
+Readers cache the list of archived months. Every committed batch touches
+archive/.generation, so a reader in any process notices a retention run with
+a single stat() call and refreshes its list.
+"""
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.engine import Engine
+from config.settings import ARCHIVE_DIR, RETENTION_DAYS
+from database.models import Base, Order, WorkflowMemory
+from database.session import engine
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_TABLES = (Order.__table__, WorkflowMemory.__table__)
+_ARCHIVE_FILE = re.compile(r"^woodworks_(\d{4}_\d{2})\.db$")
+
+_archive_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+_months: Optional[Tuple[int, List[str]]] = None   # (generation, months) as last listed
+_months_lock = threading.Lock()
+
+
+def archive_path(month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"woodworks_{month}.db")
+
+
+def _generation_path() -> str:
+    return os.path.join(ARCHIVE_DIR, ".generation")
+
+
+def archive_generation() -> int:
+    """Changes whenever retention commits to the archives (0 before the first run)."""
+    try:
+        return os.stat(_generation_path()).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _mark_archives_changed() -> None:
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with open(_generation_path(), "w") as f:
+        f.write(str(time.time_ns()))
+
+
+def list_archive_months() -> List[str]:
+    """Archived months ("YYYY_MM"), newest first. Listed once per archive generation."""
+    global _months
+    generation = archive_generation()
+    with _months_lock:
+        if _months is None or _months[0] != generation:
+            names = os.listdir(ARCHIVE_DIR) if os.path.isdir(ARCHIVE_DIR) else []
+            months = [m.group(1) for m in map(_ARCHIVE_FILE.match, names) if m]
+            _months = (generation, sorted(months, reverse=True))
+        return list(_months[1])
+
+
+def get_archive_engine(month: str) -> Engine:
+    with _engines_lock:
+        if month not in _archive_engines:
+            os.makedirs(ARCHIVE_DIR, exist_ok=True)
+            archive_engine = create_engine(
+                f"sqlite:///{archive_path(month)}",
+                connect_args={"check_same_thread": False},
+            )
+            Base.metadata.create_all(bind=archive_engine, tables=list(ARCHIVED_TABLES))
+            _archive_engines[month] = archive_engine
+        return _archive_engines[month]
+
+
+def _archived_receipt_path(receipt_path: str, month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, "receipts", month, os.path.basename(receipt_path))
+
+
+def archive_table(table, cutoff: datetime, batch_size: int = 1000) -> int:
+    """Move rows of `table` created before `cutoff` into monthly archives."""
+    moved = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(table)
+                .where(table.c.created_at < cutoff)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).mappings().all()
+        if not rows:
+            return moved
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row["created_at"].strftime("%Y_%m")].append(dict(row))
+
+        for month, month_rows in by_month.items():
+            receipt_moves = []
+            if table is Order.__table__:
+                for row in month_rows:
+                    if not row["receipt_path"]:
+                        continue
+                    target = _archived_receipt_path(row["receipt_path"], month)
+                    if os.path.exists(row["receipt_path"]):
+                        receipt_moves.append((row["receipt_path"], target))
+                        row["receipt_path"] = target
+                    elif os.path.exists(target):
+                        # Moved by an earlier, interrupted run
+                        row["receipt_path"] = target
+            with get_archive_engine(month).begin() as archive_conn:
+                archive_conn.execute(insert(table).prefix_with("OR REPLACE"), month_rows)
+            # Files move only once the archive rows pointing at them are committed
+            for source, target in receipt_moves:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(source, target)
+
+        with engine.begin() as conn:
+            conn.execute(delete(table).where(table.c.id.in_([row["id"] for row in rows])))
+        _mark_archives_changed()
+        moved += len(rows)
+        logger.info("RETENTION | %s | archived %s rows so far", table.name, moved)
+
+
+def run_retention(max_age_days: int = RETENTION_DAYS, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Archive every retained table; returns rows moved per table."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=max_age_days)
+    logger.info("RETENTION | archiving rows created before %s", cutoff.date())
+    return {table.name: archive_table(table, cutoff) for table in ARCHIVED_TABLES}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Move old orders and workflow memory into monthly archives.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="keep rows newer than this in the hot DB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(run_retention(args.days), indent=2))
@@ -1,5 +1,9 @@
 import logging
-from database.session import get_session
+import random
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import func, insert, select
+from database.session import engine, get_session
 from database.models import ProductCatalog, ProductItem
 
 logger = logging.getLogger(__name__)
@@ -254,7 +258,7 @@ def seed_products():
     with get_session() as session:
         existing = session.query(ProductCatalog).count()
         if existing >= len(PRODUCTS):
-            logger.info(f"Seed data already present ({existing} products). Skipping.")
+            logger.info("Seed data already present (%s products). Skipping.", existing)
             return
 
         for i, p in enumerate(PRODUCTS, start=1):
@@ -279,10 +283,151 @@ def seed_products():
             )
             session.add(item)
 
-        logger.info(f"Seeded {len(PRODUCTS)} products into database.")
+        logger.info("Seeded %s products into database.", len(PRODUCTS))
+
+
+# ── Synthetic catalog (scale testing) ────────────────────────────────────────
+
+SYNTHETIC_CATEGORIES = {
+    "Dining": ["Dining Table", "Dining Chair", "Bench", "Sideboard", "Hutch", "Bar Stool"],
+    "Living Room": ["Coffee Table", "Sofa", "Accent Chair", "TV Console", "Side Table"],
+    "Bedroom": ["Bed Frame", "Nightstand", "Dresser", "Wardrobe", "Chest"],
+    "Office": ["Desk", "Bookcase", "File Cabinet", "Office Chair", "Credenza"],
+    "Storage": ["Shelf", "Cabinet", "Cubby Unit", "Blanket Chest"],
+    "Kitchen": ["Kitchen Island", "Pantry Cabinet", "Butcher Block Cart"],
+    "Outdoor": ["Garden Bench", "Adirondack Chair", "Patio Table", "Planter Box"],
+    "Entryway": ["Entryway Bench", "Console Table", "Coat Rack"],
+    "Kids": ["Loft Bed", "Toy Chest", "Kids Desk"],
+    "Bathroom": ["Vanity", "Linen Cabinet", "Bath Shelf"],
+}
+SYNTHETIC_MATERIALS = [
+    "Solid Oak", "Solid Walnut", "Solid Maple", "Solid Cherry", "Solid Pine", "Solid Teak",
+    "Solid Mahogany", "Solid Birch", "Solid Ash", "Reclaimed Elm", "Solid Acacia", "Solid Bamboo",
+]
+SYNTHETIC_FINISHES = [
+    "Natural", "Walnut Stain", "Whitewash", "Ebony", "Espresso", "Honey Oak", "Grey Wash",
+    "Clear Matte", "Oiled", "Painted White", "Dark Stain", "Antique",
+]
+SYNTHETIC_STYLES = [
+    "Farmhouse", "Mid-Century", "Shaker", "Rustic", "Scandinavian",
+    "Industrial", "Craftsman", "Modern", "Coastal", "Mission",
+]
+STOCK_DISTRIBUTIONS = ("uniform", "skewed", "scarce")
+
+
+def _synthetic_stock(rng: random.Random, distribution: str) -> int:
+    if distribution == "uniform":
+        return rng.randint(0, 50)
+    if distribution == "scarce":
+        return 0 if rng.random() < 0.4 else rng.randint(1, 5)
+    # skewed: most SKUs carry a handful of units, a long tail carries many
+    if rng.random() < 0.05:
+        return 0
+    return min(int(rng.paretovariate(1.2) * 3), 500)
+
+
+def generate_synthetic_catalog(
+    count: int,
+    seed: int = 42,
+    categories: Optional[Dict[str, Sequence[str]]] = None,
+    materials: Optional[Sequence[str]] = None,
+    finishes: Optional[Sequence[str]] = None,
+    stock_distribution: str = "skewed",
+) -> Iterator[Dict[str, Any]]:
+    """Yield `count` deterministic product dicts in the same shape as PRODUCTS."""
+    if stock_distribution not in STOCK_DISTRIBUTIONS:
+        raise ValueError(f"stock_distribution must be one of {STOCK_DISTRIBUTIONS}")
+    rng = random.Random(seed)
+    categories = categories or SYNTHETIC_CATEGORIES
+    materials = materials or SYNTHETIC_MATERIALS
+    finishes = finishes or SYNTHETIC_FINISHES
+    category_names = list(categories)
+
+    for n in range(count):
+        category = rng.choice(category_names)
+        item_type = rng.choice(categories[category])
+        style = rng.choice(SYNTHETIC_STYLES)
+        material = rng.choice(materials)
+        width = rng.randrange(18, 96, 6)
+        depth = rng.randrange(12, 42, 2)
+        height = rng.randrange(16, 84, 2)
+        yield {
+            "name": f"{style} {item_type} {n + 1:06d}",
+            "category": category,
+            "description": (
+                f"{style} {item_type.lower()} in {material.lower()} "
+                f"with {rng.choice(['dovetail', 'mortise-and-tenon', 'dowel', 'box'])} joinery."
+            ),
+            "base_price": round(rng.lognormvariate(6.5, 0.6), 2),
+            "material": material,
+            "finish_options": ", ".join(rng.sample(list(finishes), k=min(len(finishes), rng.randint(2, 4)))),
+            "dimensions_guide": f"W: {width}in, D: {depth}in, H: {height}in",
+            "customizable": int(rng.random() < 0.7),
+            "stock": _synthetic_stock(rng, stock_distribution),
+        }
+
+
+def seed_synthetic_products(
+    count: int,
+    batch_size: int = 10_000,
+    seed: int = 42,
+    stock_distribution: str = "skewed",
+) -> int:
+    """Bulk-load a synthetic catalog with multi-row inserts in one transaction.
+
+    Product ids are assigned up front so catalog and inventory rows can be
+    inserted in batches without a flush per product.
+    """
+    started = time.perf_counter()
+    loaded = 0
+    products: List[Dict[str, Any]] = []
+    items: List[Dict[str, Any]] = []
+
+    with engine.begin() as conn:
+        next_id = (conn.execute(select(func.max(ProductCatalog.id))).scalar() or 0) + 1
+
+        def _flush():
+            conn.execute(insert(ProductCatalog), products)
+            conn.execute(insert(ProductItem), items)
+            products.clear()
+            items.clear()
+
+        for offset, p in enumerate(generate_synthetic_catalog(count, seed=seed, stock_distribution=stock_distribution)):
+            product_id = next_id + offset
+            stock = p.pop("stock")
+            products.append({"id": product_id, **p})
+            items.append({
+                "product_id": product_id,
+                "sku": f"WW-{str(product_id).zfill(4)}",
+                "stock_quantity": stock,
+                "reserved_quantity": 0,
+            })
+            loaded += 1
+            if len(products) >= batch_size:
+                _flush()
+        if products:
+            _flush()
+
+    logger.info("Seeded %s synthetic products in %.2fs.", loaded, time.perf_counter() - started)
+    return loaded
 
 
 if __name__ == "__main__":
+    import argparse
     from database.session import init_db
+
+    parser = argparse.ArgumentParser(description="Seed the WoodWorks product catalog.")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="also load N generated products for scale testing")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic catalog")
+    parser.add_argument("--stock", choices=STOCK_DISTRIBUTIONS, default="skewed",
+                        help="stock distribution for synthetic products")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="rows per bulk insert")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
     init_db()
     seed_products()
+    if args.synthetic:
+        seed_synthetic_products(args.synthetic, batch_size=args.batch_size,
+                                seed=args.seed, stock_distribution=args.stock)
@@ -1,9 +1,13 @@
 import logging
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from typing import Iterator
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import sessionmaker, Session
-from config.settings import DATABASE_URL
+from config.settings import DATABASE_URL, TRACE_ENABLED
+from config.tracing import current_span, span
 from database.models import Base
+from database.catalog_search import ensure_catalog_fts
 
 logger = logging.getLogger(__name__)
 
@@ -16,21 +20,65 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+if TRACE_ENABLED:
+    @event.listens_for(engine, "after_cursor_execute")
+    def _trace_statement(conn, cursor, statement, parameters, context, executemany):
+        """Count statements and affected rows on the innermost open span."""
+        current = current_span()
+        current.add("statements", 1)
+        if cursor.rowcount > 0:
+            current.add("rows", cursor.rowcount)
+
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _upgrade_existing_tables()
+    ensure_catalog_fts(engine)
     logger.info("Database tables initialized.")
 
 
+def _upgrade_existing_tables():
+    """create_all() never alters existing tables, so add any columns and
+    indexes that were introduced after the database was first created."""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            logger.info("Added column %s.%s", table.name, column.name)
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+@contextmanager
+def connect(bind: Engine = engine) -> Iterator[Connection]:
+    """A Core connection (no transaction) traced as a db.session span."""
+    with span("db.session"), bind.connect() as conn:
+        yield conn
+
+
+@contextmanager
+def begin(bind: Engine = engine) -> Iterator[Connection]:
+    """A Core connection in a transaction, committed on exit, traced as a db.session span."""
+    with span("db.session"), bind.begin() as conn:
+        yield conn
+
+
 @contextmanager
 def get_session() -> Session:
-    session = SessionLocal()
-    try:
-        yield session
-        session.commit()
-        logger.debug("DB session committed.")
-    except Exception as e:
-        session.rollback()
-        logger.error(f"DB session rollback due to error: {e}")
-        raise
-    finally:
-        session.close()
+    with span("db.session"):
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+            logger.debug("DB session committed.")
+        except Exception as e:
+            session.rollback()
+            logger.error("DB session rollback due to error: %s", e)
+            raise
+        finally:
+            session.close()
@@ -20,7 +20,7 @@ def main():
         seed_products()
         logger.info("Data seeded successfully.")
     except Exception as e:
-        logger.error(f"Error during database setup: {e}")
+        logger.error("Error during database setup: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
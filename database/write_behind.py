@@ -0,0 +1,251 @@
+"""
+Write-behind queue for non-critical inserts (long-term memory, chat summaries).
+
+Rows are queued from the request path and written by a background thread in
+periodic multi-row transactions. If the database is unavailable, batches are
+appended to a local spill file and replayed when the writer starts and again
+after the next successful flush, so rows spilled during an outage are written
+as soon as the database is back. Spilled lines that cannot be replayed are
+moved to <spill file>.bad.
+"""
+import atexit
+import base64
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from config.settings import (
+    WRITE_BEHIND_BATCH_SIZE,
+    WRITE_BEHIND_FLUSH_INTERVAL,
+    WRITE_BEHIND_MAX_QUEUE,
+    WRITE_BEHIND_SPILL_FILE,
+)
+from database.models import Base
+from database.session import begin
+
+logger = logging.getLogger(__name__)
+
+_TABLES = {table.name: table for table in Base.metadata.sorted_tables}
+_STOP = object()
+
+Item = Tuple[str, Dict[str, Any]]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot spill value of type {type(value).__name__}")
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+class WriteBehindQueue:
+    """Bounded queue drained by one background thread into batched inserts."""
+
+    def __init__(
+        self,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+        max_queue: int = WRITE_BEHIND_MAX_QUEUE,
+        spill_file: str = WRITE_BEHIND_SPILL_FILE,
+    ):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._spill_file = spill_file
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._spill_pending = False   # rows were spilled since the last replay
+
+    # ── Producer side ────────────────────────────────────────────────────────
+    def enqueue(self, table_name: str, row: Dict[str, Any]) -> None:
+        """Queue one row for insertion. Never blocks the caller."""
+        table = _TABLES.get(table_name)
+        if table is None:
+            raise ValueError(f"Unknown table for write-behind: {table_name}")
+        row = dict(row)
+        # Stamp the time now so rows keep request order, not flush order
+        if "created_at" in table.c and row.get("created_at") is None:
+            row["created_at"] = datetime.utcnow()
+
+        self.start()
+        try:
+            self._queue.put_nowait((table_name, row))
+        except queue.Full:
+            logger.warning("WRITE_BEHIND | queue full — spilling %s row to disk", table_name)
+            self._spill([(table_name, row)])
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error("WRITE_BEHIND | writer did not stop in time — rows may be lost")
+
+    # ── Writer thread ────────────────────────────────────────────────────────
+    def _run(self) -> None:
+        self._retry_spill()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            # A successful flush means the database is reachable again
+            if batch and self._write(batch) and self._spill_pending:
+                self._retry_spill()
+        logger.info("WRITE_BEHIND | writer stopped")
+
+    def _retry_spill(self) -> None:
+        self._spill_pending = False
+        try:
+            self._replay_spill()
+        except Exception:
+            # Never let a replay problem take the writer down; the replay file
+            # is kept and retried after the next successful flush or restart
+            self._spill_pending = True
+            logger.error("WRITE_BEHIND | spill replay failed", exc_info=True)
+
+    def _next_batch(self) -> Tuple[List[Item], bool]:
+        """Collect up to batch_size rows, waiting at most flush_interval after
+        the first one arrives."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch + self._drain_nowait(), True
+            batch.append(item)
+        return batch, False
+
+    def _drain_nowait(self) -> List[Item]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _write(self, batch: List[Item]) -> bool:
+        # executemany needs identical keys, so group by table and column set
+        groups: Dict[Tuple[str, frozenset], List[Dict[str, Any]]] = {}
+        for table_name, row in batch:
+            groups.setdefault((table_name, frozenset(row)), []).append(row)
+        try:
+            with begin() as conn:
+                for (table_name, _), rows in groups.items():
+                    conn.execute(insert(_TABLES[table_name]), rows)
+            logger.debug("WRITE_BEHIND | flushed %s rows in one transaction", len(batch))
+            return True
+        except Exception as e:
+            logger.error("WRITE_BEHIND | flush failed, spilling %s rows: %s", len(batch), e)
+            self._spill(batch)
+            return False
+
+    # ── Spill file ───────────────────────────────────────────────────────────
+    def _spill(self, batch: List[Item]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self._spill_file) or ".", exist_ok=True)
+            with self._spill_lock, open(self._spill_file, "a", encoding="utf-8") as f:
+                for table_name, row in batch:
+                    f.write(json.dumps({"table": table_name, "row": row}, default=_encode) + "\n")
+            self._spill_pending = True
+        except Exception as e:
+            logger.error("WRITE_BEHIND | spill to %s failed, %s rows lost: %s", self._spill_file, len(batch), e)
+
+    def _replay_spill(self) -> None:
+        replay_path = self._spill_file + ".replay"
+        with self._spill_lock:
+            # A leftover replay file means the last replay was interrupted; finish it first
+            if os.path.exists(self._spill_file) and not os.path.exists(replay_path):
+                os.replace(self._spill_file, replay_path)
+        if not os.path.exists(replay_path):
+            return
+        items: List[Item] = []
+        bad: List[str] = []
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line, object_hook=_decode)
+                    if record["table"] not in _TABLES or not isinstance(record["row"], dict):
+                        raise ValueError(f"unknown table or bad row: {record['table']!r}")
+                    items.append((record["table"], record["row"]))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning("WRITE_BEHIND | skipping unreadable spill line: %s", e)
+                    bad.append(line if line.endswith("\n") else line + "\n")
+        if bad:
+            self._quarantine(bad)
+        logger.info("WRITE_BEHIND | replaying %s spilled rows", len(items))
+        # Failed chunks are re-spilled by _write, so the replay file can go either way
+        for start in range(0, len(items), self._batch_size):
+            self._write(items[start:start + self._batch_size])
+        os.remove(replay_path)
+
+    def _quarantine(self, lines: List[str]) -> None:
+        bad_path = self._spill_file + ".bad"
+        try:
+            with open(bad_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            logger.error("WRITE_BEHIND | moved %s unreadable spill lines to %s", len(lines), bad_path)
+        except OSError as e:
+            logger.error("WRITE_BEHIND | could not write %s, %s spill lines dropped: %s", bad_path, len(lines), e)
+
+
+# Singleton writer
+_writer: Optional[WriteBehindQueue] = None
+_writer_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteBehindQueue()
+            atexit.register(_writer.stop)
+    return _writer
+
+
+def enqueue_insert(table_name: str, row: Dict[str, Any]) -> None:
+    get_write_behind().enqueue(table_name, row)
+
+
+def flush_write_behind(timeout: float = 10.0) -> None:
+    """Write out everything queued so far; the writer restarts on next enqueue."""
+    if _writer is not None:
+        _writer.stop(timeout)
@@ -1,25 +1,31 @@
 import logging
+import threading
 from langgraph.graph import StateGraph, END
+from config.tracing import traced_node
 from graph.state import WoodWorksState
+from graph.metrics import increment, timed_node
+from graph.checkpointing import get_checkpointer
+from tools.discount_policy import is_discount_request
 
 # Agents & Nodes
 from agents.intent_decider import intent_decider_node
 from agents.user_info import user_info_collector_node
 from agents.product_selector import product_selector_node
 from agents.human_spec import human_spec_agent_node
-from agents.technical_spec import technical_spec_agent_node
 from agents.pricing import stock_pricing_agent_node
 from agents.supervisor import supervisor_node
 from agents.discount import discount_agent_node
 
 # Chat Subgraph Nodes
-from agents.chat_subgraph.query_refinement import query_refinement_node
+from agents.chat_subgraph.answer_cache import answer_cache_node
+from agents.chat_subgraph.query_refinement import query_refinement_node, needs_refinement
 from agents.chat_subgraph.data_retrieval import data_retrieval_node
 from agents.chat_subgraph.reasoning import reasoning_node
 from agents.chat_subgraph.response_generator import response_generator_node
 from agents.chat_subgraph.store_chat_summary import store_chat_summary_node
 
 # Workflow Subgraph Nodes
+from graph.nodes.spec_and_stock import spec_and_stock_node
 from graph.nodes.final_confirmation import final_confirmation_node
 from graph.nodes.create_order import create_order_node
 from graph.nodes.generate_receipt import generate_receipt_node
@@ -30,7 +36,30 @@ logger = logging.getLogger(__name__)
 
 def _route_after_intent(state: WoodWorksState) -> str:
     # Route to either Chat Subgraph or Workflow Dispatcher
-    return "workflow_dispatcher" if state.get("mode") == "workflow" else "query_refinement"
+    return "workflow_dispatcher" if state.get("mode") == "workflow" else "answer_cache"
+
+
+def _route_after_answer_cache(state: WoodWorksState) -> str:
+    if state.get("reasoning_output"):
+        return "response_generator"
+    # Single-pass chat skips the rewrite call; reasoning resolves follow-ups itself
+    if needs_refinement(state):
+        increment("chat_refinement_run")
+        return "query_refinement"
+    increment("chat_refinement_skipped")
+    return "data_retrieval"
+
+
+def _to_supervisor_or(next_node: str):
+    """Route to the supervisor when the node just raised an issue, else to next_node."""
+    def route(state: WoodWorksState) -> str:
+        return "supervisor" if state.get("supervisor_issue") else next_node
+    return route
+
+
+def _route_after_supervisor(state: WoodWorksState) -> str:
+    decision = state.get("supervisor_decision") or {}
+    return END if decision.get("next_agent") == "end" else "workflow_dispatcher"
 
 
 def _route_from_dispatcher(state: WoodWorksState) -> str:
@@ -43,10 +72,11 @@ def _route_from_dispatcher(state: WoodWorksState) -> str:
     receipt    = state.get("receipt_path")
 
     logger.info(
-        f"DISPATCHER | confirmed={confirmed} order_id={order_id} receipt={receipt} "
-        f"user_info={bool(state.get('user_info'))} product={bool(state.get('selected_product'))} "
-        f"human_spec={bool(state.get('human_spec'))} tech_spec={bool(state.get('technical_spec'))} "
-        f"pricing={bool(state.get('pricing_summary'))}"
+        "DISPATCHER | confirmed=%s order_id=%s receipt=%s user_info=%s product=%s human_spec=%s "
+        "tech_spec=%s pricing=%s",
+        confirmed, order_id, receipt,
+        bool(state.get('user_info')), bool(state.get('selected_product')), bool(state.get('human_spec')),
+        bool(state.get('technical_spec')), bool(state.get('pricing_summary')),
     )
 
     # Only route to supervisor on a real, non-empty issue
@@ -55,6 +85,11 @@ def _route_from_dispatcher(state: WoodWorksState) -> str:
         return "supervisor"
 
     # Deterministic happy-path: find the first incomplete step
+    # The customer is answering an offered alternative product
+    if state.get("proposed_product"):
+        logger.info("DISPATCHER | routing → supervisor (alternative product reply)")
+        return "supervisor"
+
     if not state.get("user_info"):
         logger.info("DISPATCHER | routing → user_info_collector")
         return "user_info_collector"
@@ -70,25 +105,17 @@ def _route_from_dispatcher(state: WoodWorksState) -> str:
         return "human_spec_agent"
 
     if not state.get("technical_spec"):
-        logger.info("DISPATCHER | routing → technical_spec_agent")
-        return "technical_spec_agent"
+        logger.info("DISPATCHER | routing → spec_and_stock")
+        return "spec_and_stock"
 
     if not state.get("pricing_summary") or not state.get("stock_status"):
         logger.info("DISPATCHER | routing → stock_pricing_agent")
         return "stock_pricing_agent"
 
-    # Check for discount request after pricing is available
+    # Check for discount request after pricing is available. Repeat requests are
+    # fine: the discount policy caps what a session can get in total.
     if state.get("pricing_summary") and not state.get("confirmed_by_user"):
-        user_msg = (state.get("user_message") or "").lower()
-        discount_keywords = [
-            "discount", "cheaper", "reduce", "lower", "too high",
-            "too expensive", "negotiate", "deal", "less", "price down",
-            "bring down", "offer", "cut the price", "price cut",
-        ]
-        already_handled = state.get("discount_applied") is not None
-        is_discount_request = any(kw in user_msg for kw in discount_keywords)
-
-        if is_discount_request and not already_handled:
+        if is_discount_request(state.get("user_message") or ""):
             logger.info("DISPATCHER | routing → discount_agent")
             return "discount_agent"
 
@@ -111,35 +138,41 @@ def _route_from_dispatcher(state: WoodWorksState) -> str:
     return "store_memory"
 
 
-def build_graph() -> StateGraph:
+def _node(name: str, fn):
+    """Register-ready node: timed into graph.metrics and traced as node.<name>."""
+    return timed_node(name, traced_node(name, fn))
+
+
+def build_graph(checkpointer=None) -> StateGraph:
     logger.info("GRAPH | Building WoodWorks LangGraph (Consolidated)")
     builder = StateGraph(WoodWorksState)
 
     # 1. Intent Decider
-    builder.add_node("intent_decider", intent_decider_node)
+    builder.add_node("intent_decider", _node("intent_decider", intent_decider_node))
 
     # 2. Chat Subgraph Nodes
-    builder.add_node("query_refinement",   query_refinement_node)
-    builder.add_node("data_retrieval",     data_retrieval_node)
-    builder.add_node("reasoning",          reasoning_node)
-    builder.add_node("response_generator", response_generator_node)
-    builder.add_node("store_chat_summary", store_chat_summary_node)
+    builder.add_node("answer_cache",       _node("answer_cache", answer_cache_node))
+    builder.add_node("query_refinement",   _node("query_refinement", query_refinement_node))
+    builder.add_node("data_retrieval",     _node("data_retrieval", data_retrieval_node))
+    builder.add_node("reasoning",          _node("reasoning", reasoning_node))
+    builder.add_node("response_generator", _node("response_generator", response_generator_node))
+    builder.add_node("store_chat_summary", _node("store_chat_summary", store_chat_summary_node))
 
     # 3. Workflow Nodes
-    builder.add_node("workflow_dispatcher",  lambda state: state)  # passthrough router
-    builder.add_node("supervisor",           supervisor_node)
-    builder.add_node("user_info_collector",  user_info_collector_node)
-    builder.add_node("product_selector",     product_selector_node)
-    builder.add_node("human_spec_agent",     human_spec_agent_node)
-    builder.add_node("technical_spec_agent", technical_spec_agent_node)
-    builder.add_node("stock_pricing_agent",  stock_pricing_agent_node)
-    builder.add_node("discount_agent",       discount_agent_node)
+    builder.add_node("workflow_dispatcher",  _node("workflow_dispatcher", lambda state: {}))  # passthrough router, writes nothing
+    builder.add_node("supervisor",           _node("supervisor", supervisor_node))
+    builder.add_node("user_info_collector",  _node("user_info_collector", user_info_collector_node))
+    builder.add_node("product_selector",     _node("product_selector", product_selector_node))
+    builder.add_node("human_spec_agent",     _node("human_spec_agent", human_spec_agent_node))
+    builder.add_node("spec_and_stock",       _node("spec_and_stock", spec_and_stock_node))
+    builder.add_node("stock_pricing_agent",  _node("stock_pricing_agent", stock_pricing_agent_node))
+    builder.add_node("discount_agent",       _node("discount_agent", discount_agent_node))
 
     # 4. Fulfillment Nodes
-    builder.add_node("final_confirmation", final_confirmation_node)
-    builder.add_node("create_order",       create_order_node)
-    builder.add_node("generate_receipt",   generate_receipt_node)
-    builder.add_node("store_memory",       store_memory_node)
+    builder.add_node("final_confirmation", _node("final_confirmation", final_confirmation_node))
+    builder.add_node("create_order",       _node("create_order", create_order_node))
+    builder.add_node("generate_receipt",   _node("generate_receipt", generate_receipt_node))
+    builder.add_node("store_memory",       _node("store_memory", store_memory_node))
 
     # ── Entry Point ───────────────────────────────────────────────────────────
     builder.set_entry_point("intent_decider")
@@ -149,11 +182,22 @@ def build_graph() -> StateGraph:
         "intent_decider",
         _route_after_intent,
         {
-            "query_refinement":   "query_refinement",
+            "answer_cache":        "answer_cache",
             "workflow_dispatcher": "workflow_dispatcher",
         },
     )
 
+    # ── Chat entry: cached answer, or refine only when needed ────────────────
+    builder.add_conditional_edges(
+        "answer_cache",
+        _route_after_answer_cache,
+        {
+            "response_generator": "response_generator",
+            "query_refinement":   "query_refinement",
+            "data_retrieval":     "data_retrieval",
+        },
+    )
+
     # ── Workflow Dispatcher ───────────────────────────────────────────────────
     
     builder.add_conditional_edges(
@@ -164,7 +208,7 @@ def build_graph() -> StateGraph:
             "user_info_collector":  "user_info_collector",
             "product_selector":     "product_selector",
             "human_spec_agent":     "human_spec_agent",
-            "technical_spec_agent": "technical_spec_agent",
+            "spec_and_stock":       "spec_and_stock",
             "stock_pricing_agent":  "stock_pricing_agent",
             "final_confirmation":   "final_confirmation",
             "discount_agent":       "discount_agent",
@@ -174,8 +218,12 @@ def build_graph() -> StateGraph:
         },
     )
 
-    # Supervisor → re-evaluate via dispatcher
-    builder.add_edge("supervisor", "workflow_dispatcher")
+    # Supervisor → re-evaluate via dispatcher, unless it decided to stop
+    builder.add_conditional_edges(
+        "supervisor",
+        _route_after_supervisor,
+        {"workflow_dispatcher": "workflow_dispatcher", END: END},
+    )
 
     # ── Chat Subgraph (Linear) ────────────────────────────────────────────────
     builder.add_edge("query_refinement",   "data_retrieval")
@@ -189,13 +237,30 @@ def build_graph() -> StateGraph:
     for node in [
         "user_info_collector",
         "product_selector",
-        "human_spec_agent",
     ]:
         builder.add_edge(node, END)
 
+    # Spec issues (missing fields, failed extraction) are handled this turn;
+    # the app clears supervisor_issue at the start of the next one
+    builder.add_conditional_edges(
+        "human_spec_agent",
+        _to_supervisor_or(END),
+        {"supervisor": "supervisor", END: END},
+    )
+
    
-    builder.add_edge("technical_spec_agent", "stock_pricing_agent")
-    builder.add_edge("stock_pricing_agent",  "final_confirmation")
+    # Spec generation and stock check run together; any issue (out of stock,
+    # spec failure) goes straight to the supervisor instead of pricing
+    builder.add_conditional_edges(
+        "spec_and_stock",
+        _to_supervisor_or("stock_pricing_agent"),
+        {"supervisor": "supervisor", "stock_pricing_agent": "stock_pricing_agent"},
+    )
+    builder.add_conditional_edges(
+        "stock_pricing_agent",
+        _to_supervisor_or("final_confirmation"),
+        {"supervisor": "supervisor", "final_confirmation": "final_confirmation"},
+    )
 
     
     builder.add_edge("final_confirmation", END)
@@ -207,19 +272,18 @@ def build_graph() -> StateGraph:
     builder.add_edge("store_memory",     END)
 
     logger.info("GRAPH | Graph built successfully")
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
-# Singleton graph
+# Singleton graph, compiled on first use (LangGraph Studio loads graph/studio.py)
 _graph = None
+_graph_lock = threading.Lock()
 
 
 def get_graph():
+    """The app's graph, persisting each thread's state in the SQLite checkpointer."""
     global _graph
-    if _graph is None:
-        _graph = build_graph()
-    return _graph
-
-
-# Expose graph for LangGraph Studio
-graph = build_graph()
+    with _graph_lock:
+        if _graph is None:
+            _graph = build_graph(checkpointer=get_checkpointer())
+        return _graph
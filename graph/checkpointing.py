@@ -0,0 +1,119 @@
+"""
+Durable graph sessions: a SQLite checkpointer keyed by thread_id.
+
+Each browser session is a LangGraph thread (thread_id = session_id), so the
+app sends only the new turn and any worker process with access to
+CHECKPOINT_DB can resume any session. Threads idle for longer than
+SESSION_TTL_HOURS are deleted by collect_idle_threads(), which the app runs
+at most every SESSION_GC_INTERVAL seconds and which is also available as
+
+    python -m graph.checkpointing --gc
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from langgraph.checkpoint.sqlite import SqliteSaver
+from config.settings import CHECKPOINT_DB, SESSION_GC_INTERVAL, SESSION_TTL_HOURS
+from memory import history_store
+
+logger = logging.getLogger(__name__)
+
+_ACTIVITY_DDL = """
+CREATE TABLE IF NOT EXISTS thread_activity (
+    thread_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_thread_activity_last_seen ON thread_activity(last_seen);
+"""
+
+_checkpointer: Optional[SqliteSaver] = None
+_checkpointer_lock = threading.Lock()
+_last_gc = 0.0
+
+
+def get_checkpointer() -> SqliteSaver:
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            os.makedirs(os.path.dirname(CHECKPOINT_DB) or ".", exist_ok=True)
+            conn = sqlite3.connect(CHECKPOINT_DB, check_same_thread=False)
+            _checkpointer = SqliteSaver(conn)
+            with _checkpointer.cursor() as cur:
+                cur.executescript(_ACTIVITY_DDL)
+            logger.info("Checkpointer ready at %s", CHECKPOINT_DB)
+        return _checkpointer
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def touch_thread(thread_id: str) -> None:
+    """Record activity on a thread; idle threads are collected after the TTL."""
+    with get_checkpointer().cursor() as cur:
+        cur.execute(
+            "INSERT INTO thread_activity(thread_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (thread_id, time.time()),
+        )
+
+
+def thread_exists(thread_id: str) -> bool:
+    """True while the thread is registered (touched and not yet deleted or collected)."""
+    with get_checkpointer().cursor(transaction=False) as cur:
+        cur.execute("SELECT 1 FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        return cur.fetchone() is not None
+
+
+def delete_thread(thread_id: str) -> None:
+    saver = get_checkpointer()
+    saver.delete_thread(thread_id)
+    with saver.cursor() as cur:
+        cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+    history_store.delete_session(thread_id)
+
+
+def collect_idle_threads(ttl_hours: float = SESSION_TTL_HOURS, now: Optional[float] = None) -> int:
+    """Delete every thread idle for longer than ttl_hours; returns how many."""
+    cutoff = (now or time.time()) - ttl_hours * 3600
+    saver = get_checkpointer()
+    with saver.cursor(transaction=False) as cur:
+        idle = [row[0] for row in cur.execute(
+            "SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)
+        )]
+    for thread_id in idle:
+        delete_thread(thread_id)
+    if idle:
+        logger.info("CHECKPOINT | collected %s idle threads", len(idle))
+    return len(idle)
+
+
+def maybe_collect_idle_threads() -> None:
+    """Throttled collect_idle_threads() for the request path."""
+    global _last_gc
+    now = time.time()
+    if now - _last_gc < SESSION_GC_INTERVAL:
+        return
+    _last_gc = now
+    try:
+        collect_idle_threads(now=now)
+    except Exception as e:
+        logger.error("CHECKPOINT | idle thread collection failed: %s", e)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the graph checkpoint database.")
+    parser.add_argument("--gc", action="store_true", help="delete threads idle longer than the TTL")
+    parser.add_argument("--ttl-hours", type=float, default=SESSION_TTL_HOURS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.gc:
+        print(f"Deleted {collect_idle_threads(args.ttl_hours)} idle threads")
+    else:
+        parser.print_help()
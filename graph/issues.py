@@ -0,0 +1,29 @@
+"""
+Structured supervisor issues.
+
+Workers report problems with issue(): a stable code plus the details a
+handler needs, alongside the human-readable supervisor_issue text. The
+supervisor resolves known codes with local rules and only sends unknown ones
+to the LLM.
+"""
+from typing import Any, Dict
+
+OUT_OF_STOCK = "out_of_stock"
+MISSING_SPEC_FIELDS = "missing_spec_fields"
+SPEC_EXTRACTION_FAILED = "spec_extraction_failed"
+TECHNICAL_SPEC_FAILED = "technical_spec_failed"
+ORDER_NOT_CONFIRMED = "order_not_confirmed"
+ORDER_CREATION_FAILED = "order_creation_failed"
+
+
+def issue(code: str, message: str, **details: Any) -> Dict[str, Any]:
+    """State update raising a supervisor issue."""
+    return {
+        "supervisor_issue": message,
+        "supervisor_issue_code": code,
+        "supervisor_issue_details": details,
+    }
+
+
+def clear_issue() -> Dict[str, Any]:
+    return {"supervisor_issue": None, "supervisor_issue_code": None, "supervisor_issue_details": None}
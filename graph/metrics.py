@@ -0,0 +1,92 @@
+"""
+In-process per-node latency metrics for the graph.
+
+build_graph() wraps every node with timed_node(), so each invocation's wall
+time is recorded under the node name. Counters track pipeline decisions such
+as skipped query refinements, which chat_pipeline_report() turns into an
+estimate of the latency saved by the single-pass chat path.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+from typing import Any, Callable, Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+_WINDOW = 1000  # most recent samples kept per node
+
+_lock = threading.Lock()
+_samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_WINDOW))
+_totals: Dict[str, int] = defaultdict(int)
+_counters: Dict[str, int] = defaultdict(int)
+
+
+def record(node: str, seconds: float) -> None:
+    with _lock:
+        _samples[node].append(seconds)
+        _totals[node] += 1
+
+
+def increment(counter: str, amount: int = 1) -> None:
+    with _lock:
+        _counters[counter] += amount
+
+
+def timed_node(name: str, fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a graph node so each call's latency is recorded under `name`."""
+    @wraps(fn)
+    def wrapper(state):
+        start = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            elapsed = time.perf_counter() - start
+            record(name, elapsed)
+            logger.debug("METRICS | %s | %.1f ms", name, elapsed * 1000)
+    return wrapper
+
+
+def _percentile(ordered, pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def snapshot() -> Dict[str, Any]:
+    """Per-node call counts and latency (ms) over the recent window, plus counters."""
+    with _lock:
+        samples = {name: sorted(values) for name, values in _samples.items() if values}
+        totals = dict(_totals)
+        counters = dict(_counters)
+    nodes = {
+        name: {
+            "calls": totals[name],
+            "mean_ms": round(sum(values) / len(values) * 1000, 1),
+            "p50_ms": round(_percentile(values, 50) * 1000, 1),
+            "p95_ms": round(_percentile(values, 95) * 1000, 1),
+            "p99_ms": round(_percentile(values, 99) * 1000, 1),
+        }
+        for name, values in samples.items()
+    }
+    return {"nodes": nodes, "counters": counters}
+
+
+def chat_pipeline_report() -> Dict[str, Any]:
+    """How often query refinement ran or was skipped, and the latency the skips
+    saved (skips x mean refinement latency)."""
+    data = snapshot()
+    refinement = data["nodes"].get("query_refinement", {})
+    skipped = data["counters"].get("chat_refinement_skipped", 0)
+    return {
+        "refinement_run": data["counters"].get("chat_refinement_run", 0),
+        "refinement_skipped": skipped,
+        "refinement_mean_ms": refinement.get("mean_ms"),
+        "estimated_saved_ms": round(skipped * refinement["mean_ms"], 1) if refinement else None,
+    }
+
+
+def reset() -> None:
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _counters.clear()
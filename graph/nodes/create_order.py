@@ -1,9 +1,9 @@
 import json
 import logging
-import traceback
-from datetime import datetime, timedelta
 from graph.state import WoodWorksState
+from graph.issues import ORDER_CREATION_FAILED, ORDER_NOT_CONFIRMED, issue
 from tools.fulfillment_tools import create_order_tool
+from tools.order_tools import get_order_by_idempotency_key
 
 logger = logging.getLogger(__name__)
 
@@ -14,9 +14,8 @@ def create_order_node(state: WoodWorksState) -> WoodWorksState:
     if not state.get("confirmed_by_user"):
         logger.warning("NODE | CreateOrder | attempted without user confirmation — BLOCKED")
         return {
-            **state,
             "assistant_response": "Order cannot be created without explicit confirmation.",
-            "supervisor_issue": "Order attempted without confirmation",
+            **issue(ORDER_NOT_CONFIRMED, "Order attempted without confirmation"),
         }
 
     user_id = state.get("user_id")
@@ -30,31 +29,23 @@ def create_order_node(state: WoodWorksState) -> WoodWorksState:
     human_spec_str = json.dumps(human_spec, indent=2)
     tech_spec_str = json.dumps(technical_spec, indent=2)
 
-    try:
-        from database.models import Order
-        from database.session import get_session
-        with get_session() as session:
-            cutoff = datetime.utcnow() - timedelta(seconds=60)
-            existing = (
-                session.query(Order)
-                .filter_by(user_id=user_id, product_id=product_id, status="confirmed")
-                .filter(Order.created_at >= cutoff)
-                .order_by(Order.created_at.desc())
-                .first()
+    idempotency_key = state.get("idempotency_key")
+    if idempotency_key:
+        try:
+            existing = get_order_by_idempotency_key(idempotency_key)
+        except Exception as dup_e:
+            # Non-fatal — the unique constraint still rejects a duplicate insert
+            logger.warning("NODE | CreateOrder | idempotency lookup skipped: %s", dup_e)
+            existing = None
+        if existing:
+            logger.warning(
+                "NODE | CreateOrder | duplicate confirmation — reusing order_id=%s",
+                existing['order_id'],
             )
-            if existing:
-                logger.warning(
-                    f"NODE | CreateOrder | duplicate blocked — order_id={existing.id} "
-                    f"created {datetime.utcnow() - existing.created_at:.1f}s ago"
-                )
-                return {
-                    **state,
-                    "order_id": existing.id,
-                    "current_node": "create_order",
-                }
-    except Exception as dup_e:
-        # Non-fatal — if duplicate check fails (e.g. model not yet migrated), proceed normally
-        logger.warning(f"NODE | CreateOrder | duplicate check skipped: {dup_e}")
+            return {
+                "order_id": existing["order_id"],
+                "current_node": "create_order",
+            }
 
     try:
         tool_result = create_order_tool.invoke({
@@ -62,22 +53,21 @@ def create_order_node(state: WoodWorksState) -> WoodWorksState:
             "product_id": product_id,
             "human_spec": human_spec_str,
             "technical_spec": tech_spec_str,
-            "final_price": final_price
+            "final_price": final_price,
+            "idempotency_key": idempotency_key,
         })
 
         order_id = tool_result.get("order_id")
-        logger.info(f"NODE | CreateOrder | Tool Success | order_id={order_id}")
+        logger.info("NODE | CreateOrder | Tool Success | order_id=%s", order_id)
 
     except Exception as e:
-        logger.error(f"NODE | CreateOrder | Tool Error: {e}\n{traceback.format_exc()}")
+        logger.error("NODE | CreateOrder | Tool Error: %s", e, exc_info=True)
         return {
-            **state,
-            "supervisor_issue": f"Order creation failed: {e}",
+            **issue(ORDER_CREATION_FAILED, f"Order creation failed: {e}"),
             "error": str(e),
         }
 
     return {
-        **state,
         "order_id": order_id,
         "current_node": "create_order",
     }
@@ -37,14 +37,12 @@ def final_confirmation_node(state: WoodWorksState) -> WoodWorksState:
         f"Please confirm your order by clicking **Confirm Order** below, or type 'cancel' to start over."
     )
 
-    logger.info(f"NODE | FinalConfirmation | confirmation shown | total=${total_price}")
+    logger.info("NODE | FinalConfirmation | confirmation shown | total=$%s", total_price)
     logger.info("NODE | FinalConfirmation | EXIT")
 
-    _existing_history = state.get("conversation_history") or []
     return {
-        **state,
         "confirmation_status": True,
         "assistant_response": confirmation_message,
         "current_node": "final_confirmation",
-        "conversation_history": _existing_history + [{"role": "assistant", "content": confirmation_message}],
+        "conversation_history": [{"role": "assistant", "content": confirmation_message}],
     }
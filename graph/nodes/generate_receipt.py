@@ -38,10 +38,10 @@ def generate_receipt_node(state: WoodWorksState) -> WoodWorksState:
             "human_spec": human_spec_str,
         })
         
-        logger.info(f"NODE | GenerateReceipt | Tool Success | path={receipt_path}")
+        logger.info("NODE | GenerateReceipt | Tool Success | path=%s", receipt_path)
 
     except Exception as e:
-        logger.error(f"NODE | GenerateReceipt | Tool Error: {e}")
+        logger.error("NODE | GenerateReceipt | Tool Error: %s", e)
         receipt_path = None
     
     success_message = (
@@ -52,11 +52,9 @@ def generate_receipt_node(state: WoodWorksState) -> WoodWorksState:
     )
 
     logger.info("NODE | GenerateReceipt | EXIT")
-    _existing_history = state.get("conversation_history") or []
     return {
-        **state,
         "receipt_path": receipt_path,
         "assistant_response": success_message,
         "current_node": "generate_receipt",
-        "conversation_history": _existing_history + [{"role": "assistant", "content": success_message}],
+        "conversation_history": [{"role": "assistant", "content": success_message}],
     }
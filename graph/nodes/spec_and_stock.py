@@ -0,0 +1,79 @@
+import contextvars
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from graph.state import WoodWorksState
+from graph.issues import OUT_OF_STOCK, issue
+from graph.metrics import timed_node
+from agents.technical_spec import technical_spec_agent_node
+from tools.db_tools import check_inventory
+from config.settings import API_MAX_CONCURRENT_TURNS
+
+logger = logging.getLogger(__name__)
+
+# The stock check doesn't depend on the technical spec, so the spec LLM call
+# runs here while the calling thread checks stock. One worker per concurrent
+# turn, so a slow LLM call never queues another session's spec behind it.
+_executor = ThreadPoolExecutor(max_workers=API_MAX_CONCURRENT_TURNS, thread_name_prefix="spec-stock")
+_technical_spec = timed_node("technical_spec_agent", technical_spec_agent_node)
+
+
+def _checked_inventory(product_id, quantity: int):
+    try:
+        return check_inventory(product_id=product_id, quantity=quantity)
+    except Exception as e:
+        logger.error("NODE | SpecAndStock | stock check error: %s", e)
+        return {"available": False, "quantity_in_stock": 0, "requested_quantity": quantity, "sku": None}
+
+
+def _discard_spec(future: Future) -> None:
+    if future.exception():
+        logger.warning("NODE | SpecAndStock | discarded spec call failed: %s", future.exception())
+    else:
+        logger.info("NODE | SpecAndStock | discarded spec result (out of stock)")
+
+
+def spec_and_stock_node(state: WoodWorksState) -> WoodWorksState:
+    logger.info("NODE | SpecAndStock | ENTER")
+
+    product = state.get("selected_product") or {}
+    human_spec = state.get("human_spec") or {}
+    quantity = human_spec.get("quantity", 1)
+    product_id = product.get("product_id")
+
+    # Skip the LLM call up front when the cached catalog already shows too
+    # little stock; the inline check below has the final say either way
+    cached_stock = product.get("stock_quantity")
+    spec_future = None
+    if cached_stock is None or cached_stock >= quantity:
+        # copy_context() keeps the trace span parent for the LLM call's spans
+        spec_future = _executor.submit(contextvars.copy_context().run, _technical_spec, state)
+
+    stock_result = _checked_inventory(product_id, quantity)
+    logger.info("NODE | SpecAndStock | stock check: %s", stock_result)
+
+    if not stock_result["available"]:
+        # Short-circuit: drop the spec call if it hasn't started, else discard its result
+        if spec_future is not None and not spec_future.cancel():
+            spec_future.add_done_callback(_discard_spec)
+        logger.warning("NODE | SpecAndStock | insufficient stock for product_id=%s", product_id)
+        return {
+            "stock_status": stock_result,
+            **issue(
+                OUT_OF_STOCK,
+                f"Insufficient stock for {product.get('name')}. "
+                f"Requested: {quantity}, Available: {stock_result['quantity_in_stock']}",
+                product_id=product_id,
+                category=product.get("category"),
+                requested=quantity,
+                available=stock_result["quantity_in_stock"],
+            ),
+            "current_node": "spec_and_stock",
+        }
+
+    spec_update = spec_future.result() if spec_future is not None else _technical_spec(state)
+    logger.info("NODE | SpecAndStock | EXIT")
+    return {
+        **spec_update,
+        "stock_status": stock_result,
+        "current_node": "spec_and_stock",
+    }
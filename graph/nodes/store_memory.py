@@ -1,7 +1,7 @@
 import json
 import logging
 from graph.state import WoodWorksState
-from tools.db_tools import store_workflow_memory
+from tools.db_tools import queue_workflow_memory
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +33,7 @@ def store_memory_node(state: WoodWorksState) -> WoodWorksState:
     }
 
     try:
-        memory_id = store_workflow_memory(
+        queue_workflow_memory(
             user_id=user_id,
             product_id=product_id,
             session_type="workflow",
@@ -41,13 +41,12 @@ def store_memory_node(state: WoodWorksState) -> WoodWorksState:
             final_state=final_state_snapshot,
             pricing=pricing.get("total_price"),
         )
-        logger.info(f"NODE | StoreMemory | memory stored | id={memory_id}")
+        logger.info("NODE | StoreMemory | memory queued")
     except Exception as e:
-        logger.error(f"NODE | StoreMemory | failed to store memory: {e}")
+        logger.error("NODE | StoreMemory | failed to queue memory: %s", e)
 
     logger.info("NODE | StoreMemory | EXIT")
     return {
-        **state,
         "workflow_complete": True,
         "current_node": "store_memory",
     }
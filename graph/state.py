@@ -1,10 +1,32 @@
 from typing import Optional, List, Dict, Any
-from typing_extensions import TypedDict
+from typing_extensions import Annotated, TypedDict
 
+TRIM_MARKER = "__trim__"
+
+
+def trim_history(count: int) -> Dict[str, int]:
+    """History update item that drops the oldest `count` messages."""
+    return {TRIM_MARKER: count}
+
+
+def append_history(
+    existing: Optional[List[Dict[str, Any]]],
+    update: Optional[List[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """Reducer for conversation_history: appends the update's messages, applying
+    any trim_history() markers in order."""
+    history = list(existing or [])
+    for item in update or []:
+        if TRIM_MARKER in item:
+            del history[:item[TRIM_MARKER]]
+        else:
+            history.append(item)
+    return history
 
 
 class WoodWorksState(TypedDict, total=False):
     # Meta
+    session_id: Optional[str]          # set by the UI once per browser session
     mode: str                          # "chat" | "workflow"
     current_node: str
     supervisor_steps: int
@@ -13,17 +35,22 @@ class WoodWorksState(TypedDict, total=False):
 
     # Conversation
     user_message: str
-    # Plain list — NO operator.add reducer. History is managed explicitly.
-    # Each node that writes history must build the full updated list:
-    #   existing = state.get("conversation_history") or []
-    #   updated  = existing + [{"role": "assistant", "content": msg}]
-    conversation_history: Optional[List[Dict[str, str]]]
+    # Append reducer: nodes return only the messages they add, e.g.
+    #   {"conversation_history": [{"role": "assistant", "content": msg}]}
+    # and trim_history(n) as an item drops the oldest n messages.
+    conversation_history: Annotated[List[Dict[str, Any]], append_history]
+    # Chat turns older than the history window, folded in by memory.chat_summary
+    conversation_summary: Optional[str]
+    # Messages moved out of conversation_history to memory.history_store; the
+    # window's first message is message number history_offset of the session
+    history_offset: int
     assistant_response: str
 
     # Chat subgraph pipeline fields
     refined_query: Optional[str]          # written by query_refinement, read by reasoning
     retrieved_context: Optional[str]      # written by data_retrieval, read by reasoning
     reasoning_output: Optional[str]       # written by reasoning, read by response_generator
+    answer_cache_question: Optional[str]  # set by answer_cache on a miss, read by reasoning
 
     # User info
     user_info: Optional[Dict[str, Any]]
@@ -31,6 +58,9 @@ class WoodWorksState(TypedDict, total=False):
 
     # Product
     selected_product: Optional[Dict[str, Any]]
+    # In-stock alternative offered after an out-of-stock check, waiting for the
+    # customer's yes/no; selected_product only changes once they accept
+    proposed_product: Optional[Dict[str, Any]]
 
     # Specs
     human_spec_question_asked: bool      # tracks two-stage human_spec flow
@@ -48,9 +78,12 @@ class WoodWorksState(TypedDict, total=False):
     # Order
     order_id: Optional[int]
     receipt_path: Optional[str]
+    idempotency_key: Optional[str]       # set by the UI once per confirmation
 
     # Supervisor
     supervisor_issue: Optional[str]
+    supervisor_issue_code: Optional[str]               # graph.issues code, if the worker set one
+    supervisor_issue_details: Optional[Dict[str, Any]]
     supervisor_decision: Optional[Dict[str, Any]]
 
     # Image analysis (vision feature)
@@ -62,6 +95,7 @@ class WoodWorksState(TypedDict, total=False):
 
 def get_initial_state(user_message: str) -> WoodWorksState:
     return WoodWorksState(
+        session_id=None,
         mode="",
         current_node="intent_decider",
         supervisor_steps=0,
@@ -69,13 +103,17 @@ def get_initial_state(user_message: str) -> WoodWorksState:
         workflow_complete=False,
         user_message=user_message,
         conversation_history=[],
+        conversation_summary=None,
+        history_offset=0,
         assistant_response="",
         refined_query=None,
         retrieved_context=None,
         reasoning_output=None,
+        answer_cache_question=None,
         user_info=None,
         user_id=None,
         selected_product=None,
+        proposed_product=None,
         human_spec_question_asked=False,
         human_spec=None,
         technical_spec=None,
@@ -85,7 +123,10 @@ def get_initial_state(user_message: str) -> WoodWorksState:
         confirmed_by_user=False,
         order_id=None,
         receipt_path=None,
+        idempotency_key=None,
         supervisor_issue=None,
+        supervisor_issue_code=None,
+        supervisor_issue_details=None,
         supervisor_decision=None,
         image_spec_hint=None,
         discount_applied=None,
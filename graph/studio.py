@@ -0,0 +1,9 @@
+"""
+LangGraph Studio / `langgraph dev` entry point (see langgraph.json).
+
+Kept out of graph/builder.py so the app never compiles this copy; the server
+supplies its own persistence, so it is compiled without a checkpointer.
+"""
+from graph.builder import build_graph
+
+graph = build_graph()
@@ -0,0 +1,163 @@
+"""
+Session turns, independent of the UI.
+
+The Streamlit app (app.py) and the HTTP API (api/server.py) both drive the
+graph through these functions. Each takes a session_id (the checkpointer
+thread id), sends only the new turn, and returns a TurnResult with the reply
+and the flags a UI needs. They block on the graph and the LLM; the API runs
+them in worker threads.
+"""
+import logging
+import uuid
+from typing import Any, Dict, Optional
+from typing_extensions import TypedDict
+from config.tracing import span
+from graph.builder import get_graph
+from graph.checkpointing import thread_config, touch_thread, maybe_collect_idle_threads
+from graph.issues import clear_issue
+from graph.state import trim_history
+from memory.history_store import history_overflow, spill_oldest
+from memory.short_term import clear_workflow_state
+
+logger = logging.getLogger(__name__)
+
+CANCEL_WORDS = ("cancel", "cancel order", "stop")
+CANCEL_MESSAGE = "Order cancelled. Feel free to start fresh or ask me anything!"
+
+
+class TurnResult(TypedDict):
+    response: str
+    mode: str
+    waiting_for_confirmation: bool
+    order_complete: bool
+    order_id: Optional[int]
+    receipt_path: Optional[str]
+
+
+def load_state(session_id: str) -> Dict[str, Any]:
+    """The session's graph state from the checkpointer (empty for a new thread)."""
+    return dict(get_graph().get_state(thread_config(session_id)).values)
+
+
+def update_state(session_id: str, values: Dict[str, Any]) -> None:
+    """Write fields into the session's checkpointed state outside a graph run."""
+    get_graph().update_state(thread_config(session_id), values)
+
+
+def turn_result(state: Dict[str, Any], response: str) -> TurnResult:
+    return TurnResult(
+        response=response,
+        mode=state.get("mode") or "",
+        waiting_for_confirmation=bool(state.get("confirmation_status") and not state.get("confirmed_by_user")),
+        order_complete=bool(state.get("workflow_complete")),
+        order_id=state.get("order_id"),
+        receipt_path=state.get("receipt_path"),
+    )
+
+
+def _invoke(session_id: str, turn: Dict[str, Any]) -> Dict[str, Any]:
+    # durability="exit": one checkpoint per turn instead of one per node
+    with span("turn", session_id=session_id):
+        result = get_graph().invoke(turn, thread_config(session_id), durability="exit")
+    _bound_history(session_id, result)
+    touch_thread(session_id)
+    maybe_collect_idle_threads()
+    return result
+
+
+def _bound_history(session_id: str, state: Dict[str, Any]) -> None:
+    """Past HISTORY_MAX_MESSAGES, move the oldest messages to the history store."""
+    overflow = history_overflow(state)
+    if overflow:
+        offset = spill_oldest({**state, "session_id": session_id}, overflow)
+        update_state(session_id, {"conversation_history": [trim_history(overflow)], "history_offset": offset})
+        logger.info("TURN | history | spilled %s messages thread=%s", overflow, session_id)
+
+
+def cancel_order(session_id: str) -> TurnResult:
+    update_state(session_id, clear_workflow_state())
+    return turn_result(load_state(session_id), CANCEL_MESSAGE)
+
+
+def send_message(session_id: str, user_message: str) -> TurnResult:
+    """Run one chat/workflow turn for a user message ("cancel" resets the order)."""
+    if user_message.strip().lower() in CANCEL_WORDS:
+        return cancel_order(session_id)
+
+    # Only this turn's fields are sent; the checkpointer supplies the rest and
+    # the history reducer appends the new message
+    turn = {
+        "session_id": session_id,
+        "user_message": user_message,
+        "conversation_history": [{"role": "user", "content": user_message}],
+        **clear_issue(),
+    }
+    logger.info("TURN | send_message | message='%s...' thread=%s", user_message[:60], session_id)
+    result = _invoke(session_id, turn)
+
+    response = result.get("assistant_response", "").strip()
+    if not response:
+        current = result.get("current_node", "")
+        if current == "technical_spec_agent":
+            response = "Technical spec ready. Calculating stock and pricing now..."
+        elif current == "stock_pricing_agent":
+            response = "Pricing complete. Review your order summary above."
+        else:
+            response = "Processing your request, please continue..."
+    return turn_result(result, response)
+
+
+def confirm_order(session_id: str) -> TurnResult:
+    """Confirm the order on the table and run creation, receipt and memory."""
+    # One key per confirmation: reruns and retries reuse it, so the unique
+    # constraint on orders resolves them to the order already created. It is
+    # checkpointed before the run so a failed run's retry still finds it.
+    state = load_state(session_id)
+    idempotency_key = state.get("idempotency_key")
+    if not idempotency_key:
+        idempotency_key = uuid.uuid4().hex
+        update_state(session_id, {"idempotency_key": idempotency_key})
+
+    turn = {
+        "session_id": session_id,
+        "confirmed_by_user": True,
+        "confirmation_status": True,
+        **clear_issue(),
+        "user_message": "CONFIRMED",
+    }
+    logger.info(
+        "TURN | confirm_order | thread=%s order_id=%s receipt_path=%s idempotency_key=%s",
+        session_id, state.get('order_id'), state.get('receipt_path'), idempotency_key,
+    )
+    result = _invoke(session_id, turn)
+    response = result.get("assistant_response", "").strip() or "Processing your order... please wait a moment."
+    return turn_result(result, response)
+
+
+def analyze_image(session_id: str, image_bytes: bytes, media_type: str) -> Dict[str, Any]:
+    """Analyze an uploaded furniture photo for the session.
+
+    In workflow mode the analysis pre-fills specs (image_spec_hint); in chat
+    mode the description is added to the conversation. Returns the
+    image_search result plus "response", the message to show.
+    """
+    state = load_state(session_id)
+    if state.get("mode") == "workflow":
+        from tools.image_search import process_image_for_workflow
+        result = process_image_for_workflow(image_bytes, media_type)
+        if result["success"]:
+            update_state(session_id, {"image_spec_hint": result["human_spec_hint"]})
+            result["response"] = result["workflow_message"]
+        return result
+
+    from tools.image_search import process_image_for_chat
+    result = process_image_for_chat(image_bytes, media_type)
+    if result["success"]:
+        # Sync to conversation_history so the chat agent sees it, and store the
+        # structured hint for reasoning/response nodes
+        update_state(session_id, {
+            "conversation_history": [{"role": "assistant", "content": result["chat_response"]}],
+            "image_spec_hint": result["analysis"],
+        })
+        result["response"] = result["chat_response"]
+    return result
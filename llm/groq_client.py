@@ -1,22 +1,33 @@
 import logging
-from groq import Groq
+from typing import TYPE_CHECKING
 from config.settings import GROQ_API_KEY, GROQ_MODEL
+from config.tracing import span
+
+if TYPE_CHECKING:
+    from groq import Groq
 
 logger = logging.getLogger(__name__)
 
 _client = None
 
 
-def get_groq_client() -> Groq:
+def get_groq_client() -> "Groq":
     global _client
     if _client is None:
         if not GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY is not set in environment variables.")
+        from groq import Groq  # deferred: the SDK is only needed once a call is made
         _client = Groq(api_key=GROQ_API_KEY)
         logger.info("Groq client initialized.")
     return _client
 
 
+def _record_usage(s, response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+
 def call_llm(
     prompt: str,
     system: str = "",
@@ -39,10 +50,12 @@ def call_llm(
     if json_mode:
         kwargs["response_format"] = {"type": "json_object"}
 
-    logger.debug(f"LLM call | json_mode={json_mode} | prompt_len={len(prompt)}")
-    response = client.chat.completions.create(**kwargs)
+    logger.debug("LLM call | json_mode=%s | prompt_len=%s", json_mode, len(prompt))
+    with span("llm.call", model=GROQ_MODEL, json_mode=json_mode, prompt_chars=len(prompt)) as s:
+        response = client.chat.completions.create(**kwargs)
+        _record_usage(s, response)
     content = response.choices[0].message.content
-    logger.debug(f"LLM response_len={len(content)}")
+    logger.debug("LLM response_len=%s", len(content))
     return content
 
 
@@ -58,12 +71,14 @@ def call_llm_with_history(
         full_messages.append({"role": "system", "content": system})
     full_messages.extend(messages)
 
-    logger.debug(f"LLM call with history | turns={len(messages)}")
-    response = client.chat.completions.create(
-        model=GROQ_MODEL,
-        messages=full_messages,
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
+    logger.debug("LLM call with history | turns=%s", len(messages))
+    with span("llm.call", model=GROQ_MODEL, history_turns=len(messages)) as s:
+        response = client.chat.completions.create(
+            model=GROQ_MODEL,
+            messages=full_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        _record_usage(s, response)
     content = response.choices[0].message.content
     return content
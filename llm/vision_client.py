@@ -7,9 +7,13 @@ and a vision-capable model).  Never touches the primary GROQ_API_KEY.
 
 import base64
 import logging
+from typing import TYPE_CHECKING
 
-from groq import Groq
 from config.settings import GROQ_VISION_API_KEY, GROQ_VISION_MODEL
+from config.tracing import span
+
+if TYPE_CHECKING:
+    from groq import Groq
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +21,7 @@ logger = logging.getLogger(__name__)
 _vision_client = None
 
 
-def _get_vision_client() -> Groq:
+def _get_vision_client() -> "Groq":
     """Return (or create) the dedicated vision Groq client."""
     global _vision_client
     if _vision_client is None:
@@ -26,6 +30,7 @@ def _get_vision_client() -> Groq:
                 "GROQ_VISION_API_KEY is not set. "
                 "Please add it to your .env file to enable image analysis."
             )
+        from groq import Groq  # deferred until the first image is analysed
         _vision_client = Groq(api_key=GROQ_VISION_API_KEY)
         logger.info("VISION | vision_client initialized (model=%s)", GROQ_VISION_MODEL)
     return _vision_client
@@ -75,12 +80,16 @@ def analyze_image(
             }
         ]
 
-        response = client.chat.completions.create(
-            model=GROQ_VISION_MODEL,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
+        with span("llm.vision", model=GROQ_VISION_MODEL, media_type=media_type, image_bytes=len(image_bytes)) as s:
+            response = client.chat.completions.create(
+                model=GROQ_VISION_MODEL,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
 
         content = response.choices[0].message.content
         logger.info("VISION | analyze_image | response_len=%d", len(content))
@@ -0,0 +1,206 @@
+"""
+Local semantic cache of chat answers for repeated FAQ-style questions.
+
+Questions are normalized and embedded with a hashing TF-IDF vectorizer
+(unigrams + bigrams hashed into ANSWER_CACHE_DIM buckets, no fitted
+vocabulary), one row per cached question in a NumPy matrix. A new question
+is served from the cache when its cosine similarity to a stored question is
+at least ANSWER_CACHE_THRESHOLD and the answer was produced against the
+current catalog version (products added, removed or edited; stock does not
+count). Entries are evicted least-recently-used, and the whole cache is
+dropped whenever the catalog version changes.
+
+The cache is shared by every session, so only answers generated from a
+prompt without history, summary or customer details may be stored, and
+questions about the customer themselves ("my order", "did I") never are.
+"""
+import logging
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+from tools.catalog_render import on_catalog_change
+from config.settings import ANSWER_CACHE_DIM, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Filler that never changes what is being asked; question words like "how"
+# stay, so "how long is delivery" and "how much is delivery" differ.
+_STOPWORDS = {
+    "a", "an", "the", "do", "does", "did", "you", "your", "yours", "is", "are", "am", "be",
+    "can", "could", "would", "please", "to", "of", "for", "any", "what", "which", "there",
+    "guys", "hi", "hello", "hey", "tell", "about", "know", "want", "kind", "type", "sort",
+    "will", "should", "get",
+}
+
+# Words that make a question about this customer rather than the catalog
+_PERSONAL_WORDS = {"i", "im", "ive", "id", "me", "my", "mine", "myself", "we", "us", "our", "ours"}
+
+
+def is_personal_question(text: str) -> bool:
+    """True for questions about the customer ("where is my order"), whose
+    answers depend on their session and must not be shared."""
+    text = unicodedata.normalize("NFKC", text).lower().replace("'", "").replace("\u2019", "")
+    return any(w in _PERSONAL_WORDS for w in re.findall(r"[a-z0-9]+", text))
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    words = [w for w in re.findall(r"[a-z0-9]+", text) if w not in _STOPWORDS]
+    # Crude plural folding ("woods" ~ "wood") — enough for FAQ matching
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+def _features(normalized: str) -> List[str]:
+    words = normalized.split()
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+def hash_term_frequencies(normalized: str, dim: int = ANSWER_CACHE_DIM) -> np.ndarray:
+    """Sublinear term frequencies in hashed buckets (crc32 is stable across runs)."""
+    counts: Dict[int, int] = {}
+    for feature in _features(normalized):
+        bucket = zlib.crc32(feature.encode("utf-8")) % dim
+        counts[bucket] = counts.get(bucket, 0) + 1
+    vector = np.zeros(dim, dtype=np.float32)
+    for bucket, count in counts.items():
+        vector[bucket] = 1.0 + math.log(count)
+    return vector
+
+
+class AnswerCache:
+    """Fixed-capacity matrix of question vectors with parallel answer slots."""
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        dim: int = ANSWER_CACHE_DIM,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._tf = np.zeros((max_entries, dim), dtype=np.float32)
+        self._df = np.zeros(dim, dtype=np.float32)          # document frequency per bucket
+        self._weighted: Optional[np.ndarray] = None          # L2-normalized TF-IDF rows, rebuilt lazily
+        self._used = np.zeros(max_entries, dtype=bool)
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._questions: List[Optional[str]] = [None] * max_entries
+        self._answers: List[Optional[str]] = [None] * max_entries
+        self._versions: List[Any] = [None] * max_entries
+        self._slot_by_question: Dict[str, int] = {}
+        self._tick = 0
+        self.hits = self.misses = self.evictions = 0
+
+    # ── Vector maths ──────────────────────────────────────────────────────────
+    def _idf(self) -> np.ndarray:
+        n = int(self._used.sum())
+        return np.log((1.0 + n) / (1.0 + self._df)).astype(np.float32) + 1.0
+
+    def _weighted_rows(self) -> np.ndarray:
+        if self._weighted is None:
+            rows = self._tf * self._idf()
+            norms = np.linalg.norm(rows, axis=1, keepdims=True)
+            self._weighted = np.divide(rows, norms, out=np.zeros_like(rows), where=norms > 0)
+        return self._weighted
+
+    def _query_vector(self, normalized: str) -> Optional[np.ndarray]:
+        vector = hash_term_frequencies(normalized, self.dim) * self._idf()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    # ── Slots ─────────────────────────────────────────────────────────────────
+    def _free_slot(self, slot: int) -> None:
+        self._df -= self._tf[slot] > 0
+        self._tf[slot] = 0.0
+        self._used[slot] = False
+        self._slot_by_question.pop(self._questions[slot], None)
+        self._questions[slot] = self._answers[slot] = self._versions[slot] = None
+        self._weighted = None
+
+    def _claim_slot(self) -> int:
+        free = np.flatnonzero(~self._used)
+        if free.size:
+            return int(free[0])
+        slot = int(np.argmin(self._last_used))
+        self._free_slot(slot)
+        self.evictions += 1
+        return slot
+
+    # ── Public API ────────────────────────────────────────────────────────────
+    def lookup(self, question: str, catalog_version: Any) -> Optional[str]:
+        normalized = normalize_question(question)
+        with self._lock:
+            self._tick += 1
+            if normalized and self._used.any():
+                query = self._query_vector(normalized)
+                if query is not None:
+                    scores = self._weighted_rows() @ query
+                    scores[~self._used] = -1.0
+                    slot = int(np.argmax(scores))
+                    if scores[slot] >= self.threshold:
+                        if self._versions[slot] == catalog_version:
+                            self._last_used[slot] = self._tick
+                            self.hits += 1
+                            logger.info(
+                                "ANSWER_CACHE | hit | score=%.3f q='%s'",
+                                scores[slot], self._questions[slot][:60],
+                            )
+                            return self._answers[slot]
+                        self._free_slot(slot)  # answered against an older catalog
+            self.misses += 1
+            return None
+
+    def store(self, question: str, answer: str, catalog_version: Any) -> None:
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        with self._lock:
+            self._tick += 1
+            slot = self._slot_by_question.get(normalized)
+            if slot is None:
+                slot = self._claim_slot()
+                self._tf[slot] = hash_term_frequencies(normalized, self.dim)
+                self._df += self._tf[slot] > 0
+                self._used[slot] = True
+                self._questions[slot] = normalized
+                self._slot_by_question[normalized] = slot
+                self._weighted = None
+            self._answers[slot] = answer
+            self._versions[slot] = catalog_version
+            self._last_used[slot] = self._tick
+
+    def invalidate(self) -> None:
+        with self._lock:
+            for slot in np.flatnonzero(self._used):
+                self._free_slot(int(slot))
+        logger.info("ANSWER_CACHE | invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self._used.sum()),
+                "capacity": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+            on_catalog_change(_cache.invalidate)
+        return _cache
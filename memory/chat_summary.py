@@ -0,0 +1,101 @@
+"""
+Rolling conversation summary for chat sessions.
+
+Once CHAT_SUMMARY_EVERY_N_TURNS turns have piled up beyond the verbatim
+window, store_chat_summary_node hands the older messages to a background
+worker, which folds them into the session's summary with one LLM call. The
+finished summary is picked up by the next turn, so the response path never
+waits on it. Summaries live in the session's graph state only: without a
+verified customer identity there is nobody to restore them to later, so
+they are not written to long-term memory.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from agents.prompt_loader import load_prompt
+from llm.groq_client import call_llm
+from config.settings import CHAT_SUMMARY_MAX_WORDS
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+_lock = threading.Lock()
+_pending: Dict[str, Future] = {}
+
+
+def format_turns(messages: List[Dict[str, str]]) -> str:
+    return "\n".join(f"{m.get('role', 'unknown').capitalize()}: {m.get('content', '')}" for m in messages)
+
+
+def summarize_turns(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    prompt = load_prompt(
+        "chat_summary.txt",
+        previous_summary=previous_summary or "None yet.",
+        new_turns=format_turns(messages),
+        max_words=CHAT_SUMMARY_MAX_WORDS,
+    )
+    summary = call_llm(prompt, temperature=0.2, max_tokens=CHAT_SUMMARY_MAX_WORDS * 2).strip()
+    # Hard bound, in case the model ignores the word limit
+    return " ".join(summary.split()[:CHAT_SUMMARY_MAX_WORDS])
+
+
+def _summarize(
+    session_id: str,
+    previous: Optional[Future],
+    previous_summary: Optional[str],
+    messages: List[Dict[str, str]],
+) -> str:
+    # Chain onto the session's in-flight job so no turns are summarized twice or lost
+    if previous is not None:
+        try:
+            previous_summary = previous.result()
+        except Exception:
+            pass
+    try:
+        summary = summarize_turns(previous_summary, messages)
+    except Exception as e:
+        logger.error("CHAT_SUMMARY | session=%s | summarization failed: %s", session_id, e)
+        # Keep the old summary plus a plain transcript tail rather than losing the turns
+        return "\n".join(filter(None, [previous_summary, format_turns(messages)]))
+    logger.info("CHAT_SUMMARY | session=%s | folded %s messages (%s chars)", session_id, len(messages), len(summary))
+    return summary
+
+
+def schedule_summary(
+    session_id: str,
+    previous_summary: Optional[str],
+    messages: List[Dict[str, str]],
+) -> None:
+    """Fold `messages` into the session's summary in the background."""
+    with _lock:
+        previous = _pending.get(session_id)
+        _pending[session_id] = _executor.submit(
+            _summarize, session_id, previous, previous_summary, list(messages)
+        )
+
+
+def latest_summary(session_id: Optional[str], fallback: Optional[str]) -> Optional[str]:
+    """The newest finished summary for the session, else `fallback` (the one in state).
+    Never blocks: a summary still being written is picked up on a later turn."""
+    if not session_id:
+        return fallback
+    with _lock:
+        future = _pending.get(session_id)
+    if future is None or not future.done():
+        return fallback
+    try:
+        return future.result()
+    except Exception:
+        return fallback
+
+
+def collect_summary(session_id: Optional[str], fallback: Optional[str]) -> Optional[str]:
+    """Like latest_summary, but a finished job is dropped once its result is
+    returned; call it where the summary is written back into state."""
+    summary = latest_summary(session_id, fallback)
+    with _lock:
+        future = _pending.get(session_id)
+        if future is not None and future.done():
+            del _pending[session_id]
+    return summary
@@ -0,0 +1,172 @@
+"""
+On-disk store for conversation messages that have left memory.
+
+A session keeps only a bounded window of messages in memory, in two places:
+
+    "graph"  conversation_history in the checkpointed graph state. Past
+             HISTORY_MAX_MESSAGES (or when the chat summarizer folds older
+             turns), the oldest messages are saved here and trimmed from
+             state; history_offset counts how many.
+    "ui"     the transcript the Streamlit app shows (HistoryWindow), written
+             through as messages arrive so a reopened tab can restore it.
+
+Each message is one zlib-compressed JSON row keyed by (session_id, channel,
+seq), seq being the message's position in the session's transcript. Rows
+are read back a page at a time, only when the UI scrolls up or a caller asks
+for older messages, and are deleted with the session
+(graph.checkpointing.delete_thread).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import HISTORY_DB, HISTORY_KEEP_MESSAGES, HISTORY_MAX_MESSAGES, HISTORY_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS history (
+    session_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (session_id, channel, seq)
+) WITHOUT ROWID;
+"""
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(HISTORY_DB) or ".", exist_ok=True)
+        conn = sqlite3.connect(HISTORY_DB, timeout=10, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_DDL)
+        _conn = conn
+        logger.info("HISTORY_STORE | ready at %s", HISTORY_DB)
+    return _conn
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def save(session_id: str, channel: str, start: int, messages: List[Dict[str, Any]]) -> None:
+    """Store messages as seq start, start+1, ... (re-saving a seq replaces it, so retries are harmless)."""
+    rows = [(session_id, channel, start + i, _encode(m)) for i, m in enumerate(messages)]
+    with _lock:
+        conn = _connection()
+        conn.executemany("INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+
+
+def load(session_id: str, channel: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Messages with start <= seq < end, oldest first."""
+    with _lock:
+        rows = _connection().execute(
+            "SELECT payload FROM history WHERE session_id = ? AND channel = ? AND seq >= ? AND seq < ? "
+            "ORDER BY seq",
+            (session_id, channel, start, end),
+        ).fetchall()
+    return [_decode(payload) for (payload,) in rows]
+
+
+def count(session_id: str, channel: str) -> int:
+    """Number of messages stored for the channel (one past the highest seq)."""
+    with _lock:
+        (last,) = _connection().execute(
+            "SELECT MAX(seq) FROM history WHERE session_id = ? AND channel = ?", (session_id, channel)
+        ).fetchone()
+    return 0 if last is None else last + 1
+
+
+def delete_session(session_id: str) -> None:
+    with _lock:
+        conn = _connection()
+        conn.execute("DELETE FROM history WHERE session_id = ?", (session_id,))
+        conn.commit()
+
+
+# ── Graph state ───────────────────────────────────────────────────────────────
+def spill_oldest(state: Dict[str, Any], n: int) -> int:
+    """Save the oldest n messages of the state's conversation_history under
+    "graph" and return the new history_offset. The caller trims them from
+    state with trim_history(n)."""
+    offset = state.get("history_offset") or 0
+    save(state["session_id"], "graph", offset, (state.get("conversation_history") or [])[:n])
+    return offset + n
+
+
+def history_overflow(state: Dict[str, Any]) -> int:
+    """How many messages to spill from state: 0 until the window passes
+    HISTORY_MAX_MESSAGES, then enough to get back to HISTORY_KEEP_MESSAGES."""
+    size = len(state.get("conversation_history") or [])
+    return size - HISTORY_KEEP_MESSAGES if size > HISTORY_MAX_MESSAGES else 0
+
+
+def history_page(
+    state: Dict[str, Any], before: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Up to `limit` messages of the session's whole conversation ending just
+    before seq `before` (default: the latest), read from the store for spilled
+    messages and from state for the rest. Returns (messages, seq of the first)."""
+    offset = state.get("history_offset") or 0
+    window = state.get("conversation_history") or []
+    end = offset + len(window)
+    before = end if before is None else max(0, min(before, end))
+    start = max(0, before - limit)
+    spilled = load(state["session_id"], "graph", start, min(before, offset)) if start < offset else []
+    return spilled + window[max(start - offset, 0):max(before - offset, 0)], start
+
+
+# ── UI transcript ─────────────────────────────────────────────────────────────
+class HistoryWindow:
+    """Bounded, write-through list of the messages a UI session shows.
+
+    append() saves each message under "ui" and keeps at most
+    HISTORY_MAX_MESSAGES in memory, dropping back to HISTORY_KEEP_MESSAGES.
+    Older messages are paged back with earlier()."""
+
+    def __init__(self, session_id: str, seed: Optional[List[Dict[str, Any]]] = None):
+        self.session_id = session_id
+        self.total = count(session_id, "ui")
+        if not self.total and seed:
+            # Sessions from before the UI transcript was stored start from the graph's window
+            save(session_id, "ui", 0, seed)
+            self.total = len(seed)
+        self.messages: List[Dict[str, Any]] = (
+            load(session_id, "ui", max(0, self.total - HISTORY_KEEP_MESSAGES), self.total) if self.total else []
+        )
+
+    @property
+    def start(self) -> int:
+        """seq of the oldest message held in memory."""
+        return self.total - len(self.messages)
+
+    def append(self, message: Dict[str, Any]) -> None:
+        save(self.session_id, "ui", self.total, [message])
+        self.total += 1
+        self.messages.append(message)
+        if len(self.messages) > HISTORY_MAX_MESSAGES:
+            del self.messages[:len(self.messages) - HISTORY_KEEP_MESSAGES]
+
+    def earlier(self, before: int, limit: int = HISTORY_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """Up to `limit` stored messages before seq `before`."""
+        return load(self.session_id, "ui", max(0, before - limit), before)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
@@ -1,57 +1,192 @@
 """
 Long-term memory is persisted in the workflow_memory table via tools.
 This module provides query utilities for reading long-term memory.
+
+Reads are keyset-paginated on (created_at, id) and select only the summary
+columns; the potentially large final_state is loaded only when asked for.
+Compact snapshots (memory.snapshot_codec) are decoded transparently, so
+callers always get the plain final_state dict regardless of storage format.
+
+Rows moved out by database.retention live in monthly archive files; pass
+include_archived=True to continue a query into them, newest month first.
 """
 import logging
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 from database.session import get_session
 from database.models import WorkflowMemory
+from database.retention import get_archive_engine, list_archive_months
+from memory.snapshot_codec import decode_snapshot, expand_snapshot, referenced_product_id
+from tools.db_tools import get_products_by_ids
 
 logger = logging.getLogger(__name__)
 
+_SUMMARY_COLUMNS = (
+    WorkflowMemory.id,
+    WorkflowMemory.user_id,
+    WorkflowMemory.product_id,
+    WorkflowMemory.session_type,
+    WorkflowMemory.agent_summary,
+    WorkflowMemory.pricing,
+    WorkflowMemory.created_at,
+)
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    return f"{created_at.isoformat()}|{record_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    created_at, record_id = cursor.rsplit("|", 1)
+    return datetime.fromisoformat(created_at), int(record_id)
+
+
+def _query_rows(session: Session, user_id: Optional[int], limit: int, cursor: Optional[str], columns: list):
+    query = session.query(*columns)
+    if user_id is not None:
+        query = query.filter(WorkflowMemory.user_id == user_id)
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            WorkflowMemory.created_at < created_at,
+            and_(WorkflowMemory.created_at == created_at, WorkflowMemory.id < record_id),
+        ))
+    return (
+        query.order_by(WorkflowMemory.created_at.desc(), WorkflowMemory.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def _fetch_page(
+    user_id: Optional[int],
+    limit: int,
+    cursor: Optional[str],
+    include_final_state: bool,
+    include_archived: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    columns = list(_SUMMARY_COLUMNS)
+    if include_final_state:
+        columns += [WorkflowMemory.final_state, WorkflowMemory.final_state_blob]
+
+    with get_session() as session:
+        rows = _query_rows(session, user_id, limit, cursor, columns)
+
+    if include_archived and len(rows) < limit:
+        # Archived rows are all older than hot rows, and newer months hold newer
+        # rows, so the keyset cursor carries straight across the sources.
+        cursor_month = decode_cursor(cursor)[0].strftime("%Y_%m") if cursor else None
+        for month in list_archive_months():
+            if cursor_month and month > cursor_month:
+                continue
+            if rows and rows[-1].created_at is not None:
+                cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+            with Session(get_archive_engine(month)) as session:
+                rows += _query_rows(session, user_id, limit - len(rows), cursor, columns)
+            if len(rows) >= limit:
+                break
+
+    items = []
+    for r in rows:
+        item = {
+            "id": r.id,
+            "user_id": r.user_id,
+            "product_id": r.product_id,
+            "session_type": r.session_type,
+            "agent_summary": r.agent_summary,
+            "pricing": r.pricing,
+            "created_at": str(r.created_at),
+        }
+        if include_final_state:
+            item["final_state"] = _final_state(r)
+        items.append(item)
+    if include_final_state:
+        _expand_product_refs(items)
+
+    next_cursor = None
+    if len(rows) == limit and rows[-1].created_at is not None:
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return items, next_cursor
+
+
+def _final_state(row) -> Optional[Dict[str, Any]]:
+    if not row.final_state_blob:
+        return row.final_state
+    try:
+        return decode_snapshot(row.final_state_blob)
+    except Exception as e:
+        # One unreadable snapshot must not fail the whole page
+        logger.warning("LONG_TERM_MEMORY | snapshot of row %s not decodable: %s", row.id, e)
+        return None
+
+
+def _expand_product_refs(items: List[Dict[str, Any]]) -> None:
+    """Re-hydrate product references for a whole page with one catalog query."""
+    product_ids = [
+        pid for pid in (referenced_product_id(i["final_state"]) for i in items if i["final_state"])
+        if pid is not None
+    ]
+    if not product_ids:
+        return
+    products_by_id = get_products_by_ids(product_ids)
+    for item in items:
+        if item["final_state"]:
+            item["final_state"] = expand_snapshot(item["final_state"], products_by_id)
+
 
 def get_recent_sessions(limit: int = 10) -> List[Dict[str, Any]]:
     """Retrieve recent workflow and chat sessions from long-term memory."""
-    logger.info(f"LONG_TERM_MEMORY | Fetching last {limit} sessions")
-    with get_session() as session:
-        records = (
-            session.query(WorkflowMemory)
-            .order_by(WorkflowMemory.created_at.desc())
-            .limit(limit)
-            .all()
-        )
-        return [
-            {
-                "id": r.id,
-                "user_id": r.user_id,
-                "product_id": r.product_id,
-                "session_type": r.session_type,
-                "agent_summary": r.agent_summary,
-                "pricing": r.pricing,
-                "created_at": str(r.created_at),
-            }
-            for r in records
-        ]
-
-
-def get_user_history(user_id: int) -> List[Dict[str, Any]]:
-    """Retrieve all sessions for a specific user."""
-    logger.info(f"LONG_TERM_MEMORY | Fetching history for user_id={user_id}")
-    with get_session() as session:
-        records = (
-            session.query(WorkflowMemory)
-            .filter_by(user_id=user_id)
-            .order_by(WorkflowMemory.created_at.desc())
-            .all()
-        )
-        return [
-            {
-                "id": r.id,
-                "product_id": r.product_id,
-                "session_type": r.session_type,
-                "agent_summary": r.agent_summary,
-                "pricing": r.pricing,
-                "created_at": str(r.created_at),
-            }
-            for r in records
-        ]
+    logger.info("LONG_TERM_MEMORY | Fetching last %s sessions", limit)
+    items, _ = _fetch_page(None, limit, None, include_final_state=False)
+    return items
+
+
+def get_user_history_page(
+    user_id: int,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    include_final_state: bool = False,
+    include_archived: bool = False,
+) -> Dict[str, Any]:
+    """One page of a user's sessions, newest first.
+
+    Pass the returned next_cursor back in to fetch the following page;
+    it is None on the last page.
+    """
+    logger.info("LONG_TERM_MEMORY | Fetching history page for user_id=%s limit=%s", user_id, limit)
+    items, next_cursor = _fetch_page(user_id, limit, cursor, include_final_state, include_archived)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def get_user_history(
+    user_id: int,
+    limit: Optional[int] = None,
+    include_final_state: bool = False,
+    include_archived: bool = False,
+) -> List[Dict[str, Any]]:
+    """Retrieve all sessions for a specific user, newest first, or only the
+    newest `limit`. Prefer iter_user_history / get_user_history_page for users
+    with long histories."""
+    if limit is not None:
+        return get_user_history_page(user_id, limit, None, include_final_state, include_archived)["items"]
+    logger.info("LONG_TERM_MEMORY | Fetching history for user_id=%s", user_id)
+    return list(iter_user_history(user_id, include_final_state=include_final_state, include_archived=include_archived))
+
+
+def iter_user_history(
+    user_id: Optional[int],
+    page_size: int = 500,
+    include_final_state: bool = False,
+    include_archived: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Stream every session (for one user, or all users when user_id is None),
+    newest first, one page per short-lived DB session. Memory stays bounded
+    by page_size, so this is safe for exports over the whole table."""
+    cursor = None
+    while True:
+        items, cursor = _fetch_page(user_id, page_size, cursor, include_final_state, include_archived)
+        yield from items
+        if cursor is None:
+            return
@@ -5,14 +5,17 @@ This module provides helper utilities to read and update state cleanly.
 import logging
 from typing import Dict, Any
 from graph.state import WoodWorksState
+from memory.chat_summary import latest_summary
 
 logger = logging.getLogger(__name__)
 
 
 def get_conversation_context(state: WoodWorksState) -> str:
-    """Build a readable conversation context string from history."""
-    history = state.get("conversation_history", [])
-    lines = []
+    """Build a readable conversation context string: the rolling summary of
+    older turns (if any) followed by the recent history window."""
+    history = state.get("conversation_history") or []
+    summary = latest_summary(state.get("session_id"), state.get("conversation_summary"))
+    lines = [f"Summary of earlier conversation: {summary}"] if summary else []
     for msg in history:
         role = msg.get("role", "unknown").capitalize()
         content = msg.get("content", "")
@@ -20,12 +23,13 @@ def get_conversation_context(state: WoodWorksState) -> str:
     return "\n".join(lines)
 
 
-def clear_workflow_state(state: WoodWorksState) -> WoodWorksState:
-    """Reset workflow-specific fields while keeping user session alive."""
+def clear_workflow_state() -> WoodWorksState:
+    """State update that resets workflow-specific fields while keeping the
+    user session (and its history) alive."""
     logger.info("SHORT_TERM_MEMORY | Clearing workflow state")
     return {
-        **state,
         "selected_product": None,
+        "proposed_product": None,
         "human_spec": None,
         "technical_spec": None,
         "pricing_summary": None,
@@ -34,7 +38,10 @@ def clear_workflow_state(state: WoodWorksState) -> WoodWorksState:
         "confirmed_by_user": False,
         "order_id": None,
         "receipt_path": None,
+        "idempotency_key": None,
         "supervisor_issue": None,
+        "supervisor_issue_code": None,
+        "supervisor_issue_details": None,
         "supervisor_decision": None,
         "supervisor_steps": 0,
         "error": None,
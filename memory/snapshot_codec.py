@@ -0,0 +1,104 @@
+"""
+Compact storage format for workflow_memory.final_state snapshots.
+
+A snapshot is stored as:  b"WWS" | version (1 byte) | codec (1 byte) | payload
+
+The payload is the snapshot serialized with MessagePack and compressed with
+zlib. Before
+serializing, the copied catalog row in snapshot["product"] is replaced by a
+reference (product id plus the values that matter historically — name, price
+and SKU at order time); decoding re-hydrates the rest from product_catalog.
+"""
+import json
+import logging
+import zlib
+from typing import Any, Dict, Optional
+import ormsgpack
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WWS"
+VERSION = 1
+CODEC_ZLIB = 1
+
+_PRODUCT_REF = "$product_ref"
+_PRODUCT_KEPT_FIELDS = ("product_id", "name", "base_price", "sku")
+
+
+def compact_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the embedded catalog row with a reference to it."""
+    product = snapshot.get("product")
+    if not isinstance(product, dict) or product.get("product_id") is None:
+        return snapshot
+    ref = {key: product.get(key) for key in _PRODUCT_KEPT_FIELDS}
+    ref[_PRODUCT_REF] = True
+    return {**snapshot, "product": ref}
+
+
+def referenced_product_id(snapshot: Dict[str, Any]) -> Optional[int]:
+    product = snapshot.get("product")
+    if isinstance(product, dict) and product.get(_PRODUCT_REF):
+        return product.get("product_id")
+    return None
+
+
+def expand_snapshot(snapshot: Dict[str, Any], products_by_id: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Inverse of compact_snapshot. Fields kept in the reference win over the
+    current catalog row, so historical prices survive catalog edits. If the
+    product no longer exists, the reference fields alone are returned."""
+    product_id = referenced_product_id(snapshot)
+    if product_id is None:
+        return snapshot
+    kept = {k: v for k, v in snapshot["product"].items() if k != _PRODUCT_REF}
+    return {**snapshot, "product": {**products_by_id.get(product_id, {}), **kept}}
+
+
+def encode_snapshot(snapshot: Dict[str, Any]) -> bytes:
+    payload = ormsgpack.packb(compact_snapshot(snapshot))
+    return MAGIC + bytes((VERSION, CODEC_ZLIB)) + zlib.compress(payload, 9)
+
+
+def decode_snapshot(blob: bytes) -> Dict[str, Any]:
+    """Decode to the compact form; pass the result to expand_snapshot to
+    re-hydrate the product reference."""
+    if blob[:3] != MAGIC:
+        raise ValueError("Not a WoodWorks snapshot blob")
+    version, codec = blob[3], blob[4]
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if codec != CODEC_ZLIB:
+        raise ValueError(f"Unknown snapshot codec {codec}")
+    return ormsgpack.unpackb(zlib.decompress(blob[5:]))
+
+
+def size_report(limit: Optional[int] = None) -> Dict[str, Any]:
+    """Bytes per workflow_memory snapshot as plain JSON (the legacy column
+    format) versus the compact encoding."""
+    from memory.long_term import iter_user_history
+
+    count = json_bytes = compact_bytes = 0
+    for record in iter_user_history(None, include_final_state=True):
+        snapshot = record.get("final_state")
+        if not snapshot:
+            continue
+        json_bytes += len(json.dumps(snapshot).encode("utf-8"))
+        compact_bytes += len(encode_snapshot(snapshot))
+        count += 1
+        if limit and count >= limit:
+            break
+    return {
+        "records": count,
+        "json_bytes_per_record": round(json_bytes / count, 1) if count else 0,
+        "compact_bytes_per_record": round(compact_bytes / count, 1) if count else 0,
+        "ratio": round(json_bytes / compact_bytes, 2) if compact_bytes else 0,
+        "codec": "zlib",
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report workflow_memory snapshot sizes.")
+    parser.add_argument("--limit", type=int, default=None, help="only sample the newest N records")
+    args = parser.parse_args()
+    print(json.dumps(size_report(args.limit), indent=2))
@@ -0,0 +1,263 @@
+"""
+Bulk quoting for sales price lists and B2B fit-outs.
+
+Prices a table of configurations (product_id, dimensions, finish, species,
+quantity, and optionally joinery and hardware) with the same rule table as
+the chat workflow (tools/pricing_engine.py). Each rule declares the facts it
+reads, so its predicate runs once per distinct combination of those input
+columns; base prices, adjustments, quantity tiers and totals for every line
+are then NumPy passes in int64 cents. Input is read and results are written
+in chunks, as CSV or JSONL.
+
+    python -m tools.bulk_quote configs.csv -o quotes.csv
+    python -m tools.bulk_quote configs.jsonl --format jsonl > quotes.jsonl
+
+Lines with an unknown product or a bad quantity are kept, with an error and
+no prices. Stock is not checked; a quote is not a reservation.
+"""
+import csv
+import json
+import logging
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+import numpy as np
+from tools.db_tools import get_products_by_ids
+from tools.pricing_engine import (
+    PRICING_RULES,
+    PRICING_RULES_VERSION,
+    QUANTITY_TIERS,
+    PricingRule,
+    apply_bps,
+    order_facts,
+    to_cents,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIG_COLUMNS = ("product_id", "dimensions", "finish", "species", "quantity", "joinery", "hardware")
+RESULT_COLUMNS = (
+    "product_id", "product_name", "dimensions", "finish", "species", "quantity",
+    "unit_price", "customization_cost", "material_cost", "quantity_discount", "total_price",
+    "adjustments", "rules_version", "error",
+)
+CHUNK_SIZE = 50_000
+
+# Input column each OrderFacts field comes from; product facts come from the catalog row
+_FACT_COLUMNS = {
+    "base_material": "product_id", "finish_options": "product_id", "dimensions_guide": "product_id",
+    "species": "species", "finish": "finish", "dimensions": "dimensions", "dimensions_unit": "dimensions",
+    "joinery": "joinery", "hardware": "hardware",
+}
+_TEXT_COLUMNS = ("dimensions", "finish", "species", "joinery", "hardware")
+
+Columns = Dict[str, Tuple[np.ndarray, List[Any]]]
+
+
+def _text(row: Mapping[str, Any], column: str) -> str:
+    value = row.get(column)
+    return "" if value is None else str(value).strip()
+
+
+def _parse(row: Mapping[str, Any]) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """(product_id, quantity, error) for one input line."""
+    try:
+        product_id = int(row.get("product_id"))
+    except (TypeError, ValueError):
+        return None, None, f"invalid product_id {row.get('product_id')!r}"
+    quantity = row.get("quantity")
+    try:
+        quantity = int(quantity) if quantity not in (None, "") else 1
+    except (TypeError, ValueError):
+        return product_id, None, f"invalid quantity {quantity!r}"
+    if quantity < 1:
+        return product_id, None, f"invalid quantity {quantity!r}"
+    return product_id, quantity, None
+
+
+def _factorize(values: Iterable[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Integer code per value plus the distinct values, in first-seen order."""
+    index: Dict[Any, int] = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64)
+    return codes, list(index)
+
+
+def _evaluate_rule(
+    rule: PricingRule, columns: Columns, products: Dict[int, Dict[str, Any]], lines: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-line (applies, flat cents) for one rule, evaluating it once per
+    distinct combination of the input columns it reads."""
+    sources = sorted({_FACT_COLUMNS[field] for field in rule.reads})
+    combined = np.zeros(lines, dtype=np.int64)
+    for column in sources:
+        codes, uniques = columns[column]
+        combined = combined * len(uniques) + codes
+    distinct, inverse = np.unique(combined, return_inverse=True)
+
+    applies = np.zeros(len(distinct), dtype=bool)
+    flat = np.zeros(len(distinct), dtype=np.int64)
+    for i, code in enumerate(distinct.tolist()):
+        values = {}
+        for column in reversed(sources):
+            uniques = columns[column][1]
+            code, position = divmod(code, len(uniques))
+            values[column] = uniques[position]
+        facts = order_facts(
+            products[values["product_id"]] if "product_id" in values else {},
+            {"dimensions": values.get("dimensions"), "finish": values.get("finish")},
+            {"wood_species": values.get("species"), "joinery_method": values.get("joinery"),
+             "hardware": values.get("hardware")},
+        )
+        if rule.when(facts):
+            applies[i] = True
+            flat[i] = rule.flat_cents(facts)
+    return applies[inverse], flat[inverse]
+
+
+def _error_result(row: Mapping[str, Any], error: str) -> Tuple[Any, ...]:
+    return (
+        row.get("product_id"), None, _text(row, "dimensions"), _text(row, "finish"), _text(row, "species"),
+        row.get("quantity"), None, None, None, None, None, None, PRICING_RULES_VERSION, error,
+    )
+
+
+def _quote_chunk(
+    rows: List[Mapping[str, Any]],
+    products: Dict[int, Optional[Dict[str, Any]]],
+    rules: Tuple[PricingRule, ...],
+) -> List[Tuple[Any, ...]]:
+    parsed = [_parse(row) for row in rows]
+    missing = {pid for pid, _, error in parsed if error is None and pid not in products}
+    if missing:
+        found = get_products_by_ids(list(missing))
+        products.update({pid: found.get(pid) for pid in missing})
+
+    results: List[Optional[Tuple[Any, ...]]] = [None] * len(rows)
+    positions: List[int] = []
+    for position, (product_id, _, error) in enumerate(parsed):
+        if error is None and products.get(product_id) is None:
+            error = f"unknown product_id {product_id}"
+        if error is None:
+            positions.append(position)
+        else:
+            results[position] = _error_result(rows[position], error)
+    lines = len(positions)
+    text = {column: [_text(rows[p], column) for p in positions] for column in _TEXT_COLUMNS}
+
+    # Everything below is per column or per rule, not per line
+    columns: Columns = {column: _factorize(values) for column, values in text.items()}
+    columns["product_id"] = _factorize(parsed[p][0] for p in positions)
+    product_codes, product_ids = columns["product_id"]
+    base_cents = [to_cents(products[pid].get("base_price") or 0) for pid in product_ids]
+    unit_base = np.array(base_cents, dtype=np.int64)[product_codes] if lines else np.zeros(0, dtype=np.int64)
+    qty = np.fromiter((parsed[p][1] for p in positions), dtype=np.int64, count=lines)
+
+    material = np.zeros(lines, dtype=np.int64)
+    customization = np.zeros(lines, dtype=np.int64)
+    applied = np.zeros(lines, dtype=np.int64)           # bit i set when rule i applies
+    for i, rule in enumerate(rules):
+        applies, flat = _evaluate_rule(rule, columns, products, lines)
+        cents = np.where(applies, apply_bps(unit_base, rule.bps) + flat, 0) * qty
+        if rule.component == "material":
+            material += cents
+        else:
+            customization += cents
+        applied |= applies.astype(np.int64) << i
+    subtotal = unit_base * qty + material + customization
+    discount_bps = np.select([qty >= minimum for minimum, _ in QUANTITY_TIERS], [bps for _, bps in QUANTITY_TIERS], 0)
+    discount = -apply_bps(subtotal, discount_bps)
+    total = subtotal + discount
+
+    applied_codes, applied_sets = _factorize(applied.tolist())
+    labels = ["; ".join(rule.label for i, rule in enumerate(rules) if bits >> i & 1) for bits in applied_sets]
+    names = [products[pid]["name"] for pid in product_ids]
+    priced = zip(
+        positions, product_codes.tolist(), qty.tolist(), applied_codes.tolist(),
+        text["dimensions"], text["finish"], text["species"],
+        *((cents / 100).tolist() for cents in (unit_base, customization, material, discount, total)),
+    )
+    for position, product, quantity, applied_code, dims, finish, species, unit, custom, mat, disc, tot in priced:
+        results[position] = (
+            product_ids[product], names[product], dims, finish, species, quantity,
+            unit, custom, mat, disc, tot, labels[applied_code], PRICING_RULES_VERSION, None,
+        )
+    return results
+
+
+def quote_chunks(
+    rows: Iterable[Mapping[str, Any]],
+    chunk_size: int = CHUNK_SIZE,
+    rules: Tuple[PricingRule, ...] = PRICING_RULES,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """Quote configurations chunk by chunk; each result row is a tuple in RESULT_COLUMNS order."""
+    products: Dict[int, Optional[Dict[str, Any]]] = {}
+    rows = iter(rows)
+    quoted = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield _quote_chunk(chunk, products, rules)
+        quoted += len(chunk)
+    logger.info("TOOL | bulk_quote | quoted %s lines across %s products", quoted, len(products))
+
+
+def quote_configs(rows: Iterable[Mapping[str, Any]], chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Quote configurations, one result dict per input line, in input order."""
+    for chunk in quote_chunks(rows, chunk_size):
+        for result in chunk:
+            yield dict(zip(RESULT_COLUMNS, result))
+
+
+def read_configs(f: IO[str], fmt: str) -> Iterator[Mapping[str, Any]]:
+    if fmt == "jsonl":
+        return (json.loads(line) for line in f if line.strip())
+    return csv.DictReader(f)
+
+
+def write_quotes(chunks: Iterable[List[Tuple[Any, ...]]], out: IO[str], fmt: str) -> int:
+    """Stream quoted chunks to out as CSV (with a header) or JSONL; returns lines written."""
+    written = 0
+    if fmt == "jsonl":
+        for chunk in chunks:
+            out.writelines(json.dumps(dict(zip(RESULT_COLUMNS, result))) + "\n" for result in chunk)
+            written += len(chunk)
+        return written
+    writer = csv.writer(out)
+    writer.writerow(RESULT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        written += len(chunk)
+    return written
+
+
+def _format(path: Optional[str], default: str) -> str:
+    return "jsonl" if path and path.endswith((".jsonl", ".ndjson")) else default
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Quote a table of product configurations.")
+    parser.add_argument("input", help=f"CSV or JSONL with columns {', '.join(CONFIG_COLUMNS)} ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="CSV or JSONL file to write (default: stdout)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="output format (default: from --output, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    in_fmt = args.input_format or _format(args.input, "csv")
+    out_fmt = args.format or _format(args.output, "csv")
+    started = time.perf_counter()
+    f_in = sys.stdin if args.input == "-" else open(args.input, newline="")
+    f_out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        count = write_quotes(quote_chunks(read_configs(f_in, in_fmt), args.chunk_size), f_out, out_fmt)
+    finally:
+        if f_in is not sys.stdin:
+            f_in.close()
+        if f_out is not sys.stdout:
+            f_out.close()
+    print(f"Quoted {count} lines in {time.perf_counter() - started:.2f}s", file=sys.stderr)
@@ -0,0 +1,197 @@
+"""
+Catalog rendering service: the prompt text every catalog-aware agent embeds.
+
+Fragments are rendered once per catalog version and cached by name. The
+version is (product count, max product id, latest product_catalog.updated_at),
+so adding, removing or editing a product reloads the catalog. Stock is
+tracked separately by the latest product_items.updated_at: a stock change
+only re-reads stock levels and re-renders the fragments that show stock.
+Both are checked at most every CATALOG_CACHE_TTL seconds; writers that
+change stock call mark_stock_changed() so the next prompt sees it at once.
+
+With CATALOG_PROMPT_STYLE="compact" (the default) fragments are a header row
+plus pipe-separated values, which costs far fewer tokens than repeating
+"Material:" / "Stock:" labels on every line.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import func, select
+from database.models import ProductCatalog, ProductItem
+from database.session import connect
+from tools.db_tools import get_available_products
+from config.settings import CATALOG_CACHE_TTL, CATALOG_PROMPT_STYLE
+
+logger = logging.getLogger(__name__)
+
+# (column header, value getter) per fragment, in display order
+_Column = Tuple[str, Callable[[Dict[str, Any]], Any]]
+
+
+def _price(p: Dict[str, Any]) -> str:
+    price = p["base_price"]
+    return f"{price:.0f}" if price == int(price) else f"{price:.2f}"
+
+
+_ID: _Column = ("id", lambda p: p["product_id"])
+_NAME: _Column = ("name", lambda p: p["name"])
+_CATEGORY: _Column = ("category", lambda p: p["category"])
+_PRICE: _Column = ("price", _price)
+_MATERIAL: _Column = ("material", lambda p: p["material"] or "")
+_STOCK: _Column = ("stock", lambda p: p["stock_quantity"])
+
+FRAGMENT_COLUMNS: Dict[str, Sequence[_Column]] = {
+    "selector": (_ID, _NAME, _CATEGORY, _PRICE, _MATERIAL, _STOCK),
+    "supervisor": (_ID, _NAME, _PRICE, _STOCK),
+    "chat": (_NAME, _CATEGORY, _PRICE),
+}
+
+# The original one-product-per-line formats, kept for CATALOG_PROMPT_STYLE="lines"
+_LINE_FORMATS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "selector": lambda p: (
+        f"ID:{p['product_id']} | {p['name']} | {p['category']} | "
+        f"${p['base_price']:,.2f} | Material: {p['material']} | Stock: {p['stock_quantity']}"
+    ),
+    "supervisor": lambda p: f"ID:{p['product_id']} | {p['name']} | ${p['base_price']:,.2f} | Stock:{p['stock_quantity']}",
+    "chat": lambda p: f"- {p['name']} ({p['category']}) — ${p['base_price']:,.2f}",
+}
+
+_VERSION_QUERY = select(
+    select(func.count(ProductCatalog.id)).scalar_subquery(),
+    select(func.max(ProductCatalog.id)).scalar_subquery(),
+    select(func.max(ProductCatalog.updated_at)).scalar_subquery(),
+    select(func.max(ProductItem.updated_at)).scalar_subquery(),
+)
+_STOCK_QUERY = select(ProductItem.product_id, ProductItem.stock_quantity)
+
+# Fragments that show stock and must be re-rendered when it moves
+_STOCK_FRAGMENTS = {name for name, columns in FRAGMENT_COLUMNS.items() if _STOCK in columns}
+
+_lock = threading.Lock()
+_version: Optional[tuple] = None
+_stock_version: Any = None
+_checked_at = 0.0
+_products: Optional[List[Dict[str, Any]]] = None
+_products_by_id: Dict[int, Dict[str, Any]] = {}
+_fragments: Dict[str, str] = {}
+_listeners: List[Callable[[], None]] = []
+
+
+def render_products(products: List[Dict[str, Any]], name: str, style: str = CATALOG_PROMPT_STYLE) -> str:
+    """Render any product list (e.g. search results) in a named fragment layout."""
+    if not products:
+        return ""
+    if style == "lines":
+        return "\n".join(_LINE_FORMATS[name](p) for p in products)
+    columns = FRAGMENT_COLUMNS[name]
+    rows = ["|".join(header for header, _ in columns)]
+    rows.extend("|".join(str(get(p)) for _, get in columns) for p in products)
+    return "\n".join(rows)
+
+
+def catalog_version() -> tuple:
+    return _versions()[0]
+
+
+def _versions() -> Tuple[tuple, Any]:
+    """(catalog version, stock version) in one round trip."""
+    with connect() as conn:
+        *version, stock_version = conn.execute(_VERSION_QUERY).one()
+    return tuple(version), stock_version
+
+
+def on_catalog_change(callback: Callable[[], None]) -> None:
+    """Register a callback run whenever the catalog version changes (a product
+    is added, removed or edited) or the cache is invalidated; stock movements
+    do not count."""
+    _listeners.append(callback)
+
+
+def _notify_listeners() -> None:
+    for callback in list(_listeners):
+        try:
+            callback()
+        except Exception as e:
+            logger.error("TOOL | catalog_render | change listener failed: %s", e)
+
+
+def invalidate_catalog_cache() -> None:
+    global _version, _products
+    with _lock:
+        _version, _products = None, None
+        _products_by_id.clear()
+        _fragments.clear()
+    logger.info("TOOL | catalog_render | cache invalidated")
+    _notify_listeners()
+
+
+def mark_stock_changed() -> None:
+    """Make the next catalog read re-check stock instead of waiting for the TTL."""
+    global _checked_at
+    with _lock:
+        _checked_at = 0.0
+
+
+def _refresh_stock() -> None:
+    global _products, _products_by_id
+    with connect() as conn:
+        stock = dict(conn.execute(_STOCK_QUERY).all())
+    # Entries are shared read-only, so build new ones rather than mutate
+    _products = [{**p, "stock_quantity": stock.get(p["product_id"], 0)} for p in _products]
+    _products_by_id = {p["product_id"]: p for p in _products}
+    for name in _STOCK_FRAGMENTS:
+        _fragments.pop(name, None)
+
+
+def _refresh_if_stale() -> None:
+    global _version, _stock_version, _checked_at, _products, _products_by_id
+    now = time.monotonic()
+    if _products is not None and now - _checked_at < CATALOG_CACHE_TTL:
+        return
+    version, stock_version = _versions()
+    _checked_at = now
+    if _products is not None and version == _version:
+        if stock_version != _stock_version:
+            _refresh_stock()
+            _stock_version = stock_version
+            logger.debug("TOOL | catalog_render | stock version %s loaded", stock_version)
+        return
+    changed = _version is not None
+    _products = get_available_products()
+    _products_by_id = {p["product_id"]: p for p in _products}
+    _fragments.clear()
+    _version, _stock_version = version, stock_version
+    logger.info("TOOL | catalog_render | catalog version %s loaded (%s products)", version, len(_products))
+    if changed:
+        _notify_listeners()
+
+
+def current_catalog_version() -> tuple:
+    with _lock:
+        _refresh_if_stale()
+        return _version
+
+
+def get_catalog_products() -> List[Dict[str, Any]]:
+    """The full catalog, shared across agents; treat entries as read-only."""
+    with _lock:
+        _refresh_if_stale()
+        return _products
+
+
+def get_catalog_product(product_id: int) -> Optional[Dict[str, Any]]:
+    """A private copy of one cached product, safe to store in graph state."""
+    with _lock:
+        _refresh_if_stale()
+        product = _products_by_id.get(product_id)
+        return dict(product) if product else None
+
+
+def get_catalog_fragment(name: str) -> str:
+    """The whole catalog rendered as fragment `name` ("selector", "supervisor", "chat")."""
+    with _lock:
+        _refresh_if_stale()
+        if name not in _fragments:
+            _fragments[name] = render_products(_products, name)
+        return _fragments[name]
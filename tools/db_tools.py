@@ -1,93 +1,146 @@
 import logging
 from typing import Optional, List, Dict, Any
-from database.session import get_session
-from database.models import ProductCatalog, ProductItem, User, WorkflowMemory
+from database.session import engine, get_session
+from database.models import ProductCatalog, ProductItem, WorkflowMemory
+from database.catalog_search import fts_available, search_product_ids
+from database.queries import count_confirmed_orders, fetch_inventory, fetch_product, insert_user
+from database.write_behind import enqueue_insert
+from memory.snapshot_codec import encode_snapshot
+from config.settings import WRITE_BEHIND_ENABLED
 
 logger = logging.getLogger(__name__)
 
 
+def _to_product_dict(p: ProductCatalog, item: Optional[ProductItem]) -> Dict[str, Any]:
+    return {
+        "product_id": p.id,
+        "name": p.name,
+        "category": p.category,
+        "description": p.description,
+        "base_price": p.base_price,
+        "material": p.material,
+        "finish_options": p.finish_options,
+        "dimensions_guide": p.dimensions_guide,
+        "customizable": bool(p.customizable),
+        "stock_quantity": item.stock_quantity if item else 0,
+        "sku": item.sku if item else "N/A",
+    }
+
+
+def _product_rows(session, *criteria, limit: Optional[int] = None):
+    query = (
+        session.query(ProductCatalog, ProductItem)
+        .outerjoin(ProductItem, ProductItem.product_id == ProductCatalog.id)
+        .filter(*criteria)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
 def get_available_products() -> List[Dict[str, Any]]:
     """Fetch all products from the catalog."""
     logger.info("TOOL | get_available_products | called")
     with get_session() as session:
-        products = session.query(ProductCatalog).all()
-        result = []
-        for p in products:
-            item = session.query(ProductItem).filter_by(product_id=p.id).first()
-            result.append({
-                "product_id": p.id,
-                "name": p.name,
-                "category": p.category,
-                "description": p.description,
-                "base_price": p.base_price,
-                "material": p.material,
-                "finish_options": p.finish_options,
-                "dimensions_guide": p.dimensions_guide,
-                "customizable": bool(p.customizable),
-                "stock_quantity": item.stock_quantity if item else 0,
-                "sku": item.sku if item else "N/A",
-            })
-        logger.info(f"TOOL | get_available_products | returned {len(result)} products")
+        result = [_to_product_dict(p, item) for p, item in _product_rows(session)]
+        logger.info("TOOL | get_available_products | returned %s products", len(result))
         return result
 
 
 def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
     """Fetch a single product by ID."""
-    logger.info(f"TOOL | get_product_by_id | product_id={product_id}")
+    logger.info("TOOL | get_product_by_id | product_id=%s", product_id)
+    p = fetch_product(product_id)
+    if not p:
+        logger.warning("TOOL | get_product_by_id | product_id=%s not found", product_id)
+        return None
+    return {
+        **p._asdict(),
+        "customizable": bool(p.customizable),
+        "stock_quantity": p.stock_quantity or 0,
+        "sku": p.sku or "N/A",
+    }
+
+
+def get_products_by_ids(product_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Fetch several products in one query, keyed by product_id."""
+    ids = list(set(product_ids))
+    if not ids:
+        return {}
     with get_session() as session:
-        p = session.query(ProductCatalog).filter_by(id=product_id).first()
-        if not p:
-            logger.warning(f"TOOL | get_product_by_id | product_id={product_id} not found")
-            return None
-        item = session.query(ProductItem).filter_by(product_id=p.id).first()
         return {
-            "product_id": p.id,
-            "name": p.name,
-            "category": p.category,
-            "description": p.description,
-            "base_price": p.base_price,
-            "material": p.material,
-            "finish_options": p.finish_options,
-            "dimensions_guide": p.dimensions_guide,
-            "customizable": bool(p.customizable),
-            "stock_quantity": item.stock_quantity if item else 0,
-            "sku": item.sku if item else "N/A",
+            p.id: _to_product_dict(p, item)
+            for p, item in _product_rows(session, ProductCatalog.id.in_(ids))
         }
 
 
+def search_products(query: str, limit: int = 8) -> List[Dict[str, Any]]:
+    """Full-text search over the catalog, best BM25 match first.
+    Returns [] when nothing matches or full-text search is unavailable."""
+    logger.info("TOOL | search_products | query='%s' limit=%s", query[:60], limit)
+    if not query or not fts_available(engine):
+        return []
+    with get_session() as session:
+        ids = search_product_ids(session.connection(), query, limit)
+    by_id = get_products_by_ids(ids)
+    result = [by_id[i] for i in ids if i in by_id]
+    logger.info("TOOL | search_products | returned %s products", len(result))
+    return result
+
+
+def browse_products_by_category(query: str = "", per_category: int = 2) -> List[Dict[str, Any]]:
+    """Fallback retrieval: a few products from each category named in the query,
+    or from every category when none is named. Size is bounded by category count."""
+    logger.info("TOOL | browse_products_by_category | per_category=%s", per_category)
+    with get_session() as session:
+        categories = [c for (c,) in session.query(ProductCatalog.category).distinct()]
+        lowered = (query or "").lower()
+        mentioned = [c for c in categories if c.lower() in lowered]
+        result = []
+        for category in sorted(mentioned or categories):
+            rows = _product_rows(
+                session,
+                ProductCatalog.category == category,
+                ProductItem.stock_quantity > 0,
+                limit=per_category,
+            )
+            result.extend(_to_product_dict(p, item) for p, item in rows)
+        logger.info("TOOL | browse_products_by_category | returned %s products", len(result))
+        return result
+
+
 def check_inventory(product_id: int, quantity: int = 1) -> Dict[str, Any]:
     """Check if enough stock is available for a product."""
-    logger.info(f"TOOL | check_inventory | product_id={product_id} qty={quantity}")
-    with get_session() as session:
-        item = session.query(ProductItem).filter_by(product_id=product_id).first()
-        if not item:
-            logger.warning(f"TOOL | check_inventory | no inventory record for product_id={product_id}")
-            return {
-                "available": False,
-                "quantity_in_stock": 0,
-                "requested_quantity": quantity,
-                "sku": None,
-            }
-        available = item.stock_quantity >= quantity
-        logger.info(f"TOOL | check_inventory | available={available} stock={item.stock_quantity}")
+    logger.info("TOOL | check_inventory | product_id=%s qty=%s", product_id, quantity)
+    item = fetch_inventory(product_id)
+    if not item:
+        logger.warning("TOOL | check_inventory | no inventory record for product_id=%s", product_id)
         return {
-            "available": available,
-            "quantity_in_stock": item.stock_quantity,
+            "available": False,
+            "quantity_in_stock": 0,
             "requested_quantity": quantity,
-            "sku": item.sku,
+            "sku": None,
         }
+    available = item.stock_quantity >= quantity
+    logger.info("TOOL | check_inventory | available=%s stock=%s", available, item.stock_quantity)
+    return {
+        "available": available,
+        "quantity_in_stock": item.stock_quantity,
+        "requested_quantity": quantity,
+        "sku": item.sku,
+    }
 
 
 def update_inventory_stock(product_id: int, quantity_to_deduct: int) -> bool:
     """Deduct stock after order creation."""
-    logger.info(f"TOOL | update_inventory_stock | product_id={product_id} deduct={quantity_to_deduct}")
+    logger.info("TOOL | update_inventory_stock | product_id=%s deduct=%s", product_id, quantity_to_deduct)
     with get_session() as session:
         item = session.query(ProductItem).filter_by(product_id=product_id).first()
         if not item or item.stock_quantity < quantity_to_deduct:
-            logger.error(f"TOOL | update_inventory_stock | insufficient stock")
+            logger.error("TOOL | update_inventory_stock | insufficient stock")
             return False
         item.stock_quantity -= quantity_to_deduct
-        logger.info(f"TOOL | update_inventory_stock | new stock={item.stock_quantity}")
+        logger.info("TOOL | update_inventory_stock | new stock=%s", item.stock_quantity)
         return True
 
 
@@ -100,30 +153,57 @@ def store_workflow_memory(
     pricing: Optional[float],
 ) -> int:
     """Store long-term memory of the workflow session."""
-    logger.info(f"TOOL | store_workflow_memory | user_id={user_id} product_id={product_id} type={session_type}")
+    logger.info("TOOL | store_workflow_memory | user_id=%s product_id=%s type=%s", user_id, product_id, session_type)
     with get_session() as session:
         memory = WorkflowMemory(
             user_id=user_id,
             product_id=product_id,
             session_type=session_type,
             agent_summary=agent_summary,
-            final_state=final_state,
+            final_state_blob=encode_snapshot(final_state),
             pricing=pricing,
         )
         session.add(memory)
         session.flush()
         memory_id = memory.id
-        logger.info(f"TOOL | store_workflow_memory | stored with id={memory_id}")
+        logger.info("TOOL | store_workflow_memory | stored with id=%s", memory_id)
         return memory_id
 
 
+def queue_workflow_memory(
+    user_id: Optional[int],
+    product_id: Optional[int],
+    session_type: str,
+    agent_summary: str,
+    final_state: Dict[str, Any],
+    pricing: Optional[float],
+) -> None:
+    """Queue long-term memory for the background writer (off the response path).
+    Falls back to a synchronous insert when write-behind is disabled."""
+    if not WRITE_BEHIND_ENABLED:
+        store_workflow_memory(user_id, product_id, session_type, agent_summary, final_state, pricing)
+        return
+    logger.info("TOOL | queue_workflow_memory | user_id=%s product_id=%s type=%s", user_id, product_id, session_type)
+    enqueue_insert(WorkflowMemory.__tablename__, {
+        "user_id": user_id,
+        "product_id": product_id,
+        "session_type": session_type,
+        "agent_summary": agent_summary,
+        "final_state_blob": encode_snapshot(final_state),
+        "pricing": pricing,
+    })
+
+
 def create_user(name: str, email: Optional[str], phone: Optional[str]) -> int:
     """Create a new user record and return user_id."""
-    logger.info(f"TOOL | create_user | name={name}")
-    with get_session() as session:
-        user = User(name=name, email=email, phone=phone)
-        session.add(user)
-        session.flush()
-        user_id = user.id
-        logger.info(f"TOOL | create_user | created user_id={user_id}")
-        return user_id
+    logger.info("TOOL | create_user | name=%s", name)
+    user_id = insert_user(name, email, phone)
+    logger.info("TOOL | create_user | created user_id=%s", user_id)
+    return user_id
+
+
+def count_user_orders(user_id: int) -> int:
+    """Number of confirmed orders the user has placed, archived ones included."""
+    count = count_confirmed_orders(user_id)
+    logger.info("TOOL | count_user_orders | user_id=%s count=%s", user_id, count)
+    return count
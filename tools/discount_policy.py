@@ -0,0 +1,155 @@
+"""
+Discount policy for price negotiation.
+
+is_discount_request() recognises an explicit request for a lower price;
+words like "offer", "deal" or "lower" on their own ("do you offer
+delivery?", "the lower shelf") are not one. When a customer asks, the policy
+decides locally whether they get a discount and how much: a goodwill base
+(only for an explicit request) plus tiers on the quoted total, the quantity
+and the customer's completed orders. Discounts are basis points
+of the quoted (list) total in integer cents, the same arithmetic as
+tools/pricing_engine.py, and everything granted in a session adds up to at
+most DISCOUNT_MAX_PERCENT, so asking again can't stack discounts.
+"""
+import re
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from config.settings import DISCOUNT_MAX_PERCENT
+from tools.pricing_engine import apply_bps, to_cents
+
+DISCOUNT_POLICY_VERSION = 1
+
+GOODWILL_BPS = 200
+# (minimum, discount in basis points), highest first; the first matching tier counts
+ORDER_VALUE_TIERS: Tuple[Tuple[int, int], ...] = ((500_000, 300), (200_000, 200), (100_000, 100))  # list cents
+VOLUME_TIERS: Tuple[Tuple[int, int], ...] = ((10, 300), (3, 100))                                     # units
+LOYALTY_TIERS: Tuple[Tuple[int, int], ...] = ((3, 300), (1, 200))                                     # past orders
+
+
+_PRICE = r"(?:price|cost|total|quote|bill)"
+_DISCOUNT_REQUEST = re.compile(
+    r"\b(?:discount\w*|cheaper|negotiat\w*|coupon|promo(?:tion)? code|price match"
+    r"|too (?:high|expensive|pricey|much)"
+    rf"|(?:lower|reduce|drop|cut|knock down|bring down) (?:the |your |that |this )?{_PRICE}"
+    rf"|{_PRICE} (?:cut|drop|reduction|down)"
+    r"|bring (?:it |that |the price |the cost )?down|come down"
+    r"|(?:better|best|lower) (?:price|deal|offer|rate)"
+    r"|knock (?:\w+ )?off|\d+ ?% off|money off)\b",
+    re.IGNORECASE,
+)
+
+
+def is_discount_request(message: str) -> bool:
+    """True when the message explicitly asks for a lower price."""
+    return bool(_DISCOUNT_REQUEST.search(message or ""))
+
+
+class DiscountDecision(NamedTuple):
+    list_cents: int                     # quoted total before any negotiated discount
+    eligible_bps: int                   # what the policy allows for this order, capped
+    previous_bps: int                   # already granted earlier in the session
+    granted_bps: int                    # in effect after this request
+    reasons: Tuple[str, ...]
+    discount_cents: int
+    total_cents: int
+
+    @property
+    def added_bps(self) -> int:
+        return self.granted_bps - self.previous_bps
+
+
+def _tier(value: int, tiers: Tuple[Tuple[int, int], ...]) -> int:
+    return next((bps for minimum, bps in tiers if value >= minimum), 0)
+
+
+def eligible_discount(
+    list_cents: int, quantity: int, past_orders: int, requested: bool = True
+) -> Tuple[int, Tuple[str, ...]]:
+    """Uncapped discount (basis points) the order qualifies for, with the reasons.
+    Goodwill is only given when the customer explicitly asked (`requested`)."""
+    parts = (
+        ("goodwill", GOODWILL_BPS if requested else 0),
+        ("order size", _tier(list_cents, ORDER_VALUE_TIERS)),
+        ("volume", _tier(quantity, VOLUME_TIERS)),
+        ("returning customer", _tier(past_orders, LOYALTY_TIERS)),
+    )
+    return sum(bps for _, bps in parts), tuple(reason for reason, bps in parts if bps)
+
+
+def decide_discount(
+    pricing: Dict[str, Any],
+    quantity: int,
+    past_orders: int,
+    max_percent: float = DISCOUNT_MAX_PERCENT,
+    requested: bool = True,
+) -> DiscountDecision:
+    """Discount in effect after one more request for a better price on pricing (a pricing_summary)."""
+    list_cents = to_cents(pricing.get("list_price") or pricing.get("total_price") or 0)
+    previous_bps = int(pricing.get("discount_bps") or 0)
+    eligible_bps, reasons = eligible_discount(list_cents, quantity, past_orders, requested)
+    eligible_bps = min(eligible_bps, int(round(max_percent * 100)))
+    granted_bps = max(previous_bps, eligible_bps)
+    discount_cents = apply_bps(list_cents, granted_bps)
+    return DiscountDecision(
+        list_cents, eligible_bps, previous_bps, granted_bps, reasons, discount_cents, list_cents - discount_cents,
+    )
+
+
+def _money(cents: int) -> str:
+    return f"${cents / 100:,.2f}"
+
+
+def apply_discount(pricing: Dict[str, Any], decision: DiscountDecision) -> Dict[str, Any]:
+    """pricing_summary with the decision's discount applied to the list total.
+    list_price / list_breakdown keep the undiscounted quote, so re-applying replaces, never stacks."""
+    list_breakdown = pricing.get("list_breakdown") or pricing.get("breakdown", "")
+    discounted = {
+        **pricing,
+        "list_price": decision.list_cents / 100,
+        "list_breakdown": list_breakdown,
+        "discount_bps": decision.granted_bps,
+        "discount_percent": decision.granted_bps / 100,
+        "discount_amount": decision.discount_cents / 100,
+        "total_price": decision.total_cents / 100,
+        "breakdown": list_breakdown,
+    }
+    if decision.granted_bps:
+        discounted["breakdown"] = (
+            f"{list_breakdown}\n"
+            f"- Negotiated discount ({decision.granted_bps / 100:g}%): -{_money(decision.discount_cents)}\n"
+            f"- New total: {_money(decision.total_cents)}"
+        )
+    return discounted
+
+
+def discount_message(decision: DiscountDecision) -> str:
+    total = _money(decision.total_cents)
+    if decision.added_bps:
+        reasons = ", ".join(decision.reasons)
+        return (
+            f"I can take **{decision.granted_bps / 100:g}%** off this order ({reasons}). "
+            f"Your new total is **{total}** (was {_money(decision.list_cents)}).\n\n"
+            f"Click **Confirm Order** below when you're ready to proceed."
+        )
+    if decision.granted_bps:
+        return (
+            f"You already have our best discount for this order, {decision.granted_bps / 100:g}% off, "
+            f"so your total stays at **{total}**.\n\n"
+            f"Click **Confirm Order** below when you're ready to proceed."
+        )
+    return (
+        f"I'm sorry, I can't lower the price on this one — your total stays at **{total}**.\n\n"
+        f"Click **Confirm Order** below when you're ready to proceed."
+    )
+
+
+def discount_record(decision: DiscountDecision, message: Optional[str] = None) -> Dict[str, Any]:
+    """discount_applied state entry for a decision."""
+    return {
+        "discount_granted": decision.added_bps > 0,
+        "discount_percent": decision.granted_bps / 100,
+        "discount_amount": decision.discount_cents / 100,
+        "new_total": decision.total_cents / 100,
+        "reasons": list(decision.reasons) if decision.added_bps else [],
+        "message_to_user": message,
+        "policy_version": DISCOUNT_POLICY_VERSION,
+    }
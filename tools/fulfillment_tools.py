@@ -3,7 +3,7 @@ from typing import Optional, Dict, Any, List
 from langchain_core.tools import tool
 from tools.order_tools import create_order_entry, update_order_receipt_path
 from tools.db_tools import update_inventory_stock
-from tools.pdf_generator import generate_pdf_receipt
+from tools.catalog_render import mark_stock_changed
 from database.session import get_session
 from database.models import Order
 
@@ -17,12 +17,14 @@ def create_order_tool(
     human_spec: str,
     technical_spec: str,
     final_price: float,
+    idempotency_key: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Creates a new order in the database and updates inventory stock.
+    Replaying an idempotency_key returns the existing order without touching stock.
     Returns a dictionary with order details including 'order_id'.
     """
-    logger.info(f"TOOL | CreateOrderTool | processing for user_id={user_id} product_id={product_id}")
+    logger.info("TOOL | CreateOrderTool | processing for user_id=%s product_id=%s", user_id, product_id)
     
     try:
         # 1. Create Order
@@ -32,13 +34,23 @@ def create_order_tool(
             human_spec=human_spec,
             technical_spec=technical_spec,
             final_price=final_price,
+            idempotency_key=idempotency_key,
         )
         order_id = result["order_id"]
+        if not result["created"]:
+            return {
+                "order_id": order_id,
+                "status": result["status"],
+                "inventory_updated": False,
+            }
         
         # 2. Update Inventory
         stock_updated = update_inventory_stock(product_id, 1)
         if not stock_updated:
-            logger.warning(f"TOOL | CreateOrderTool | Inventory update failed for product_id={product_id}")
+            logger.warning("TOOL | CreateOrderTool | Inventory update failed for product_id=%s", product_id)
+        else:
+            # Catalog prompts show stock, so re-read it on next use
+            mark_stock_changed()
             
         return {
             "order_id": order_id,
@@ -46,7 +58,7 @@ def create_order_tool(
             "inventory_updated": stock_updated
         }
     except Exception as e:
-        logger.error(f"TOOL | CreateOrderTool | Error: {e}")
+        logger.error("TOOL | CreateOrderTool | Error: %s", e)
         raise e
 
 
@@ -63,9 +75,12 @@ def generate_receipt_tool(
     Generates a PDF receipt for the order and updates the order record with the file path.
     Returns the absolute file path of the generated PDF.
     """
-    logger.info(f"TOOL | GenerateReceiptTool | processing for order_id={order_id}")
+    logger.info("TOOL | GenerateReceiptTool | processing for order_id=%s", order_id)
     
     try:
+        # reportlab is only needed once an order reaches its receipt
+        from tools.pdf_generator import generate_pdf_receipt
+
         receipt_path = generate_pdf_receipt(
             order_id=order_id,
             user_name=user_name,
@@ -77,12 +92,12 @@ def generate_receipt_tool(
         
         update_result = update_order_receipt_path(order_id, receipt_path)
         if not update_result:
-             logger.warning(f"TOOL | GenerateReceiptTool | Failed to update order record with path")
+             logger.warning("TOOL | GenerateReceiptTool | Failed to update order record with path")
 
         return receipt_path
     
     except Exception as e:
-        logger.error(f"TOOL | GenerateReceiptTool | Error: {e}")
+        logger.error("TOOL | GenerateReceiptTool | Error: %s", e)
         raise e
 
 
@@ -92,6 +107,6 @@ def store_workflow_memory_tool(order_id: int, summary: str) -> bool:
     Stores the final workflow memory/summary into the long-term database.
     Returns True if successful.
     """
-    logger.info(f"TOOL | StoreWorkflowMemoryTool | processing for order_id={order_id}")
+    logger.info("TOOL | StoreWorkflowMemoryTool | processing for order_id=%s", order_id)
     # Conceptual implementation - in real system would write to a specialized memory table/vector DB
     return True
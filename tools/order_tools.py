@@ -1,7 +1,9 @@
 import logging
 from typing import Optional, Dict, Any
+from sqlalchemy.exc import IntegrityError
 from database.session import get_session
 from database.models import Order
+from database.queries import set_order_receipt_path
 from tools.db_tools import update_inventory_stock
 
 logger = logging.getLogger(__name__)
@@ -14,24 +16,38 @@ def create_order_entry(
     technical_spec: str,
     final_price: float,
     receipt_path: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Create a confirmed order in the database."""
-    logger.info(f"TOOL | create_order_entry | user_id={user_id} product_id={product_id} price={final_price}")
+    """Create a confirmed order in the database.
 
-    with get_session() as session:
-        order = Order(
-            user_id=user_id,
-            product_id=product_id,
-            human_spec=human_spec,
-            technical_spec=technical_spec,
-            final_price=final_price,
-            status="confirmed",
-            receipt_path=receipt_path,
-        )
-        session.add(order)
-        session.flush()
-        order_id = order.id
-        logger.info(f"TOOL | create_order_entry | ORDER CREATED | order_id={order_id}")
+    If another request already created an order under the same
+    idempotency_key, that order is returned with created=False.
+    """
+    logger.info("TOOL | create_order_entry | user_id=%s product_id=%s price=%s", user_id, product_id, final_price)
+
+    try:
+        with get_session() as session:
+            order = Order(
+                user_id=user_id,
+                product_id=product_id,
+                human_spec=human_spec,
+                technical_spec=technical_spec,
+                final_price=final_price,
+                status="confirmed",
+                receipt_path=receipt_path,
+                idempotency_key=idempotency_key,
+            )
+            session.add(order)
+            session.flush()
+            order_id = order.id
+            logger.info("TOOL | create_order_entry | ORDER CREATED | order_id=%s", order_id)
+    except IntegrityError:
+        # Lost the race against a concurrent confirmation with the same key
+        existing = get_order_by_idempotency_key(idempotency_key) if idempotency_key else None
+        if not existing:
+            raise
+        logger.warning("TOOL | create_order_entry | idempotent replay | order_id=%s", existing['order_id'])
+        return {**existing, "created": False}
 
     return {
         "order_id": order_id,
@@ -39,18 +55,31 @@ def create_order_entry(
         "user_id": user_id,
         "product_id": product_id,
         "final_price": final_price,
+        "created": True,
     }
 
 
+def get_order_by_idempotency_key(idempotency_key: str) -> Optional[Dict[str, Any]]:
+    """Look up the order created under an idempotency key, if any."""
+    with get_session() as session:
+        order = session.query(Order).filter_by(idempotency_key=idempotency_key).first()
+        if not order:
+            return None
+        return {
+            "order_id": order.id,
+            "status": order.status,
+            "user_id": order.user_id,
+            "product_id": order.product_id,
+            "final_price": order.final_price,
+        }
+
+
 
 def update_order_receipt_path(order_id: int, receipt_path: str) -> bool:
     """Update the receipt path for an existing order."""
-    logger.info(f"TOOL | update_order_receipt_path | order_id={order_id}")
-    with get_session() as session:
-        order = session.query(Order).filter_by(id=order_id).first()
-        if not order:
-            logger.error(f"TOOL | update_order_receipt_path | order_id={order_id} not found")
-            return False
-        order.receipt_path = receipt_path
-        logger.info(f"TOOL | update_order_receipt_path | updated receipt_path={receipt_path}")
-        return True
+    logger.info("TOOL | update_order_receipt_path | order_id=%s", order_id)
+    if not set_order_receipt_path(order_id, receipt_path):
+        logger.error("TOOL | update_order_receipt_path | order_id=%s not found", order_id)
+        return False
+    logger.info("TOOL | update_order_receipt_path | updated receipt_path=%s", receipt_path)
+    return True
@@ -32,7 +32,7 @@ def generate_pdf_receipt(
         order_date = datetime.utcnow().strftime("%B %d, %Y")
 
     file_path = os.path.join(RECEIPTS_DIR, f"receipt_{order_id}.pdf")
-    logger.info(f"TOOL | generate_pdf_receipt | generating for order_id={order_id}")
+    logger.info("TOOL | generate_pdf_receipt | generating for order_id=%s", order_id)
 
     doc = SimpleDocTemplate(
         file_path,
@@ -167,5 +167,5 @@ def generate_pdf_receipt(
     ))
 
     doc.build(elements)
-    logger.info(f"TOOL | generate_pdf_receipt | PDF generated at {file_path}")
+    logger.info("TOOL | generate_pdf_receipt | PDF generated at %s", file_path)
     return file_path
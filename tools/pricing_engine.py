@@ -0,0 +1,229 @@
+"""
+Deterministic pricing for custom orders.
+
+The guidelines the pricing LLM used to apply are a declarative rule table
+here: each PricingRule adds basis points of the unit base price and/or a flat
+amount when its predicate matches the order. Everything is integer cents and
+basis points, so the same product + spec always quotes the same total, in
+microseconds, and the breakdown is rendered from a template.
+"""
+import logging
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRICING_RULES_VERSION = 1
+
+
+class OrderFacts(NamedTuple):
+    """What the rules look at, normalized from the product and both specs."""
+    base_material: str
+    species: str
+    finish: str
+    finish_options: Tuple[str, ...]
+    dimensions: str
+    dimensions_unit: str                # unit assumed for bare numbers in dimensions
+    dimensions_guide: str
+    joinery: str
+    hardware: str
+    quantity: int
+
+
+class PricingRule(NamedTuple):
+    label: str
+    component: str                      # "customization" | "material"
+    when: Callable[[OrderFacts], bool]
+    reads: Tuple[str, ...]              # OrderFacts fields when/flat_cents look at (never quantity)
+    bps: int = 0                        # of the unit base price
+    flat_cents: Callable[[OrderFacts], int] = lambda facts: 0
+
+
+class Adjustment(NamedTuple):
+    label: str
+    component: str
+    cents: int                          # for the whole order (all units)
+
+
+class PriceQuote(NamedTuple):
+    unit_base_cents: int
+    quantity: int
+    adjustments: Tuple[Adjustment, ...]
+    quantity_discount_bps: int
+    quantity_discount_cents: int        # negative or zero
+    total_cents: int
+
+
+_PREMIUM_SPECIES = re.compile(r"\b(walnut|cherry|teak|mahogany)\b", re.I)
+_SPECIAL_FINISH = re.compile(r"\b(lacquer|high[- ]gloss|piano|distressed|hand[- ]rubbed|french polish|custom)\b", re.I)
+_COMPLEX_JOINERY = re.compile(r"\b(dovetail|mortise)", re.I)
+_HARDWARE_UPGRADES = re.compile(r"\b(soft[- ]close|brass|bronze|push[- ]to[- ]open|premium|leather pulls?|hand[- ]forged)\b", re.I)
+_MEASURE = re.compile(r"(\d+(?:\.\d+)?)\s*(mm|cm|m\b|met(?:er|re)s?|ft|feet|foot|'|in\b|inch(?:es)?|\")?", re.I)
+_INCHES_PER_UNIT = {"mm": 1 / 25.4, "cm": 1 / 2.54, "m": 1 / 0.0254, "ft": 12.0, "in": 1.0}
+
+# Quantity tiers: (minimum units, discount in basis points), highest first
+QUANTITY_TIERS: Tuple[Tuple[int, int], ...] = ((5, 1000), (2, 500))
+
+# Requested dimensions more than this far past the guide's largest size are oversized
+_OVERSIZE_MARGIN = 1.2
+# Slack for unit conversion (760 mm is 29.9 in, still a standard 30 in height)
+_FIT_TOLERANCE = 0.02
+
+
+def _unit(token: str) -> Optional[str]:
+    token = token.lower()
+    if not token:
+        return None
+    if token in ("'", "ft", "feet", "foot"):
+        return "ft"
+    if token in ('"', "in") or token.startswith("inch"):
+        return "in"
+    if token.startswith("met"):
+        return "m"
+    return token
+
+
+def _inches(text: str, default_unit: str) -> List[float]:
+    """Every measurement in text, in inches; unitless numbers use default_unit."""
+    return [
+        float(number) * _INCHES_PER_UNIT[_unit(unit) or default_unit]
+        for number, unit in _MEASURE.findall(text)
+    ]
+
+
+def _dimension_tier(facts: OrderFacts) -> Optional[str]:
+    """None when the request fits the dimensions guide, else "custom" or "oversized"."""
+    requested = _inches(facts.dimensions, facts.dimensions_unit)
+    guide = _inches(facts.dimensions_guide, "in")
+    if not requested or not guide:
+        return None
+    low, high = min(guide), max(guide)
+    if max(requested) > high * _OVERSIZE_MARGIN:
+        return "oversized"
+    if any(n < low * (1 - _FIT_TOLERANCE) or n > high * (1 + _FIT_TOLERANCE) for n in requested):
+        return "custom"
+    return None
+
+
+def _is_special_finish(facts: OrderFacts) -> bool:
+    finish = facts.finish.lower()
+    if not finish or finish in ("standard", "natural", "none", "null"):
+        return False
+    if _SPECIAL_FINISH.search(finish):
+        return True
+    return bool(facts.finish_options) and not any(opt in finish for opt in facts.finish_options)
+
+
+def _hardware_cents(facts: OrderFacts) -> int:
+    upgrades = {m.lower() for m in _HARDWARE_UPGRADES.findall(facts.hardware)}
+    return min(len(upgrades) * 5000, 20000)
+
+
+_DIMENSIONS = ("dimensions", "dimensions_unit", "dimensions_guide")
+
+PRICING_RULES: Tuple[PricingRule, ...] = (
+    PricingRule(
+        "Premium wood species", "material", bps=1500, reads=("species", "base_material"),
+        when=lambda f: bool(_PREMIUM_SPECIES.search(f.species)) and not _PREMIUM_SPECIES.search(f.base_material),
+    ),
+    PricingRule("Custom dimensions", "customization", bps=1000, reads=_DIMENSIONS,
+                when=lambda f: _dimension_tier(f) == "custom"),
+    PricingRule("Oversized custom dimensions", "customization", bps=2500, reads=_DIMENSIONS,
+                when=lambda f: _dimension_tier(f) == "oversized"),
+    PricingRule("Special finish", "customization", bps=500, reads=("finish", "finish_options"), when=_is_special_finish),
+    PricingRule("Complex joinery", "customization", bps=800, reads=("joinery",),
+                when=lambda f: bool(_COMPLEX_JOINERY.search(f.joinery))),
+    PricingRule("Hardware upgrades", "customization", reads=("hardware",),
+                when=lambda f: _hardware_cents(f) > 0, flat_cents=_hardware_cents),
+)
+
+
+def apply_bps(cents, bps):
+    """cents * bps / 10000, rounded half up. Works on ints and int64 arrays alike."""
+    return (cents * bps + 5000) // 10000
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def order_facts(product: Dict[str, Any], human_spec: Dict[str, Any], technical_spec: Dict[str, Any]) -> OrderFacts:
+    try:
+        quantity = max(1, int(human_spec.get("quantity") or 1))
+    except (TypeError, ValueError):
+        quantity = 1
+    return OrderFacts(
+        base_material=_text(product.get("material")),
+        species=" ".join(_text(v) for v in (technical_spec.get("wood_species"), human_spec.get("material_preference"))),
+        finish=_text(human_spec.get("finish")).strip(),
+        finish_options=tuple(o.strip().lower() for o in _text(product.get("finish_options")).split(",") if o.strip()),
+        # The technical spec converts the customer's sizes to millimetres
+        dimensions=_text(technical_spec.get("dimensions_mm") or human_spec.get("dimensions")),
+        dimensions_unit="mm" if technical_spec.get("dimensions_mm") else "in",
+        dimensions_guide=_text(product.get("dimensions_guide")),
+        joinery=_text(technical_spec.get("joinery_method")),
+        hardware=" ".join(_text(v) for v in (technical_spec.get("hardware"), human_spec.get("special_requests"))),
+        quantity=quantity,
+    )
+
+
+def to_cents(price: float) -> int:
+    return int(round(price * 100))
+
+
+def compute_quote(base_price: float, facts: OrderFacts, rules: Tuple[PricingRule, ...] = PRICING_RULES) -> PriceQuote:
+    unit_base = to_cents(base_price)
+    quantity = facts.quantity
+    adjustments: List[Adjustment] = []
+    for rule in rules:
+        if rule.when(facts):
+            unit_cents = apply_bps(unit_base, rule.bps) + rule.flat_cents(facts)
+            adjustments.append(Adjustment(rule.label, rule.component, unit_cents * quantity))
+
+    subtotal = unit_base * quantity + sum(a.cents for a in adjustments)
+    discount_bps = next((bps for minimum, bps in QUANTITY_TIERS if quantity >= minimum), 0)
+    discount = -apply_bps(subtotal, discount_bps)
+    return PriceQuote(unit_base, quantity, tuple(adjustments), discount_bps, discount, subtotal + discount)
+
+
+def _money(cents: int) -> str:
+    return f"${cents / 100:,.2f}"
+
+
+def render_breakdown(quote: PriceQuote) -> str:
+    parts = [f"Base price {_money(quote.unit_base_cents)} × {quote.quantity} = {_money(quote.unit_base_cents * quote.quantity)}"]
+    for adj in quote.adjustments:
+        parts.append(f"{adj.label}: +{_money(adj.cents)}")
+    if quote.quantity_discount_cents:
+        parts.append(f"Quantity discount ({quote.quantity_discount_bps / 100:g}%): -{_money(-quote.quantity_discount_cents)}")
+    parts.append(f"Total: {_money(quote.total_cents)}")
+    return "\n".join(f"- {part}" for part in parts)  # markdown list in the chat UI
+
+
+def price_order(
+    product: Dict[str, Any],
+    human_spec: Optional[Dict[str, Any]],
+    technical_spec: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """pricing_summary for an order. Costs are for the whole order, so
+    total_price = base_price * quantity + customization_cost + material_cost + quantity_discount."""
+    facts = order_facts(product, human_spec or {}, technical_spec or {})
+    quote = compute_quote(product.get("base_price") or 0, facts)
+    by_component = {"customization": 0, "material": 0}
+    for adj in quote.adjustments:
+        by_component[adj.component] += adj.cents
+    logger.info(
+        "TOOL | price_order | product_id=%s qty=%s rules=%s total=%s",
+        product.get('product_id'), quote.quantity, [a.label for a in quote.adjustments], _money(quote.total_cents),
+    )
+    return {
+        "base_price": quote.unit_base_cents / 100,
+        "quantity": quote.quantity,
+        "customization_cost": by_component["customization"] / 100,
+        "material_cost": by_component["material"] / 100,
+        "quantity_discount": quote.quantity_discount_cents / 100,
+        "total_price": quote.total_cents / 100,
+        "adjustments": [{"label": a.label, "amount": a.cents / 100} for a in quote.adjustments],
+        "breakdown": render_breakdown(quote),
+        "rules_version": PRICING_RULES_VERSION,
+    }